@@ -0,0 +1,211 @@
+"""
+🚦 Admission Control - Rechazar Rápido en Lugar de Colapsar 🚦
+
+📚 PROPÓSITO EDUCATIVO:
+Los endpoints "def" corren en el thread pool de anyio y cada uno ocupa una
+conexión del pool de la BD. Con más tráfico del que la BD puede atender, las
+requests se acumulan SIN LÍMITE: todas esperan, todas tardan segundos, los
+checkouts del pool agotan POOL_TIMEOUT y acaban en 500. Nadie recibe servicio.
+
+Aquí cada grupo de rutas (/heroes, /heroes_sql) tiene una "puerta":
+- Hasta ADMISSION_CONCURRENCY requests a la vez dentro
+- Hasta ADMISSION_QUEUE_SIZE esperando en cola (por orden de llegada)
+- Quien esperaría más de ADMISSION_QUEUE_TIMEOUT, o no cabe en la cola,
+  recibe YA un 503 con Retry-After: el cliente reintenta más tarde y las
+  requests admitidas siguen respondiendo con su latencia normal
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Load shedding: un 503 rápido es mejor que un 500 a los 10 segundos
+- ✅ Cola acotada + timeout de cola (Little: cola larga = latencia larga)
+- ✅ Semáforo "a mano" con futures: el hueco pasa DIRECTO al primero de la cola
+- ✅ Tamaño del thread pool de anyio (THREADPOOL_SIZE)
+- ✅ Retry-After: decirle al cliente cuándo volver
+
+⚠️  Los límites son POR PROCESO: con varios workers, cada uno tiene sus puertas.
+"""
+import asyncio
+import logging
+from collections import deque
+
+from sqlalchemy import exc
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.metrics import admission_queue_wait_seconds, admission_shed_total, register_admission_gate
+from app.warmup import WARMUP_SCOPE_KEY
+
+logger = logging.getLogger(__name__)
+
+# 🛣️  Grupos de rutas con puerta propia (prefijo → nombre)
+# 💡 Un grupo saturado no frena al otro; /debug, /metrics y /docs no pasan por ninguna
+ROUTE_GROUPS = {"/heroes": "heroes", "/heroes_sql": "heroes_sql"}
+
+# 📡 Conexiones de larga duración: ocuparían un hueco durante horas (tienen su propio límite)
+EXEMPT_PATHS = frozenset({"/heroes/changes/stream"})
+
+_OVERLOADED = {"detail": "Server overloaded, retry later"}
+
+
+class AdmissionGate:
+    """
+    🚪 PUERTA: límite de concurrencia + cola acotada con timeout
+
+    💡 Solo se usa desde el event loop (el middleware es async), así que los
+    contadores no necesitan locks.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.admitted = 0
+        self.shed: dict[str, int] = {"queue_full": 0, "queue_timeout": 0, "pool_timeout": 0}
+        # ⏳ Futures de las requests en cola (orden de llegada)
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def record_shed(self, reason: str) -> None:
+        self.shed[reason] += 1
+        admission_shed_total.inc(self.name, reason)
+
+    async def acquire(self) -> bool:
+        """🎟️  True = admitida (hay que llamar a release()); False = rechazada"""
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.queued >= self.max_queue:
+            self.record_shed("queue_full")
+            return False
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        start = loop.time()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # ⏱️  El hueco llegó justo al vencer el timeout: se devuelve
+                self.release()
+            self.record_shed("queue_timeout")
+            return False
+        except BaseException:
+            # 🔌 El cliente se fue mientras esperaba: si ya le habían pasado el hueco, se devuelve
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters and waiter.done():
+                self._waiters.remove(waiter)
+        admission_queue_wait_seconds.observe(loop.time() - start, self.name)
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """🔓 Libera un hueco: pasa directamente al primero de la cola (si hay)"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # ➡️  active no cambia: el hueco cambia de dueño sin quedar libre
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+# 🚪 Una puerta por grupo (se publican en /metrics y /debug/admission)
+admission_gates = {
+    name: AdmissionGate(
+        name, settings.ADMISSION_CONCURRENCY, settings.ADMISSION_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT
+    )
+    for name in ROUTE_GROUPS.values()
+}
+for gate in admission_gates.values():
+    register_admission_gate(gate)
+
+
+def route_group(path: str) -> str | None:
+    """🧭 "/heroes_sql/12" → "heroes_sql" (por segmento: "/heroes" no captura "/heroes_sql")"""
+    if path in EXEMPT_PATHS:
+        return None
+    prefix = "/" + path.split("/", 2)[1] if path.startswith("/") else path
+    return ROUTE_GROUPS.get(prefix)
+
+
+def overloaded_response() -> JSONResponse:
+    """🚫 503 + Retry-After: "vuelve dentro de N segundos" """
+    return JSONResponse(
+        _OVERLOADED, status_code=503, headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+    )
+
+
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError) -> JSONResponse:
+    """
+    🏊 EXCEPTION HANDLER: el pool de la BD no dio conexión a tiempo → 503, no 500
+
+    💡 Es la misma situación que una cola llena, detectada más tarde
+    """
+    group = route_group(request.url.path)
+    if group is not None:
+        admission_gates[group].record_shed("pool_timeout")
+    logger.warning("pool_timeout", extra={"path": request.url.path})
+    return overloaded_response()
+
+
+class AdmissionMiddleware:
+    """
+    🚦 MIDDLEWARE ASGI: cada request de un grupo pasa por su puerta
+
+    📝 El hueco se ocupa hasta que la respuesta termina de enviarse (también
+    en un streaming como /export, que sigue leyendo de la BD mientras envía).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or WARMUP_SCOPE_KEY in scope:
+            await self.app(scope, receive, send)
+            return
+        group = route_group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        gate = admission_gates[group]
+        if not await gate.acquire():
+            await overloaded_response()(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+
+def configure_thread_pool() -> None:
+    """
+    🧵 Ajusta el thread pool de anyio (donde corren los endpoints "def")
+
+    💡 Debe llamarse con el event loop en marcha (el lifespan): el limitador
+    pertenece al loop. Por defecto anyio usa 40 threads.
+    """
+    from anyio import to_thread
+
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
@@ -0,0 +1,322 @@
+"""
+🧠 Hero Cache - Caché de Lectura para Héroes 🧠
+
+📚 PROPÓSITO EDUCATIVO:
+Este archivo demuestra el patrón "read-through cache": antes de ir a la base
+de datos buscamos la respuesta en memoria; si no está (miss), la leemos de la
+BD y la guardamos para la próxima vez. Cuando un héroe cambia, borramos
+(invalidamos) exactamente las entradas que podrían estar desactualizadas.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Clases abstractas (ABC) como "interfaz" intercambiable
+- ✅ LRU (Least Recently Used) con OrderedDict
+- ✅ TTL (Time To Live): caducidad por tiempo
+- ✅ Invalidación precisa en el camino de escritura
+- ✅ Locks (threading.Lock) porque los endpoints sync corren en varios threads
+- ✅ Contadores de aciertos/fallos para ajustar el tamaño
+
+🏗️  ARQUITECTURA:
+- CacheBackend: interfaz (get/set/delete/delete_where/clear/stats)
+- LRUCache: implementación en memoria del proceso (la primera)
+- NullCache: no guarda nada (CACHE_BACKEND=none)
+- HeroCache: lógica específica de héroes (claves, invalidación) sobre cualquier backend
+
+💡 En el futuro, un backend compartido (p.ej. Redis) solo tendría que
+implementar CacheBackend; los routers no cambiarían.
+
+⚠️  Cada proceso (worker) tiene su PROPIA caché LRU. Con varios workers,
+una escritura solo invalida la caché del worker que la recibió; el TTL
+limita cuánto tiempo puede durar un dato viejo en los demás.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import settings
+
+# 🔑 Centinela para distinguir "no está en caché" de "está y vale None"
+MISSING = object()
+
+# ➖ "Menos infinito" para rangos de IDs (menor que cualquier INTEGER de SQLite)
+_MIN_ID = -(2**63)
+
+
+class CacheBackend(ABC):
+    """
+    🔌 INTERFAZ: Lo mínimo que debe saber hacer cualquier almacén de caché
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """Devuelve el valor guardado o MISSING"""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Guarda (o reemplaza) un valor"""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Borra una clave si existe"""
+
+    @abstractmethod
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """Borra todas las entradas para las que predicate(key, value) es True"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Vacía la caché por completo"""
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """Contadores para monitorizar y ajustar la caché"""
+
+
+class NullCache(CacheBackend):
+    """
+    🚫 CACHÉ NULA: nunca guarda nada (útil para comparar rendimiento sin caché)
+    """
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        self.misses += 1
+        return MISSING
+
+    def set(self, key: Hashable, value: Any) -> None:
+        pass
+
+    def delete(self, key: Hashable) -> None:
+        pass
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "none", "hits": 0, "misses": self.misses, "size": 0}
+
+
+class LRUCache(CacheBackend):
+    """
+    🧠 CACHÉ LRU CON TTL: en memoria, con tamaño máximo y caducidad
+
+    Conceptos que aprenderás:
+    - OrderedDict recuerda el orden de inserción; move_to_end() marca "usado hace poco"
+    - Cuando se llena, popitem(last=False) expulsa el MENOS usado recientemente
+    - Cada entrada guarda su hora de caducidad (time.monotonic() + ttl)
+
+    📊 CONTADORES:
+    - hits: la respuesta estaba en caché
+    - misses: hubo que ir a la base de datos
+    - evictions: entradas expulsadas por falta de espacio
+    - expirations: entradas descartadas por TTL vencido
+    - invalidations: entradas borradas por escrituras
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                # ⏰ Caducada: se descarta y cuenta como miss
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        with self._lock:
+            doomed = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+            for key in doomed:
+                del self._data[key]
+            self.invalidations += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "lru",
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+@dataclass(frozen=True)
+class PageRange:
+    """
+    📏 RANGO DE IDs DE UNA PÁGINA DEL LISTADO
+
+    Se guarda junto a cada página en caché para poder invalidar SOLO las
+    páginas afectadas por un cambio.
+
+    📝 RANGO:
+    - lower: la página contiene IDs > lower (after_id, o primer_id - 1 con offset)
+    - upper: último ID de la página; None si la página no vino llena (es la
+      última), porque un héroe nuevo al final aparecería en ella
+    """
+    keyset: bool
+    lower: int
+    upper: int | None
+
+    @classmethod
+    def for_page(cls, after_id: int | None, offset: int, ids: list[int], limit: int) -> "PageRange":
+        """🏗️  Calcula el rango a partir de los parámetros y los IDs devueltos"""
+        upper = ids[-1] if ids and len(ids) == limit else None
+        if after_id is not None:
+            return cls(keyset=True, lower=after_id, upper=upper)
+        if not offset:
+            # 🥇 Primera página: equivale a keyset desde "menos infinito"
+            return cls(keyset=True, lower=_MIN_ID, upper=upper)
+        return cls(keyset=False, lower=ids[0] - 1 if ids else _MIN_ID, upper=upper)
+
+    @classmethod
+    def everything(cls) -> "PageRange":
+        """
+        🌐 Rango que incluye cualquier ID (cualquier escritura invalida la página)
+
+        💡 Para listados ordenados por name, age o -id: sus IDs no forman un
+        rango, así que no se puede saber qué escrituras les afectan.
+        """
+        return cls(keyset=False, lower=_MIN_ID, upper=None)
+
+    def contains(self, hero_id: int) -> bool:
+        return hero_id > self.lower and (self.upper is None or hero_id <= self.upper)
+
+    def shifted_by(self, hero_id: int) -> bool:
+        """Con OFFSET, insertar o borrar un ID anterior desplaza toda la página"""
+        return self.upper is None or hero_id <= self.upper
+
+
+class HeroCache:
+    """
+    🦸‍♂️ CACHÉ DE HÉROES: claves e invalidación sobre cualquier CacheBackend
+
+    🔄 LECTURA (read-through):
+    1. token = cache.read_token()
+    2. value = cache.get_hero(id)        → si no es MISSING, devolverlo
+    3. leer de la BD
+    4. cache.store_hero(id, value, token)
+
+    💡 ¿Para qué el token?
+    Si entre el paso 3 y el 4 otra request modificó la BD e invalidó la caché,
+    guardaríamos un dato viejo. El token cambia con cada invalidación, así que
+    store_*() descarta el valor si hubo una escritura mientras leíamos.
+
+    ✏️  ESCRITURA:
+    - invalidate(id, shifts=False) tras un UPDATE
+    - invalidate(id, shifts=True) tras un INSERT o DELETE (desplaza páginas con OFFSET)
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    # 🔖 Token de lectura --------------------------------------------------
+    def read_token(self) -> int:
+        return self._writes
+
+    # 🦸‍♂️ Héroe individual -------------------------------------------------
+    def get_hero(self, hero_id: int) -> Any:
+        return self.backend.get(("hero", hero_id))
+
+    def store_hero(self, hero_id: int, value: Any, token: int) -> None:
+        with self._lock:
+            if token == self._writes:
+                self.backend.set(("hero", hero_id), value)
+
+    # 📄 Páginas del listado ------------------------------------------------
+    def get_list(self, params: tuple) -> Any:
+        entry = self.backend.get(("list", params))
+        return entry if entry is MISSING else entry[1]
+
+    def store_list(self, params: tuple, page: PageRange, value: Any, token: int) -> None:
+        with self._lock:
+            if token == self._writes:
+                # 📌 El rango viaja junto al valor: si la entrada se expulsa, se va entera
+                self.backend.set(("list", params), (page, value))
+
+    # ✏️  Invalidación --------------------------------------------------------
+    def invalidate(self, hero_id: int, *, shifts: bool) -> None:
+        """Borra el héroe y SOLO las páginas que lo contienen (o que desplaza)"""
+        self.invalidate_many([hero_id], shifts=shifts)
+
+    def invalidate_many(self, hero_ids: list[int], *, shifts: bool) -> None:
+        def affected(key: Hashable, value: Any) -> bool:
+            if key[0] != "list":
+                return False
+            page: PageRange = value[0]
+            return any(
+                page.contains(hero_id) or (shifts and not page.keyset and page.shifted_by(hero_id))
+                for hero_id in hero_ids
+            )
+
+        # 🔒 Mismo lock que store_*(): una lectura en curso no puede "colar" un dato viejo
+        with self._lock:
+            self._writes += 1
+            for hero_id in hero_ids:
+                self.backend.delete(("hero", hero_id))
+            self.backend.delete_where(affected)
+
+    def stats(self) -> dict[str, Any]:
+        return self.backend.stats()
+
+
+def _build_backend() -> CacheBackend:
+    """🏭 Elige el backend según CACHE_BACKEND en Settings"""
+    if settings.CACHE_BACKEND == "lru":
+        return LRUCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    return NullCache()
+
+
+# 🌍 INSTANCIA GLOBAL: compartida por /heroes y /heroes_sql (leen la misma tabla)
+hero_cache = HeroCache(_build_backend())
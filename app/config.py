@@ -18,8 +18,26 @@ Este archivo demuestra mejores prácticas para manejar configuración en aplicac
 📁 ARCHIVO .env:
 Crea un archivo .env en la raíz del proyecto con:
 DATABASE_FILE=marvel.db
+READ_DATABASE_URLS=auto
 CHECK_SAME_THREAD=false
 SQL_ECHO=false
+DB_BACKEND=sync
+WRITE_MODE=direct
+STARTUP_WARMUP=true
+POOL_CLASS=auto
+ADMISSION_CONTROL=true
+SLOW_QUERY_LOG=true
+BULK_CHUNK_SIZE=500
+BULK_MAX_ITEMS=10000
+EXPORT_CHUNK_SIZE=1000
+BATCH_MAX_IDS=1000
+CHANGES_RETENTION=100000
+SQLITE_PROFILE=performance
+CACHE_BACKEND=lru
+RESPONSE_MODE=fast
+METRICS_ENABLED=true
+LOG_LEVEL=INFO
+LOG_FORMAT=json
 
 ⚠️  NUNCA subas archivos .env a git (contienen secretos)
 """
@@ -32,6 +50,45 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# ✅ Valores permitidos para los PRAGMAs de texto (evita inyectar SQL desde .env)
+_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+_TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+_POOL_CLASSES = ("AUTO", "QUEUE", "STATIC", "NULL")
+
+
+def _choice(name: str, default: str, allowed: tuple[str, ...]) -> str:
+    """🔍 Lee una variable de entorno y valida que sea uno de los valores permitidos"""
+    value = os.getenv(name, default).upper()
+    if value not in allowed:
+        raise ValueError(f"{name} must be one of {', '.join(allowed)}, got {value!r}")
+    return value
+
+
+def _optional(name: str, convert):
+    """🔍 Variable de entorno opcional: None si no está (o está vacía) → se usa el preset"""
+    value = os.getenv(name, "").strip()
+    return convert(value) if value else None
+
+
+def _read_urls(value: str, primary_url: str) -> list[str]:
+    """
+    📖 Traduce READ_DATABASE_URLS a la lista de URLs de lectura
+
+    💡 "auto" convierte sqlite:///marvel.db en sqlite:///file:marvel.db?mode=ro&uri=true:
+    el mismo archivo abierto en modo solo lectura (cualquier INSERT/UPDATE falla)
+    """
+    value = value.strip()
+    if value.lower() == "off":
+        return []
+    if value.lower() != "auto":
+        return [url.strip() for url in value.split(",") if url.strip()]
+    path = primary_url.removeprefix("sqlite:///")
+    if path == primary_url or not path or ":memory:" in path or "?" in path:
+        return []  # 🚫 No es un archivo SQLite simple: sin pool de lectura
+    return [f"sqlite:///file:{path}?mode=ro&uri=true"]
+
+
 class Settings:
     """
     ⚙️  CLASE DE CONFIGURACIÓN: Centraliza toda la configuración de la app
@@ -72,6 +129,65 @@ class Settings:
         self.DATABASE_FILE = os.getenv("DATABASE_FILE", "marvel.db")
         self.DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{self.DATABASE_FILE}")
         
+        # 📖 CONEXIONES DE LECTURA: los GET usan un pool propio y no compiten con los escritores
+        # - READ_DATABASE_URLS=auto (default): con SQLite en archivo, una conexión de SOLO
+        #   LECTURA (mode=ro) al mismo archivo; gracias a WAL ve todo lo confirmado
+        # - READ_DATABASE_URLS=url1,url2: una o varias URLs (se reparten por turnos)
+        # - READ_DATABASE_URLS=off: las lecturas usan el engine principal
+        self.READ_DATABASE_URLS = _read_urls(os.getenv("READ_DATABASE_URLS", "auto"), self.DATABASE_URL)
+        
+        # ⚡ Backend de base de datos: "sync" (Session + thread pool) o "async" (AsyncSession)
+        # 💡 Con "async" los routers /heroes y /heroes_sql se montan en su versión async def
+        # 📦 "async" requiere aiosqlite (uv sync --extra async)
+        self.DB_BACKEND = os.getenv("DB_BACKEND", "sync").lower()
+        if self.DB_BACKEND not in ("sync", "async"):
+            raise ValueError(f"DB_BACKEND must be 'sync' or 'async', got {self.DB_BACKEND!r}")
+        self.ASYNC_DATABASE_URL = os.getenv(
+            "ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{self.DATABASE_FILE}"
+        )
+        
+        # 🔥 ARRANQUE (ver app/warmup.py): el lifespan abre el pool y lanza GETs de
+        # calentamiento para que la primera request real no pague el "arranque en frío"
+        # - POOL_PREFILL: conexiones a abrir por engine (como mucho, el tamaño del pool)
+        self.STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+        self.POOL_PREFILL = int(os.getenv("POOL_PREFILL", "5"))
+        
+        # 📮 MODO DE ESCRITURA de POST/PATCH/DELETE en /heroes y /heroes_sql (backend sync)
+        # - direct (default): cada request confirma su propia transacción
+        # - group: un hilo escritor agrupa las escrituras concurrentes en una transacción
+        # - GROUP_COMMIT_WINDOW_MS: espera máxima para juntar más escrituras (0 = solo lo pendiente;
+        #   mientras se confirma un lote ya se va acumulando el siguiente)
+        # - GROUP_COMMIT_MAX_BATCH: máximo de escrituras por transacción
+        self.WRITE_MODE = os.getenv("WRITE_MODE", "direct").lower()
+        if self.WRITE_MODE not in ("direct", "group"):
+            raise ValueError(f"WRITE_MODE must be 'direct' or 'group', got {self.WRITE_MODE!r}")
+        self.GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "0"))
+        self.GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
+        
+        # 🏊 POOL DE CONEXIONES (ver app/database/pooling.py)
+        # - POOL_CLASS: auto (preset según la URL), queue, static o null
+        # - POOL_SIZE, POOL_MAX_OVERFLOW, POOL_TIMEOUT (s), POOL_RECYCLE (s), POOL_PRE_PING:
+        #   sin definir = el valor del preset; definidos, mandan sobre él
+        self.POOL_CLASS = _choice("POOL_CLASS", "AUTO", _POOL_CLASSES).lower()
+        self.POOL_SIZE = _optional("POOL_SIZE", int)
+        self.POOL_MAX_OVERFLOW = _optional("POOL_MAX_OVERFLOW", int)
+        self.POOL_TIMEOUT = _optional("POOL_TIMEOUT", float)
+        self.POOL_RECYCLE = _optional("POOL_RECYCLE", int)
+        self.POOL_PRE_PING = _optional("POOL_PRE_PING", lambda value: value.lower() == "true")
+
+        # 🚦 ADMISSION CONTROL (ver app/admission.py): con sobrecarga, 503 rápido en vez de colas sin fin
+        # - THREADPOOL_SIZE: threads de anyio para los endpoints "def" (anyio trae 40)
+        # - ADMISSION_CONCURRENCY: requests a la vez por grupo de rutas (/heroes, /heroes_sql)
+        # - ADMISSION_QUEUE_SIZE: requests que pueden esperar en cola por grupo
+        # - ADMISSION_QUEUE_TIMEOUT (s): espera máxima en la cola antes del 503
+        # - ADMISSION_RETRY_AFTER (s): valor de la cabecera Retry-After del 503
+        self.THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+        self.ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+        self.ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", "16"))
+        self.ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+        self.ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+        self.ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
         # 🔧 Configuración específica de SQLite
         # CHECK_SAME_THREAD=False permite usar SQLite desde múltiples threads
         # 
@@ -100,6 +216,125 @@ class Settings:
         # 🐛 SQL_ECHO=True muestra las consultas SQL en la consola (útil para debugging)
         self.SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
         
+        # 🐢 SLOW QUERY LOG (ver app/database/slow_queries.py): solo las sentencias lentas
+        # - SLOW_QUERY_MS: umbral en milisegundos (0 = registrar todas)
+        # - SLOW_QUERY_BUFFER: entradas que guarda /debug/slow-queries (las más recientes)
+        # - SLOW_QUERY_RATE: máximo de entradas por segundo (el resto solo se cuenta)
+        # - SLOW_QUERY_MAX_PLANS: sentencias distintas con EXPLAIN QUERY PLAN guardado
+        self.SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "true").lower() == "true"
+        self.SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+        self.SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "100"))
+        self.SLOW_QUERY_RATE = int(os.getenv("SLOW_QUERY_RATE", "10"))
+        self.SLOW_QUERY_MAX_PLANS = int(os.getenv("SLOW_QUERY_MAX_PLANS", "256"))
+        
+        # 📦 BULK_CHUNK_SIZE: cuántos héroes se insertan por sentencia en /bulk
+        # 💡 Lotes grandes = menos viajes a la BD, pero SQLite limita los parámetros
+        # por sentencia (32766), así que 4 columnas x 500 filas queda muy lejos del límite
+        self.BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+        
+        # 🚧 BULK_MAX_ITEMS: máximo de elementos por request en POST/PATCH/DELETE /bulk (más → 413)
+        self.BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+        
+        # 📤 EXPORT_CHUNK_SIZE: filas por lote en /export (la memoria no crece con la tabla)
+        self.EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+        
+        # 🧺 LECTURA POR LOTES (GET/POST /batch, ver app/database/batch.py)
+        # - BATCH_MAX_IDS: máximo de ids por request (más → 400)
+        # - BATCH_CHUNK_SIZE: ids por consulta WHERE id IN (...) (límite de parámetros de SQLite)
+        self.BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "1000"))
+        self.BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "500"))
+
+        # 📰 CHANGE FEED (GET /heroes/changes y /heroes/changes/stream, ver app/database/changes.py)
+        # - CHANGES_RETENTION: cambios que se conservan (la compactación borra los más viejos)
+        # - CHANGES_COMPACT_INTERVAL (s): cada cuánto se compacta el changelog
+        # - CHANGES_POLL_INTERVAL (s): cada cuánto busca cambios nuevos el broadcaster SSE
+        # - CHANGES_HEARTBEAT (s): comentario ": ping" en un stream sin cambios (proxies, clientes caídos)
+        # - CHANGES_MAX_SUBSCRIBERS: streams SSE abiertos a la vez (más → 503)
+        # - CHANGES_SUBSCRIBER_QUEUE: lotes pendientes por stream (un cliente lento los pierde
+        #   y los recupera después leyendo de la BD)
+        self.CHANGES_RETENTION = int(os.getenv("CHANGES_RETENTION", "100000"))
+        # ⚠️  Con 0 la compactación vaciaría la tabla: sin el cambio más viejo no se
+        # puede saber si un cursor quedó atrás (y no habría 410, solo cambios perdidos)
+        if self.CHANGES_RETENTION < 1:
+            raise ValueError(f"CHANGES_RETENTION must be at least 1, got {self.CHANGES_RETENTION}")
+        self.CHANGES_COMPACT_INTERVAL = float(os.getenv("CHANGES_COMPACT_INTERVAL", "60"))
+        self.CHANGES_POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", "0.5"))
+        self.CHANGES_HEARTBEAT = float(os.getenv("CHANGES_HEARTBEAT", "15"))
+        self.CHANGES_MAX_SUBSCRIBERS = int(os.getenv("CHANGES_MAX_SUBSCRIBERS", "1000"))
+        self.CHANGES_SUBSCRIBER_QUEUE = int(os.getenv("CHANGES_SUBSCRIBER_QUEUE", "100"))
+
+        # 🔍 SEARCH_RANK_WINDOW: máximo de coincidencias que se ordenan por relevancia
+        # 💡 Calcular bm25 de UN MILLÓN de coincidencias ("a"*) tarda más de un segundo;
+        # con la ventana solo se puntúan las primeras N (por id). 0 = sin límite
+        self.SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "10000"))
+        
+        # 🧠 CACHÉ DE LECTURA: CACHE_BACKEND=lru (en memoria) o none (desactivada)
+        # - CACHE_MAX_ENTRIES: máximo de entradas (héroes + páginas) antes de expulsar las viejas
+        # - CACHE_TTL_SECONDS: segundos que una entrada es válida aunque nadie la invalide
+        self.CACHE_BACKEND = os.getenv("CACHE_BACKEND", "lru").lower()
+        if self.CACHE_BACKEND not in ("lru", "none"):
+            raise ValueError(f"CACHE_BACKEND must be 'lru' or 'none', got {self.CACHE_BACKEND!r}")
+        self.CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+        self.CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+        
+        # ⚡ SERIALIZACIÓN DE RESPUESTAS (GET de héroes, ver app/database/serialization.py)
+        # - fast: las filas se convierten en bytes JSON de una pasada (sin HeroPublic)
+        # - model: un HeroPublic por fila que FastAPI valida y serializa (para comparar)
+        self.RESPONSE_MODE = os.getenv("RESPONSE_MODE", "fast").lower()
+        if self.RESPONSE_MODE not in ("fast", "model"):
+            raise ValueError(f"RESPONSE_MODE must be 'fast' or 'model', got {self.RESPONSE_MODE!r}")
+        
+        # 🏎️  PERFIL DE RENDIMIENTO DE SQLITE (PRAGMAs aplicados a CADA conexión nueva)
+        # SQLITE_PROFILE=performance (default) activa el perfil; SQLITE_PROFILE=off
+        # deja los valores de fábrica de SQLite. Cada PRAGMA se puede ajustar por separado.
+        #
+        # 📝 ¿Qué hace cada uno?
+        # - journal_mode=WAL: los lectores NO bloquean al escritor (y viceversa)
+        # - synchronous=NORMAL: con WAL, fsync solo en checkpoints (seguro ante caídas de la app)
+        # - mmap_size: lee la BD mapeada en memoria en lugar de con read() (256 MB)
+        # - cache_size: negativo = KiB de caché de páginas por conexión (64 MB)
+        # - temp_store=MEMORY: tablas temporales (ORDER BY grandes, etc.) en RAM
+        # - busy_timeout: milisegundos que se espera un lock antes de "database is locked"
+        self.SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance").lower()
+        if self.SQLITE_PROFILE not in ("performance", "off"):
+            raise ValueError(f"SQLITE_PROFILE must be 'performance' or 'off', got {self.SQLITE_PROFILE!r}")
+        self.SQLITE_JOURNAL_MODE = _choice("SQLITE_JOURNAL_MODE", "WAL", _JOURNAL_MODES)
+        self.SQLITE_SYNCHRONOUS = _choice("SQLITE_SYNCHRONOUS", "NORMAL", _SYNCHRONOUS_MODES)
+        self.SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+        self.SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))
+        self.SQLITE_TEMP_STORE = _choice("SQLITE_TEMP_STORE", "MEMORY", _TEMP_STORES)
+        self.SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+        
+        # 🧩 PRAGMAs listos para aplicar (vacío si el perfil está desactivado)
+        # 💡 busy_timeout va primero: si otro proceso tiene el lock, cambiar a WAL espera
+        self.sqlite_pragmas = {
+            "busy_timeout": self.SQLITE_BUSY_TIMEOUT,
+            "journal_mode": self.SQLITE_JOURNAL_MODE,
+            "synchronous": self.SQLITE_SYNCHRONOUS,
+            "mmap_size": self.SQLITE_MMAP_SIZE,
+            "cache_size": self.SQLITE_CACHE_SIZE,
+            "temp_store": self.SQLITE_TEMP_STORE,
+        } if self.SQLITE_PROFILE == "performance" else {}
+        # 📖 Las conexiones de solo lectura no pueden cambiar el journal ni escriben nada
+        self.sqlite_read_pragmas = {
+            name: value for name, value in self.sqlite_pragmas.items()
+            if name not in ("journal_mode", "synchronous")
+        }
+        
+        # 📈 MÉTRICAS: METRICS_ENABLED=true publica GET /metrics (formato Prometheus)
+        # y mide cada request y cada consulta SQL; false quita middleware y eventos
+        self.METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        
+        # 📝 LOGS ESTRUCTURADOS (logger "app")
+        # - LOG_LEVEL: DEBUG, INFO, WARNING, ERROR... u OFF para apagarlos por completo
+        # - LOG_FORMAT: json (una línea JSON por evento) o text (legible en consola)
+        # 💡 Los logs del camino caliente (p.ej. cuántos héroes devolvió un listado)
+        # son DEBUG: con INFO no cuestan más que una comparación de niveles
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+        self.LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+        if self.LOG_FORMAT not in ("json", "text"):
+            raise ValueError(f"LOG_FORMAT must be 'json' or 'text', got {self.LOG_FORMAT!r}")
+        
         # 🔌 Argumentos de conexión - se calcula una vez y se reutiliza
         # Más eficiente que calcular dinámicamente cada vez que se accede
         self.connect_args = {"check_same_thread": self.CHECK_SAME_THREAD}
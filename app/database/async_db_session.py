@@ -0,0 +1,72 @@
+"""
+⚡ Async Database Session Management - Sesiones Asíncronas ⚡
+
+📚 PROPÓSITO EDUCATIVO:
+Versión asíncrona de share_db_session.py. En lugar de un Engine y una Session
+normales usamos AsyncEngine y AsyncSession, que permiten escribir endpoints
+con "async def" y "await" sin bloquear el event loop.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ create_async_engine() con el driver aiosqlite
+- ✅ AsyncSession y la palabra clave await
+- ✅ Dependencias asíncronas en FastAPI (async def + yield)
+- ✅ Por qué los endpoints "def" usan un thread pool
+
+🧵 SYNC vs ASYNC:
+- def (sync): FastAPI ejecuta cada request en un thread del pool de anyio
+  (~40 threads por defecto). Con 40 consultas lentas en curso, la request 41 espera.
+- async def: la request se ejecuta en el event loop; mientras espera a la BD,
+  el loop atiende otras requests sin saltar entre threads.
+
+📦 DEPENDENCIA OPCIONAL:
+Requiere aiosqlite + greenlet →  uv sync --extra async   (o pip install aiosqlite "sqlalchemy[asyncio]")
+Se activa con DB_BACKEND=async en el archivo .env
+"""
+
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Importar configuración centralizada
+from app.config import settings
+from app.database.pooling import pool_options
+from app.database.slow_queries import install_slow_query_log
+from app.database.sqlite_tuning import install_sqlite_pragmas
+from app.metrics import install_sql_metrics
+
+# 🏗️  CREAR ASYNC ENGINE: mismo archivo marvel.db, distinto driver (sqlite+aiosqlite)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,  # 📍 URL asíncrona (ej: sqlite+aiosqlite:///marvel.db)
+    connect_args=settings.connect_args,  # 🔧 Argumentos específicos de SQLite
+    echo=settings.SQL_ECHO,  # 🐛 Mostrar SQL en consola si está habilitado
+    **pool_options(settings.ASYNC_DATABASE_URL, "async", is_async=True),  # 🏊 Pool (preset + Settings)
+)
+
+# 🏎️  Mismo perfil de PRAGMAs que el engine sync (los eventos viven en sync_engine)
+install_sqlite_pragmas(async_engine.sync_engine)
+
+# 📈 Métricas de SQL y del pool (también en sync_engine)
+install_sql_metrics(async_engine.sync_engine, "async")
+
+# 🐢 Slow query log (también en sync_engine)
+install_slow_query_log(async_engine.sync_engine, "async")
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """
+    🔄 GENERADOR ASÍNCRONO DE SESIONES: igual que get_session(), pero con async
+
+    💡 expire_on_commit=False:
+    Tras un commit, SQLAlchemy "caduca" los objetos y los recarga al leerlos.
+    En async esa recarga implícita no está permitida (necesitaría await),
+    así que la desactivamos y refrescamos explícitamente cuando hace falta.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+# 📝 ANOTACIÓN DE TIPO: equivalente asíncrono de SessionDep
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
@@ -0,0 +1,122 @@
+"""
+🧺 Batch Lookup - Muchos Héroes por ID en Pocas Consultas 🧺
+
+📚 PROPÓSITO EDUCATIVO:
+Para pintar un equipo de 30 héroes, el frontend hacía 30 veces
+GET /heroes/{id}: 30 requests HTTP y 30 SELECT ... WHERE id = :hero_id. Con
+GET /heroes/batch?ids=1,2,3 todo llega en UNA request y la BD responde con
+UNA consulta WHERE id IN (...) por lote (BATCH_CHUNK_SIZE ids).
+
+El agrupado lo hace BatchLoader, un "DataLoader" (la idea viene de GraphQL):
+se le piden claves, junta las que aún no conoce, las carga en lotes y
+recuerda el resultado (también los que NO existen) durante la request.
+Cualquier endpoint futuro que necesite héroes por id puede reutilizarlo.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ WHERE id IN (...): una búsqueda en la clave primaria por id, en una sola consulta
+- ✅ Lotes: SQLite limita los parámetros por sentencia (32766)
+- ✅ DataLoader: agrupar y memorizar cargas por clave
+- ✅ Dependencias por request: FastAPI crea UN loader por request y lo comparte
+- ✅ Informar de los ids que faltan en lugar de fallar con 404
+
+📝 FLUJO:
+1. ids de la query string (?ids=1,2,3) o del body ({"ids": [1, 2, 3]})
+2. loader.load_many(ids) → un SELECT ... IN por lote de ids desconocidos
+3. Respuesta en el ORDEN pedido: {"heroes": [...], "missing": [...]}
+"""
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from typing import Annotated, Any, Generic, TypeVar
+
+from fastapi import Depends, HTTPException, Query
+
+from app.config import settings
+from app.database.bulk import chunked
+from app.database.models import SQLITE_INT_MAX, SQLITE_INT_MIN, HeroBatchRequest
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# 📥 Carga de un lote: recibe claves y devuelve {clave: valor} de las que existen
+BatchFetch = Callable[[Sequence[K]], Mapping[K, V]]
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    🧺 DATALOADER: agrupa cargas por clave en lotes y recuerda los resultados
+
+    💡 Un loader vive lo que dura una request: lo que recuerda puede quedar
+    viejo en cuanto otra request escribe, así que nunca se comparte entre requests.
+    """
+
+    def __init__(self, fetch: BatchFetch, chunk_size: int | None = None):
+        self._fetch = fetch
+        self._chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+        # 🗃️  Resultados ya cargados; None = la clave no existe (no se vuelve a pedir)
+        self._loaded: dict[K, V | None] = {}
+
+    def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        """📦 Valores de `keys` en el mismo orden (None si no existe)"""
+        keys = list(keys)
+        # 🔁 dict.fromkeys: sin repetidos y conservando el orden
+        pending = [key for key in dict.fromkeys(keys) if key not in self._loaded]
+        for chunk in chunked(pending, self._chunk_size):
+            found = self._fetch(chunk)
+            for key in chunk:
+                self._loaded[key] = found.get(key)
+        return [self._loaded[key] for key in keys]
+
+    def load(self, key: K) -> V | None:
+        """🦸 Un solo valor (si ya se cargó, sin consulta)"""
+        return self.load_many([key])[0]
+
+
+def _check_batch_size(ids: list[int]) -> list[int]:
+    # 🚧 Sin límite, una sola request podría pedir millones de ids
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids cannot be empty")
+    if len(ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many ids (max {settings.BATCH_MAX_IDS})")
+    return ids
+
+
+def batch_query_ids(ids: Annotated[list[str], Query()]) -> list[int]:
+    """
+    🔌 DEPENDENCIA: ids de la query string
+
+    📝 Separados por comas (?ids=1,2,3), repitiendo el parámetro
+    (?ids=1&ids=2) o mezclando ambas formas
+    """
+    try:
+        parsed = [int(part) for value in ids for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers separated by commas")
+    # 🔢 El mismo rango que HeroId en los bodies (un INTEGER de SQLite)
+    if any(not SQLITE_INT_MIN <= hero_id <= SQLITE_INT_MAX for hero_id in parsed):
+        raise HTTPException(status_code=400, detail="ids must fit in a 64-bit signed integer")
+    return _check_batch_size(parsed)
+
+
+def batch_body_ids(body: HeroBatchRequest) -> list[int]:
+    """🔌 DEPENDENCIA: ids del body (POST, para listas que no caben en una URL)"""
+    return _check_batch_size(body.ids)
+
+
+# 📝 ANOTACIONES DE TIPO: igual que HeroFiltersDep
+BatchQueryIdsDep = Annotated[list[int], Depends(batch_query_ids)]
+BatchBodyIdsDep = Annotated[list[int], Depends(batch_body_ids)]
+
+
+def load_batch(loader: BatchLoader[int, Any], ids: list[int]) -> tuple[list[Any], list[int]]:
+    """
+    🧮 (héroes encontrados, ids que faltan), ambos en el orden pedido
+
+    💡 Un id repetido se devuelve una sola vez (en su primera posición)
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    heroes, missing = [], []
+    for hero_id, hero in zip(unique_ids, loader.load_many(unique_ids)):
+        if hero is None:
+            missing.append(hero_id)
+        else:
+            heroes.append(hero)
+    return heroes, missing
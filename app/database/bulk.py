@@ -0,0 +1,213 @@
+"""
+📦 Bulk Operations - Operaciones Masivas 📦
+
+📚 PROPÓSITO EDUCATIVO:
+Este archivo contiene las utilidades compartidas por los endpoints masivos
+(/heroes/bulk y /heroes_sql/bulk): leer muchos héroes en una sola request y
+dividirlos en lotes (chunks) para insertarlos de forma eficiente, y agrupar
+los PATCH/DELETE masivos en pocas sentencias "de conjunto".
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Leer el body "crudo" de una request (JSON array o NDJSON)
+- ✅ Validar listas completas con TypeAdapter de Pydantic
+- ✅ Dividir listas grandes en lotes de tamaño fijo
+- ✅ Por qué una transacción por lote es mucho más rápida que una por fila
+- ✅ executemany: UNA sentencia UPDATE para todos los héroes que cambian las mismas columnas
+
+🐢 UNO POR UNO:
+10.000 héroes = 10.000 requests HTTP + 10.000 INSERT + 10.000 COMMIT (fsync)
+
+🚀 EN LOTE:
+10.000 héroes = 1 request HTTP + 20 INSERT multi-fila + 1 COMMIT
+"""
+import json
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from app.config import settings
+from app.database.filters import HeroFilters
+from app.database.models import (
+    HeroBulkDelete,
+    HeroBulkItem,
+    HeroBulkOutcome,
+    HeroBulkUpdateItem,
+    HeroBulkWriteResult,
+)
+
+T = TypeVar("T")
+
+# 📄 Tipos de contenido aceptados para NDJSON (un objeto JSON por línea)
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# ✅ Validador precompilado: se construye UNA vez al importar el módulo
+_bulk_adapter = TypeAdapter(list[HeroBulkItem])
+
+# 📖 Esquema OpenAPI del body: /docs muestra ambos formatos aceptados
+_item_schema = HeroBulkItem.model_json_schema()
+BULK_OPENAPI_EXTRA: dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": _item_schema}},
+            "application/x-ndjson": {"schema": _item_schema},
+        },
+    }
+}
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """
+    ✂️  Divide una secuencia en lotes de como máximo `size` elementos
+
+    📝 EJEMPLO:
+    list(chunked([1, 2, 3, 4, 5], 2)) → [[1, 2], [3, 4], [5]]
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def check_bulk_size(count: int) -> None:
+    """
+    🚧 413 si una request masiva trae más de BULK_MAX_ITEMS elementos
+
+    💡 Sin límite, una sola request podría retener millones de héroes en
+    memoria (y bloquear al escritor durante toda su transacción)
+    """
+    if count > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {settings.BULK_MAX_ITEMS})")
+
+
+async def read_bulk_heroes(request: Request) -> list[HeroBulkItem]:
+    """
+    📥 DEPENDENCIA: Lee y valida el body de un endpoint masivo
+
+    Conceptos que aprenderás:
+    - request.body() devuelve los bytes sin procesar
+    - Content-Type decide cómo interpretar el body
+    - Los errores se devuelven como 422, igual que en cualquier otro endpoint
+    - Más de BULK_MAX_ITEMS elementos → 413, ANTES de validar ninguno
+
+    📝 FORMATOS ACEPTADOS:
+    - application/json     → [{"name": ...}, {"name": ...}]
+    - application/x-ndjson → {"name": ...}\\n{"name": ...}
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    try:
+        if content_type in NDJSON_MEDIA_TYPES:
+            # 📄 NDJSON: cada línea no vacía es un objeto JSON independiente
+            # 🔢 Se cuentan las líneas antes de decodificar ninguna
+            lines = [line for line in body.splitlines() if line.strip()]
+            check_bulk_size(len(lines))
+            payload = [json.loads(line) for line in lines]
+        else:
+            payload = json.loads(body)
+    except ValueError:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body",), "msg": "Invalid JSON body", "input": None}]
+        )
+    if isinstance(payload, list):
+        check_bulk_size(len(payload))
+
+    try:
+        return _bulk_adapter.validate_python(payload)
+    except ValidationError as exc:
+        # 📍 Prefijamos "body" para que loc sea igual al de un body normal: ["body", 3, "name"]
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)]
+        )
+
+
+def returned_ids_in_order(chunk: Sequence[HeroBulkItem], returned: Iterable[int]) -> list[int]:
+    """
+    🔢 IDs de RETURNING en el orden del lote (ids[i] corresponde a chunk[i])
+
+    ⚠️  SQLite no garantiza el orden de las filas de RETURNING, pero sí se sabe:
+    - Un héroe con id explícito devuelve ESE id
+    - Los ids generados crecen en el orden en que se insertan las filas
+      (el INSERT ... SELECT las recorre con ORDER BY ordinal)
+    Así que los ids devueltos que no son explícitos, ordenados, son los
+    generados en el orden del lote: la misma idea que usa SQLAlchemy con
+    sort_by_parameter_order=True en /heroes/bulk.
+    """
+    generated = Counter(returned)
+    generated.subtract(hero.id for hero in chunk if hero.id is not None)
+    new_ids = iter(sorted(generated.elements()))
+    return [hero.id if hero.id is not None else next(new_ids) for hero in chunk]
+
+
+# ✏️  PATCH / 🗑️  DELETE MASIVOS ------------------------------------------------
+
+def group_updates(items: Sequence[HeroBulkUpdateItem]) -> dict[tuple[str, ...], list[dict[str, Any]]]:
+    """
+    🧩 Agrupa las actualizaciones por las COLUMNAS que cambian
+
+    Cada grupo se envía como UN executemany: la misma sentencia UPDATE con
+    una fila de parámetros por héroe.
+
+    📝 EJEMPLO:
+    [{"id": 1, "age": 26}, {"id": 3, "name": "Thor"}, {"id": 2, "age": 40}]
+    → {("age",): [{"id": 1, "age": 26}, {"id": 2, "age": 40}],
+       ("name",): [{"id": 3, "name": "Thor"}]}
+
+    💡 Un elemento sin campos queda en el grupo () (no hay nada que escribir)
+    ⚠️  Un ID repetido → 400: al agrupar, el orden entre sus cambios se perdería
+    🚧 Más de BULK_MAX_ITEMS elementos → 413
+    """
+    check_bulk_size(len(items))
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    seen: set[int] = set()
+    for item in items:
+        if item.id in seen:
+            raise HTTPException(status_code=400, detail=f"Duplicate hero id {item.id} in bulk update")
+        seen.add(item.id)
+        # 🎯 exclude_unset: solo los campos enviados (en el orden del modelo → misma clave de grupo)
+        values = item.model_dump(exclude_unset=True, exclude={"id"})
+        groups.setdefault(tuple(values), []).append({"id": item.id, **values})
+    return groups
+
+
+def delete_filters(request: HeroBulkDelete) -> HeroFilters | None:
+    """
+    🧮 Valida el body de DELETE /bulk: HeroFilters si borra por filtro, None si por ids
+
+    📝 Reutiliza HeroFilters para construir el WHERE con las mismas
+    condiciones (y los mismos índices) que GET /heroes/
+    🚧 Más de BULK_MAX_ITEMS ids → 413
+    """
+    if (request.ids is None) == (request.filter is None):
+        raise HTTPException(status_code=400, detail="Send either ids or filter")
+    if request.filter is None:
+        check_bulk_size(len(request.ids))
+        return None
+    criteria = request.filter.model_dump(exclude_none=True)
+    if not criteria:
+        raise HTTPException(status_code=400, detail="filter needs at least one condition")
+    filters = HeroFilters(**criteria)
+    if filters.min_age is not None and filters.max_age is not None and filters.min_age > filters.max_age:
+        raise HTTPException(status_code=400, detail="min_age cannot be greater than max_age")
+    return filters
+
+
+def bulk_outcomes(statuses: dict[int, str]) -> HeroBulkWriteResult:
+    """📋 {id: estado} (en el orden del request) → respuesta de PATCH/DELETE masivo"""
+    return HeroBulkWriteResult(
+        results=[HeroBulkOutcome(id=hero_id, status=status) for hero_id, status in statuses.items()]
+    )
+
+
+def update_statuses(items: Sequence[HeroBulkUpdateItem], missing: Iterable[int]) -> dict[int, str]:
+    """📋 Estado de cada elemento de PATCH /bulk, en el orden del request"""
+    missing = set(missing)
+    return {
+        item.id: "not_found" if item.id in missing
+        else "updated" if item.model_fields_set - {"id"}
+        else "unchanged"
+        for item in items
+    }
@@ -0,0 +1,342 @@
+"""
+📰 Change Feed - Cambios en Lugar de Relecturas 📰
+
+📚 PROPÓSITO EDUCATIVO:
+Un servicio que quiere "estar al día" relee GET /heroes/ cada X segundos:
+casi siempre para descubrir que NO cambió nada, y pagando la lista entera
+cuando cambió un solo héroe. Con un changelog, el cliente pregunta "¿qué
+cambió desde el seq N?" y recibe solo eso:
+- GET /heroes/changes?since=N → los cambios posteriores a N (sincronización delta)
+- GET /heroes/changes/stream → Server-Sent Events: el servidor los EMPUJA
+
+Los triggers de schema.py escriben el changelog (hero_changes) en cada
+escritura, venga del ORM, del SQL puro, del modo async o del importador.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Cursor de sincronización: seq monótono (AUTOINCREMENT)
+- ✅ Server-Sent Events: text/event-stream, id:, event:, retry: y Last-Event-ID
+- ✅ Fan-out: UNA consulta por intervalo para TODOS los suscriptores
+- ✅ Colas acotadas: un cliente lento no hace crecer la memoria
+- ✅ Compactación: el changelog guarda solo los últimos CHANGES_RETENTION cambios
+- ✅ 410 Gone: "tu cursor es más viejo que el historial, vuelve a leer todo"
+
+📝 FLUJO DE UN CLIENTE:
+1. GET /heroes/changes (sin since) → {"head": 120, ...}: guarda next=120
+2. GET /heroes/ (lectura completa, paginada)
+3. GET /heroes/changes?since=120 (o el stream con ?since=120) y aplica los
+   cambios; repetir con el nuevo `next`
+💡 El orden 1 → 2 importa: lo que cambie DURANTE la lectura completa llegará
+   también como cambio (aplicar un cambio dos veces no hace daño).
+⚠️  410 Gone (o el evento SSE "reset"): se perdió historial → volver al paso 1.
+"""
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any
+
+from anyio import to_thread
+from sqlalchemy import Connection
+
+from app.config import settings
+from app.database.schema import CHANGES_COMPACT
+
+logger = logging.getLogger(__name__)
+
+# 📄 Cambios por consulta al ponerse al día (broadcaster y streams)
+CATCH_UP_PAGE = 1000
+
+# 🔁 "retry:" del stream: ms que espera el navegador antes de reconectar
+SSE_RETRY_MS = 3000
+
+_CHANGES_SQL = "SELECT seq, op, hero_id, fields FROM hero_changes WHERE seq > ? ORDER BY seq LIMIT ?"
+# 💡 Dos subconsultas a propósito: con min() Y max() en la misma SELECT, SQLite
+# recorre toda la tabla; cada una por separado es un salto al extremo de la clave
+_BOUNDS_SQL = "SELECT (SELECT coalesce(max(seq), 0) FROM hero_changes), (SELECT min(seq) FROM hero_changes)"
+
+
+class ChangesExpired(Exception):
+    """🕳️  `since` es anterior al cambio más viejo que se conserva (se compactó)"""
+
+
+def read_changes(connection: Connection, since: int | None, limit: int) -> dict[str, Any]:
+    """
+    📰 Hasta `limit` cambios con seq > since (forma de HeroChangesPage)
+
+    📝 since=None → solo el head actual: el punto de partida de un cliente nuevo
+    ⚠️  Lanza ChangesExpired si faltan cambios posteriores a `since`
+    """
+    head, oldest = connection.exec_driver_sql(_BOUNDS_SQL).one()
+    if since is None:
+        return {"changes": [], "next": head, "head": head, "has_more": False}
+    if oldest is not None and since < oldest - 1:
+        raise ChangesExpired(f"since={since} is older than the oldest retained change ({oldest})")
+
+    # 🔍 limit + 1: la fila de más solo dice si hay otra página
+    rows = connection.exec_driver_sql(_CHANGES_SQL, (since, limit + 1)).all()
+    changes = [
+        {"seq": seq, "op": op, "hero_id": hero_id, "fields": fields.split(",") if fields else None}
+        for seq, op, hero_id, fields in rows[:limit]
+    ]
+    return {
+        "changes": changes,
+        "next": changes[-1]["seq"] if changes else since,
+        "head": head,
+        "has_more": len(rows) > limit,
+    }
+
+
+def compact_changes(connection: Connection, keep: int) -> int:
+    """🧹 Borra los cambios más viejos y deja los `keep` más recientes; devuelve cuántos borró"""
+    return connection.exec_driver_sql(CHANGES_COMPACT, {"keep": keep}).rowcount
+
+
+def _run_sync(write: bool, fn: Callable, *args):
+    from app.database.share_db_session import engine, pick_read_engine
+
+    with (engine.begin() if write else pick_read_engine().connect()) as connection:
+        return fn(connection, *args)
+
+
+async def run_on_db(fn: Callable, *args, write: bool = False):
+    """
+    🔀 fn(connection, *args) con el backend configurado (sync o async)
+
+    💡 Así /heroes/changes es UN solo router para los dos backends: con "sync"
+    fn corre en el thread pool (engine de lectura o el principal si escribe);
+    con "async", en una AsyncConnection vía run_sync (como en el lifespan).
+    """
+    if settings.DB_BACKEND == "async":
+        from app.database.async_db_session import async_engine
+
+        async with (async_engine.begin() if write else async_engine.connect()) as connection:
+            return await connection.run_sync(fn, *args)
+    return await to_thread.run_sync(_run_sync, write, fn, *args)
+
+
+@dataclass(frozen=True)
+class ChangeBatch:
+    """📦 Lo que publica el broadcaster: cambios con seq > since"""
+    since: int
+    changes: list[dict]
+
+
+class ChangeBroadcaster:
+    """
+    📡 FAN-OUT: UNA tarea consulta el changelog y reparte los cambios a cada stream
+
+    💡 Sin él, cada stream SSE haría su propia consulta cada CHANGES_POLL_INTERVAL:
+    1000 clientes = 1000 consultas por intervalo. Con él, UNA.
+    Las escrituras pueden venir de otros procesos (otro worker, el importador):
+    por eso se consulta la BD en lugar de avisar desde los endpoints.
+    """
+
+    def __init__(self, poll_interval: float, max_subscribers: int, queue_size: int):
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.subscribers: set[asyncio.Queue] = set()
+        # 🔢 Último seq publicado; None = sin suscriptores (no se consulta nada)
+        self.head: int | None = None
+        self.polls = 0
+        self.published = 0
+        self.dropped = 0  # 🐌 Lotes que no cupieron en la cola de un stream lento
+        self._task: asyncio.Task | None = None
+
+    @property
+    def full(self) -> bool:
+        return len(self.subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> asyncio.Queue | None:
+        """📬 Cola nueva para un stream (None si ya hay CHANGES_MAX_SUBSCRIBERS)"""
+        if self.full:
+            return None
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """🛑 Para la tarea y avisa a los streams abiertos (None = fin)"""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for queue in self.subscribers:
+            while queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self.subscribers:
+                self.head = None
+                continue
+            try:
+                await self._poll()
+            except ChangesExpired:
+                # 🕳️  La compactación adelantó al broadcaster: cada stream lo detectará
+                self.head = None
+            except Exception:
+                logger.exception("changes_poll_failed")
+
+    async def _poll(self) -> None:
+        if self.head is None:
+            # 📍 Primer suscriptor: se empieza en el head actual (cada stream se pone
+            # al día por su cuenta desde su propio `since`)
+            self.head = (await run_on_db(read_changes, None, 0))["head"]
+            return
+        self.polls += 1
+        has_more = True
+        while has_more:
+            page = await run_on_db(read_changes, self.head, CATCH_UP_PAGE)
+            has_more = page["has_more"]
+            if not page["changes"]:
+                return
+            self._publish(ChangeBatch(self.head, page["changes"]))
+            self.head = page["next"]
+
+    def _publish(self, batch: ChangeBatch) -> None:
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(batch)
+                self.published += 1
+            except asyncio.QueueFull:
+                # 🐌 El stream recuperará el hueco leyendo de la BD (ver change_events)
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "max_subscribers": self.max_subscribers,
+            "head": self.head,
+            "polls": self.polls,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+# 📡 Broadcaster único del proceso (lo arranca y lo para el lifespan)
+change_broadcaster = ChangeBroadcaster(
+    settings.CHANGES_POLL_INTERVAL, settings.CHANGES_MAX_SUBSCRIBERS, settings.CHANGES_SUBSCRIBER_QUEUE
+)
+
+
+def _sse(event: str, data: Any, event_id: int | None = None) -> str:
+    """📨 Un evento SSE: líneas "campo: valor" y una línea en blanco al final"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _catch_up(since: int, until: int | None = None) -> AsyncIterator[dict]:
+    """📚 Cambios con since < seq (<= until) leídos de la BD, página a página"""
+    while True:
+        page = await run_on_db(read_changes, since, CATCH_UP_PAGE)
+        for change in page["changes"]:
+            if until is not None and change["seq"] > until:
+                return
+            yield change
+        since = page["next"]
+        if not page["has_more"]:
+            return
+
+
+async def change_events(since: int | None) -> AsyncIterator[str]:
+    """
+    📡 GENERADOR SSE de GET /heroes/changes/stream
+
+    📝 FLUJO:
+    1. Suscribirse ANTES de leer nada (lo que llegue mientras tanto queda en la cola)
+    2. Ponerse al día desde `since` leyendo de la BD
+    3. En vivo: lotes del broadcaster; si un lote empieza más allá del último
+       seq enviado (cola llena, o anterior a la suscripción), el hueco se lee de la BD
+    4. Sin cambios en CHANGES_HEARTBEAT segundos → ": ping" (mantiene viva la conexión)
+
+    💡 Cada evento lleva id: seq; al reconectar, el navegador lo devuelve en
+    Last-Event-ID y el stream sigue justo donde se cortó.
+    """
+    queue = change_broadcaster.subscribe()
+    if queue is None:
+        return
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        # PASO 1-2: punto de partida
+        if since is None:
+            last = (await run_on_db(read_changes, None, 0))["head"]
+        else:
+            last = since
+            async for change in _catch_up(since):
+                yield _sse("change", change, change["seq"])
+                last = change["seq"]
+
+        # PASO 3-4: en vivo
+        while True:
+            try:
+                batch = await asyncio.wait_for(queue.get(), settings.CHANGES_HEARTBEAT)
+            except TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if batch is None:
+                return  # 🛑 El servidor se está apagando
+            if batch.since > last:
+                async for change in _catch_up(last, batch.since):
+                    yield _sse("change", change, change["seq"])
+                    last = change["seq"]
+                last = max(last, batch.since)
+            for change in batch.changes:
+                if change["seq"] > last:
+                    yield _sse("change", change, change["seq"])
+                    last = change["seq"]
+    except ChangesExpired as error:
+        # 🕳️  Se compactó historial que este cliente no había visto: debe resincronizar
+        yield _sse("reset", {"detail": str(error)})
+    finally:
+        change_broadcaster.unsubscribe(queue)
+
+
+class ChangeCompactor:
+    """
+    🧹 TAREA DE FONDO: compacta al arrancar y luego cada CHANGES_COMPACT_INTERVAL segundos
+
+    💡 Compactar por lotes es más barato que borrar una fila vieja en cada
+    escritura (que es lo que haría un trigger)
+    """
+
+    def __init__(self, keep: int, interval: float):
+        self.keep = keep
+        self.interval = interval
+        self.deleted = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await run_on_db(compact_changes, self.keep, write=True)
+                if deleted:
+                    self.deleted += deleted
+                    logger.info("changes_compacted", extra={"deleted": deleted})
+            except Exception:
+                logger.exception("changes_compaction_failed")
+            await asyncio.sleep(self.interval)
+
+
+change_compactor = ChangeCompactor(settings.CHANGES_RETENTION, settings.CHANGES_COMPACT_INTERVAL)
@@ -0,0 +1,74 @@
+"""
+🧮 Total Counts - X-Total-Count y Link sin Recorrer la Tabla 🧮
+
+📚 PROPÓSITO EDUCATIVO:
+Para dibujar "página 3 de 120" el cliente necesita el TOTAL de héroes. El
+camino ingenuo, SELECT count(*) FROM heroes, recorre la tabla entera en cada
+request. Aquí el total sale de:
+- Sin filtros: la fila de table_counts que mantienen los triggers (schema.py) → O(1)
+- Con filtros: count(*) con las MISMAS condiciones del listado, que son
+  rangos sobre ix_heroes_name / ix_heroes_age → solo recorre las filas que
+  cumplen el filtro, dentro del índice (sin tocar la tabla)
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Contadores mantenidos por triggers vs count(*)
+- ✅ COUNT con un índice "covering": SQLite no lee la tabla, solo el índice
+- ✅ Cabecera Link (RFC 5988 / RFC 8288): rel="first" y rel="next"
+
+📝 USO (GET /heroes/?include_total=true):
+X-Total-Count: 1500
+Link: <http://.../heroes/?limit=10&include_total=true>; rel="first",
+      <http://.../heroes/?limit=10&include_total=true&cursor=...>; rel="next"
+"""
+from typing import Any
+
+from fastapi import Request, Response
+from sqlalchemy import Select, TextClause, column, func, table, text
+from sqlmodel import select
+
+from app.database.filters import HeroFilters, orm_conditions, sql_conditions
+from app.database.models import Hero
+
+# 🗂️  table_counts no es un modelo: lo describimos con table()/column() para el ORM
+table_counts = table("table_counts", column("name"), column("row_count"))
+
+# 🔍 Total de la tabla: UNA fila por clave primaria
+_TABLE_TOTAL_SQL = text("SELECT row_count FROM table_counts WHERE name = 'heroes'")
+
+# 🧭 Parámetros que dicen DÓNDE está la página: fuera para rel="first"
+_POSITION_PARAMS = ("cursor", "after_id", "offset")
+
+
+def sql_total_statement(filters: HeroFilters) -> tuple[TextClause, dict[str, Any]]:
+    """
+    🔢 Consulta del total para text() (routers de SQL puro, sync y async)
+
+    💡 Las condiciones son las del listado SIN posición (after_id=None):
+    el total no depende de la página.
+    """
+    if filters.index_column is None:
+        return _TABLE_TOTAL_SQL, {}
+    conditions, params = sql_conditions(filters, None, None)
+    return text(f"SELECT count(*) FROM heroes WHERE {' AND '.join(conditions)}"), params
+
+
+def orm_total_statement(filters: HeroFilters) -> Select:
+    """🔢 Consulta del total con el constructor select() (routers ORM, sync y async)"""
+    if filters.index_column is None:
+        return select(table_counts.c.row_count).where(table_counts.c.name == "heroes")
+    return select(func.count()).select_from(Hero).where(*orm_conditions(filters, None, None))
+
+
+def link_header(request: Request, next_cursor: str | None) -> str:
+    """🔗 Cabecera Link: primera página y, si la hay, la siguiente (con su cursor)"""
+    first = request.url.remove_query_params(_POSITION_PARAMS)
+    links = [f'<{first}>; rel="first"']
+    if next_cursor:
+        links.append(f'<{first.include_query_params(cursor=next_cursor)}>; rel="next"')
+    return ", ".join(links)
+
+
+def set_total_headers(response: Response, request: Request, total: int, next_cursor: str | None) -> None:
+    """📨 X-Total-Count + Link en la respuesta (solo con include_total=true)"""
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["Link"] = link_header(request, next_cursor)
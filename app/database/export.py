@@ -0,0 +1,103 @@
+"""
+📤 Streaming Export - Exportación en Streaming 📤
+
+📚 PROPÓSITO EDUCATIVO:
+Este archivo demuestra cómo exportar una tabla completa sin cargarla en memoria:
+las filas viajan desde el cursor de la base de datos hasta el cliente en lotes
+de tamaño fijo, usando un generador y StreamingResponse.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Generadores (yield) para producir datos "bajo demanda"
+- ✅ yield_per / partitions() para leer la BD por lotes
+- ✅ StreamingResponse de FastAPI
+- ✅ Formatos NDJSON y CSV
+
+🧠 MEMORIA:
+.all() / fetchall() → TODAS las filas en una lista (memoria crece con la tabla)
+partitions()        → solo UN lote a la vez (memoria constante)
+
+💡 ¿Por qué el generador abre su propia sesión?
+La respuesta se sigue enviando DESPUÉS de que el endpoint retorna, así que la
+sesión de la request (SessionDep) ya podría estar cerrada. El generador abre
+una sesión propia y la cierra cuando termina de enviar la última fila.
+"""
+import csv
+import io
+import json
+from collections.abc import Iterator, Sequence
+from typing import Any, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Executable, Row
+from sqlmodel import Session
+
+from app.config import settings
+from app.database.share_db_session import pick_read_engine
+
+# 📄 Formatos soportados por los endpoints /export
+ExportFormat = Literal["ndjson", "csv"]
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def stream_partitions(
+    statement: Executable, params: dict[str, Any] | None = None
+) -> Iterator[Sequence[Row]]:
+    """
+    🔄 GENERADOR: Ejecuta la consulta y entrega las filas lote por lote
+
+    📝 FLUJO:
+    1. Abrir una sesión propia (ver nota al inicio del archivo)
+    2. Ejecutar con yield_per para que el cursor no materialice todo
+    3. Entregar cada lote de EXPORT_CHUNK_SIZE filas
+    4. Cerrar la sesión al terminar (o si el cliente se desconecta)
+    """
+    # 📖 Exportar es solo lectura: usa el pool de lectura (no bloquea a los escritores)
+    with Session(pick_read_engine()) as session:
+        result = session.execute(
+            statement,
+            params or {},
+            execution_options={"yield_per": settings.EXPORT_CHUNK_SIZE},
+        )
+        yield from result.partitions()
+
+
+def _ndjson_chunks(partitions: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    """📄 Un objeto JSON por línea: {"id": 1, "name": "...", "age": 30}"""
+    for rows in partitions:
+        yield "".join(
+            json.dumps(row._asdict(), ensure_ascii=False) + "\n" for row in rows
+        ).encode()
+
+
+def _csv_chunks(partitions: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    """📊 Cabecera + filas CSV, reutilizando el mismo buffer para cada lote"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for rows in partitions:
+        if not header_written and rows:
+            writer.writerow(rows[0]._fields)
+            header_written = True
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        # 🧹 Vaciar el buffer para que no crezca con cada lote
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def export_response(partitions: Iterator[Sequence[Row]], fmt: ExportFormat) -> StreamingResponse:
+    """
+    📤 Envuelve el generador de filas en una StreamingResponse del formato pedido
+
+    💡 Content-Disposition sugiere al navegador descargar el archivo
+    """
+    chunks = _csv_chunks(partitions) if fmt == "csv" else _ndjson_chunks(partitions)
+    return StreamingResponse(
+        chunks,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="heroes.{fmt}"'},
+    )
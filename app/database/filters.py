@@ -0,0 +1,312 @@
+"""
+🧮 List Filters - Filtros y Orden que Usan los Índices 🧮
+
+📚 PROPÓSITO EDUCATIVO:
+HeroBase declara index=True en name y age, pero un índice solo sirve si la
+consulta lo puede USAR. Este archivo convierte los filtros del listado
+(min_age, max_age, name, name_prefix, sort) en condiciones SQL que SQLite
+resuelve con una búsqueda (SEARCH) en el índice, no recorriendo la tabla
+(SCAN). Lo usan tanto el router ORM como el de SQL puro.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Rangos "sargables": age >= :min_age usa el índice; abs(age) >= :x no
+- ✅ Prefijos como rango: name >= 'Spi' AND name < 'Spj' (LIKE 'Spi%' no usa
+  el índice en SQLite salvo con COLLATE NOCASE o case_sensitive_like)
+- ✅ Comparación de "row values": (name, id) > (:key, :after_id) para keyset
+- ✅ El "+" unario de SQLite: +age impide usar el índice de age para esa expresión
+- ✅ EXPLAIN QUERY PLAN para comprobarlo (benchmarks/query_plans.py)
+
+🧭 ¿QUÉ ÍNDICE SE USA?
+- Con filtro de nombre (name o name_prefix) → ix_heroes_name
+- Si no, con filtro de edad (min_age/max_age) → ix_heroes_age
+- Sin filtros → el índice del orden pedido (clave primaria, name o age)
+
+⚠️  Sin estadísticas (ANALYZE), SQLite a veces prefiere RECORRER la tabla en
+el orden pedido para no ordenar después (p.ej. age >= 18 ORDER BY id). Si el
+filtro es selectivo, eso recorre millones de filas para llenar una página.
+Por eso, con filtros, las columnas de ORDER BY llevan "+" cuando el índice
+del filtro no da ese orden: así el filtro manda y solo se ordenan las
+filas que lo cumplen.
+
+⚠️  Con filtro de nombre Y de edad, los dos rangos parecen igual de buenos y
+SQLite desempata por el orden en que se crearon los índices (que create_all
+no garantiza). Por eso la edad se compara como +age: el índice lo elige el
+nombre, siempre.
+"""
+from dataclasses import dataclass
+from typing import Annotated, Any, Literal
+
+from fastapi import Depends, HTTPException, Query
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
+
+from app.database.models import SQLITE_INT_MAX, SQLITE_INT_MIN, Hero
+from app.database.pagination import (
+    decode_sort_cursor,
+    encode_cursor,
+    encode_sort_cursor,
+    resolve_after_id,
+)
+
+# 🔃 Órdenes soportados: columna ascendente o "-columna" descendente (id desempata siempre)
+SortOrder = Literal["id", "-id", "name", "-name", "age", "-age"]
+
+# ➕ Operador "+" unario (SQLAlchemy no lo trae): +heroes.age
+_UNARY_PLUS = custom_op("+")
+
+
+@dataclass(frozen=True)
+class HeroFilters:
+    """
+    🧮 FILTROS DEL LISTADO (inmutable → se puede usar como clave de caché)
+    """
+    name: str | None = None
+    name_prefix: str | None = None
+    min_age: int | None = None
+    max_age: int | None = None
+    sort: SortOrder = "id"
+
+    @property
+    def sort_column(self) -> str:
+        return self.sort.removeprefix("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.sort.startswith("-")
+
+    @property
+    def nulls_possible(self) -> bool:
+        """🕳️  ¿Puede haber edades NULL en el orden? (min_age/max_age ya las excluyen)"""
+        return self.sort_column == "age" and self.min_age is None and self.max_age is None
+
+    @property
+    def index_column(self) -> str | None:
+        """🗂️  Columna cuyo índice resuelve los filtros (None = sin filtros)"""
+        if self.name is not None or self.name_prefix is not None:
+            return "name"
+        if self.min_age is not None or self.max_age is not None:
+            return "age"
+        return None
+
+    @property
+    def index_gives_order(self) -> bool:
+        """
+        📐 ¿El índice elegido ya entrega las filas en el orden pedido?
+
+        - Sin filtros: sí (cada orden tiene su índice)
+        - El índice es (columna, id): sirve para ordenar por esa columna
+        - Con name exacto, todas las filas tienen el mismo nombre → salen por id
+        """
+        index = self.index_column
+        return (
+            index is None
+            or index == self.sort_column
+            or (self.name is not None and self.sort_column == "id")
+        )
+
+
+# 🔤 Límites de Unicode para prefix_upper_bound()
+_MAX_CODE_POINT = 0x10FFFF
+_SURROGATES_START, _SURROGATES_END = 0xD800, 0xDFFF
+
+
+def prefix_upper_bound(prefix: str) -> str | None:
+    """
+    🔤 Primer texto que YA NO empieza por prefix: "Spi" → "Spj"
+
+    💡 name >= 'Spi' AND name < 'Spj' es exactamente "empieza por Spi"
+    (comparación binaria, la que usa SQLite por defecto: en UTF-8 coincide
+    con el orden de los code points)
+
+    ⚠️  CASOS LÍMITE:
+    - Último carácter U+10FFFF: no tiene siguiente → se quita y se incrementa el anterior
+    - U+D7FF → U+E000: los surrogates (D800-DFFF) no se pueden codificar en UTF-8
+    - Solo caracteres U+10FFFF: no hay límite → None (basta con name >= prefix)
+    """
+    stem = prefix.rstrip(chr(_MAX_CODE_POINT))
+    if not stem:
+        return None
+    following = ord(stem[-1]) + 1
+    if _SURROGATES_START <= following <= _SURROGATES_END:
+        following = _SURROGATES_END + 1
+    return stem[:-1] + chr(following)
+
+
+def hero_filters(
+    name: Annotated[str | None, Query(min_length=1, max_length=100)] = None,
+    name_prefix: Annotated[str | None, Query(min_length=1, max_length=100)] = None,
+    min_age: Annotated[int | None, Query(ge=0, le=SQLITE_INT_MAX)] = None,
+    max_age: Annotated[int | None, Query(ge=0, le=SQLITE_INT_MAX)] = None,
+    sort: SortOrder = "id",
+) -> HeroFilters:
+    """🔌 DEPENDENCIA: lee y valida los filtros de la query string"""
+    if min_age is not None and max_age is not None and min_age > max_age:
+        raise HTTPException(status_code=400, detail="min_age cannot be greater than max_age")
+    return HeroFilters(name=name, name_prefix=name_prefix, min_age=min_age, max_age=max_age, sort=sort)
+
+
+# 📝 ANOTACIÓN DE TIPO: igual que SessionDep
+HeroFiltersDep = Annotated[HeroFilters, Depends(hero_filters)]
+
+
+# 📄 POSICIÓN (keyset) ---------------------------------------------------------
+
+def resolve_list_position(
+    cursor: str | None, after_id: int | None, offset: int, filters: HeroFilters
+) -> tuple[int | None, Any]:
+    """
+    🧭 Desde dónde continuar: (after_id, key)
+
+    📝 Con sort=id/-id basta el id (cursor clásico o after_id). Con otros
+    órdenes hace falta también el valor de la columna (key), que solo viaja
+    dentro del cursor.
+    """
+    if filters.sort_column == "id":
+        return resolve_after_id(cursor, after_id, offset), None
+    if after_id is not None:
+        raise HTTPException(status_code=400, detail="after_id only works with sort=id or sort=-id; use cursor")
+    if cursor is None:
+        return None, None
+    if offset:
+        raise HTTPException(status_code=400, detail="offset cannot be combined with a cursor")
+
+    key, last_id = decode_sort_cursor(cursor, filters.sort)
+    valid = isinstance(key, str) if filters.sort_column == "name" else key is None or (
+        isinstance(key, int) and not isinstance(key, bool) and SQLITE_INT_MIN <= key <= SQLITE_INT_MAX
+    )
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id, key
+
+
+def next_list_cursor(rows: list[tuple[Any, int]], limit: int, filters: HeroFilters) -> str | None:
+    """⏭️  Cursor de la página siguiente a partir de filas (valor de la columna, id)"""
+    if not limit or len(rows) != limit:
+        return None
+    key, last_id = rows[-1]
+    if filters.sort_column == "id":
+        return encode_cursor(last_id)
+    return encode_sort_cursor(filters.sort, key, last_id)
+
+
+# 🦸‍♂️ VERSIÓN ORM ------------------------------------------------------------
+
+def _orm_column(filters: HeroFilters, name: str):
+    column = getattr(Hero, name)
+    if filters.index_gives_order:
+        return column
+    # ➕ +columna: SQLite no puede usar su índice para ordenar → manda el del filtro
+    return UnaryExpression(column, operator=_UNARY_PLUS, type_=column.type)
+
+
+def orm_conditions(filters: HeroFilters, after_id: int | None, key: Any) -> list:
+    """🏗️  Condiciones WHERE del ORM: filtros + keyset"""
+    conditions = []
+    if filters.name is not None:
+        conditions.append(Hero.name == filters.name)
+    if filters.name_prefix is not None:
+        conditions.append(Hero.name >= filters.name_prefix)
+        prefix_end = prefix_upper_bound(filters.name_prefix)
+        if prefix_end is not None:
+            conditions.append(Hero.name < prefix_end)
+    # ➕ Si el índice es el de name, +age: el rango de edad solo filtra
+    age = Hero.age if filters.index_column == "age" else UnaryExpression(
+        Hero.age, operator=_UNARY_PLUS, type_=Hero.age.type
+    )
+    if filters.min_age is not None:
+        conditions.append(age >= filters.min_age)
+    if filters.max_age is not None:
+        conditions.append(age <= filters.max_age)
+
+    if after_id is None:
+        return conditions
+
+    hero_id = _orm_column(filters, "id")
+    if filters.sort_column == "id":
+        conditions.append(hero_id < after_id if filters.descending else hero_id > after_id)
+        return conditions
+
+    column = _orm_column(filters, filters.sort_column)
+    after = tuple_(column, hero_id)
+    if key is None:
+        # 🕳️  La página anterior terminó en edades NULL (van primero en ASC, al final en DESC)
+        null_rest = and_(column.is_(None), hero_id < after_id if filters.descending else hero_id > after_id)
+        conditions.append(null_rest if filters.descending else or_(null_rest, column.is_not(None)))
+    elif filters.descending:
+        rest = after < tuple_(key, after_id)
+        conditions.append(or_(rest, column.is_(None)) if filters.nulls_possible else rest)
+    else:
+        conditions.append(after > tuple_(key, after_id))
+    return conditions
+
+
+def orm_order_by(filters: HeroFilters) -> list:
+    """🔃 ORDER BY del ORM: la columna pedida y, si no es id, id para desempatar"""
+    names = [filters.sort_column] if filters.sort_column == "id" else [filters.sort_column, "id"]
+    columns = [_orm_column(filters, name) for name in names]
+    return [column.desc() for column in columns] if filters.descending else columns
+
+
+# 🦸‍♂️ VERSIÓN SQL PURO ---------------------------------------------------------
+
+def _sql_column(filters: HeroFilters, name: str) -> str:
+    # 🔒 name siempre sale de SortOrder/lista fija, nunca del usuario
+    return name if filters.index_gives_order else f"+{name}"
+
+
+def sql_conditions(filters: HeroFilters, after_id: int | None, key: Any) -> tuple[list[str], dict]:
+    """
+    🏗️  Fragmentos WHERE y parámetros para text()
+
+    ⚠️  Los fragmentos son FIJOS; los valores del usuario van siempre como :parámetros
+    """
+    conditions: list[str] = []
+    params: dict[str, Any] = {}
+    if filters.name is not None:
+        conditions.append("name = :name")
+        params["name"] = filters.name
+    if filters.name_prefix is not None:
+        conditions.append("name >= :prefix")
+        params["prefix"] = filters.name_prefix
+        prefix_end = prefix_upper_bound(filters.name_prefix)
+        if prefix_end is not None:
+            conditions.append("name < :prefix_end")
+            params["prefix_end"] = prefix_end
+    # ➕ Si el índice es el de name, +age: el rango de edad solo filtra
+    age = "age" if filters.index_column == "age" else "+age"
+    if filters.min_age is not None:
+        conditions.append(f"{age} >= :min_age")
+        params["min_age"] = filters.min_age
+    if filters.max_age is not None:
+        conditions.append(f"{age} <= :max_age")
+        params["max_age"] = filters.max_age
+
+    if after_id is None:
+        return conditions, params
+
+    params["after_id"] = after_id
+    hero_id = _sql_column(filters, "id")
+    op = "<" if filters.descending else ">"
+    if filters.sort_column == "id":
+        conditions.append(f"{hero_id} {op} :after_id")
+        return conditions, params
+
+    column = _sql_column(filters, filters.sort_column)
+    if key is None:
+        null_rest = f"({column} IS NULL AND {hero_id} {op} :after_id)"
+        conditions.append(null_rest if filters.descending else f"({null_rest} OR {column} IS NOT NULL)")
+    else:
+        params["key"] = key
+        row_value = f"({column}, {hero_id}) {op} (:key, :after_id)"
+        # 🕳️  En DESC las edades NULL van al final: siguen pendientes tras cualquier edad
+        nulls_pending = filters.descending and filters.nulls_possible
+        conditions.append(f"({row_value} OR {column} IS NULL)" if nulls_pending else row_value)
+    return conditions, params
+
+
+def sql_order_by(filters: HeroFilters) -> str:
+    """🔃 Texto del ORDER BY para text()"""
+    names = [filters.sort_column] if filters.sort_column == "id" else [filters.sort_column, "id"]
+    direction = " DESC" if filters.descending else ""
+    return ", ".join(f"{_sql_column(filters, name)}{direction}" for name in names)
@@ -0,0 +1,217 @@
+"""
+📮 Group Commit - Varias Escrituras, Una Sola Transacción 📮
+
+📚 PROPÓSITO EDUCATIVO:
+SQLite solo admite UN escritor a la vez. Si 32 requests hacen POST a la vez,
+cada una espera el lock de escritura, hace su INSERT y confirma su propia
+transacción: 32 commits en fila. Con "group commit" las requests entregan su
+trabajo a UN hilo escritor, que junta lo pendiente y lo confirma en una sola
+transacción. Cuanta más concurrencia, más escrituras por commit.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Un hilo de fondo con una cola (queue.Queue) como único escritor
+- ✅ concurrent.futures.Future: la request espera SU resultado (o SU error)
+- ✅ SAVEPOINT (session.begin_nested()): si una escritura falla, solo se
+  deshace la suya y el resto del lote se confirma
+- ✅ BEGIN IMMEDIATE explícito: sin él, pysqlite deja los SAVEPOINT fuera de
+  toda transacción y cada RELEASE confirmaría su trabajo por separado
+- ✅ Agrupación "natural": mientras se confirma un lote, se acumula el siguiente
+
+⚙️  ACTIVACIÓN:
+WRITE_MODE=group en .env (por defecto "direct": cada request confirma la suya).
+- GROUP_COMMIT_WINDOW_MS: cuánto espera el escritor a que lleguen más trabajos
+  (0 = no espera; sube si cada commit es caro, p.ej. con SQLITE_SYNCHRONOUS=FULL)
+- GROUP_COMMIT_MAX_BATCH: máximo de trabajos por transacción
+
+📝 FLUJO:
+1. El endpoint llama run_write(session, trabajo)
+2. Con WRITE_MODE=group el trabajo entra en la cola y la request espera
+3. El escritor saca todo lo pendiente (hasta la ventana o el máximo)
+4. Ejecuta los trabajos (con SAVEPOINT solo si alguno falla) y hace UN commit
+5. Cada request recibe su resultado, o la excepción de su trabajo (404...)
+
+⚠️  Un trabajo NO debe hacer commit ni rollback: de eso se encarga run_write.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+
+from sqlmodel import Session
+
+from app.config import settings
+from app.database.share_db_session import WriteSession, engine
+from app.metrics import db_write_batch_size
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 📝 Un trabajo de escritura: recibe una sesión, escribe y devuelve su resultado
+WriteWork = Callable[[Session], T]
+
+# 🛑 Marca en la cola para que el hilo escritor termine
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    📮 ESCRITOR DE FONDO: agrupa trabajos de escritura en transacciones compartidas
+
+    💡 El hilo arranca con el primer trabajo (o con start()) y termina con
+    stop(), que confirma lo que quede pendiente antes de salir.
+    """
+
+    def __init__(self, window_seconds: float, max_batch: int):
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def submit(self, work: WriteWork) -> T:
+        """⏳ Entrega el trabajo al escritor y espera su resultado (o lanza su excepción)"""
+        self.start()
+        future: Future = Future()
+        self._queue.put((work, future))
+        return future.result()
+
+    # 🧵 HILO ESCRITOR ---------------------------------------------------------
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            batch = [job]
+            # ⏱️  Recoger lo que llegue durante la ventana (o lo ya pendiente) hasta el máximo
+            deadline = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: list[tuple[WriteWork, Future]]) -> None:
+        """💾 Ejecuta los trabajos del lote y los confirma con un solo commit"""
+        try:
+            with Session(engine) as session:
+                outcomes = self._run_jobs(session, batch)
+                session.commit()
+        except Exception as error:
+            # 💥 Falló el commit (o la conexión): ninguna escritura del lote se guardó
+            logger.exception("group_commit_failed", extra={"batch": len(batch)})
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        db_write_batch_size.observe(len(batch))
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    @staticmethod
+    def _run_jobs(session: Session, batch: list[tuple[WriteWork, Future]]) -> list[tuple[Future, bool, object]]:
+        """
+        🏃 Ejecuta los trabajos: (future, ¿bien?, resultado o excepción) por cada uno
+
+        🎲 OPTIMISTA: primero todos seguidos, sin SAVEPOINT (2 sentencias
+        menos por trabajo). Si alguno falla, se deshace TODO y se repite el
+        lote con un SAVEPOINT por trabajo, para que el fallo solo deshaga lo
+        suyo. Los trabajos solo escriben en la sesión, así que repetirlos
+        tras el rollback es seguro.
+        """
+        outcomes = []
+        _begin(session)
+        for work, future in batch:
+            try:
+                outcomes.append((future, True, work(session)))
+            except Exception as error:
+                session.rollback()
+                if len(batch) == 1:
+                    return [(future, False, error)]
+                break
+        else:
+            return outcomes
+
+        outcomes = []
+        _begin(session)
+        for work, future in batch:
+            try:
+                # 🔖 SAVEPOINT: si este trabajo falla, solo se deshace lo suyo
+                with session.begin_nested():
+                    outcomes.append((future, True, work(session)))
+            except Exception as error:
+                outcomes.append((future, False, error))
+        return outcomes
+
+
+def _begin(session: Session) -> None:
+    """
+    🔒 Abre la transacción del lote de forma explícita
+
+    ⚠️  pysqlite solo abre transacción (BEGIN implícito) antes de un
+    INSERT/UPDATE/DELETE. Un SAVEPOINT fuera de transacción abre una propia y su
+    RELEASE la CONFIRMA: cada trabajo quedaría guardado aunque el lote acabe en
+    rollback. Con el BEGIN delante, los SAVEPOINT anidan dentro y solo el
+    commit final escribe en disco.
+    💡 IMMEDIATE: el escritor toma el lock de escritura al empezar, como el importador.
+    """
+    session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+
+# 🌍 INSTANCIA GLOBAL: un único escritor para toda la aplicación
+group_writer = GroupCommitWriter(
+    window_seconds=settings.GROUP_COMMIT_WINDOW_MS / 1000,
+    max_batch=settings.GROUP_COMMIT_MAX_BATCH,
+)
+
+
+def run_write(session: Session, work: WriteWork) -> T:
+    """
+    ✏️  Ejecuta un trabajo de escritura y lo confirma
+
+    - WRITE_MODE=direct: en la sesión de la request, con su propio commit
+    - WRITE_MODE=group: en el escritor de fondo, junto con otras requests
+
+    📝 Si el trabajo lanza una excepción (p.ej. HTTPException 404) se deshace
+    y la excepción llega al endpoint igual en los dos modos.
+    """
+    if settings.WRITE_MODE != "group":
+        try:
+            result = work(session)
+        except Exception:
+            session.rollback()
+            raise
+        session.commit()
+        return result
+
+    result = group_writer.submit(work)
+    if isinstance(session, WriteSession):
+        # 📖 Lee-lo-que-escribiste: las lecturas siguientes de la request van al principal
+        session.writes.committed = True
+    return result
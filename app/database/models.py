@@ -19,11 +19,25 @@ y separación de responsabilidades para crear APIs seguras y bien estructuradas.
 - HeroPublic: Schema para respuestas (sin secret_name)
 - HeroCreate: Schema para creación (con secret_name)
 - HeroUpdate: Schema para actualización (todos opcionales)
+- HeroBulkItem / HeroBulkResult: Schemas para carga masiva
+- HeroBulkUpdateItem / HeroBulkDelete / HeroBulkWriteResult: PATCH y DELETE masivos
+- HeroBatchRequest / HeroBatchResult: Schemas para leer muchos héroes por ID
+- HeroChange / HeroChangesPage: Schemas del change feed (GET /heroes/changes)
 
 ⚠️  SEGURIDAD: secret_name NO se expone en HeroPublic
 """
+from typing import Annotated, Literal
+
 from sqlmodel import Field, SQLModel
 
+# 🔢 Rango de un INTEGER de SQLite (64 bits con signo)
+SQLITE_INT_MIN = -(2**63)
+SQLITE_INT_MAX = 2**63 - 1
+
+# 🆔 ID de héroe recibido en un body: fuera de ese rango → 422
+# 💡 Sin el límite, el driver no puede ni enviar el número (OverflowError → 500)
+HeroId = Annotated[int, Field(ge=SQLITE_INT_MIN, le=SQLITE_INT_MAX)]
+
 class HeroBase(SQLModel):
     """
     🏗️  CLASE BASE: Campos comunes para todos los schemas de Hero
@@ -135,6 +149,181 @@ class HeroUpdate(HeroBase):
     secret_name: str | None = None
 
 
+class HeroBulkItem(HeroCreate):
+    """
+    📦 SCHEMA DE CARGA MASIVA: Un elemento de POST /heroes/bulk
+    
+    Conceptos que aprenderás:
+    - Hereda todo de HeroCreate (name, age, secret_name)
+    - Añade un ID OPCIONAL para poder hacer "upsert"
+    
+    📝 EJEMPLO DE REQUEST:
+    POST /heroes/bulk?upsert=true
+    [
+        {"name": "Thor", "secret_name": "Thor Odinson"},           // ➕ Nuevo
+        {"id": 1, "name": "Spider-Man", "secret_name": "Peter"}    // 🔄 Reemplaza el 1
+    ]
+    
+    💡 ¿Qué es un upsert?
+    INSERT + UPDATE: si el ID ya existe se actualiza, si no existe se inserta.
+    """
+    
+    # 🆔 ID opcional: solo se usa para actualizar héroes existentes (upsert)
+    id: HeroId | None = None
+
+
+class HeroBulkResult(SQLModel):
+    """
+    📊 RESPUESTA DE CARGA MASIVA: IDs generados, en el mismo orden del request
+    
+    📝 EJEMPLO DE RESPUESTA:
+    {"ids": [10, 1, 11]}
+    """
+    
+    # 🆔 ids[i] corresponde al elemento i enviado en el request
+    ids: list[int]
+
+
+class HeroBulkUpdateItem(HeroUpdate):
+    """
+    ✏️  SCHEMA DE ACTUALIZACIÓN MASIVA: Un elemento de PATCH /heroes/bulk
+    
+    Conceptos que aprenderás:
+    - Hereda de HeroUpdate: todos los campos opcionales (actualización parcial)
+    - Añade el ID OBLIGATORIO del héroe a actualizar
+    
+    📝 EJEMPLO DE REQUEST:
+    PATCH /heroes/bulk
+    [
+        {"id": 1, "age": 26},                        // Solo la edad
+        {"id": 2, "age": 40},                        // Mismas columnas → mismo UPDATE
+        {"id": 3, "name": "Thor", "age": 1500}       // Otras columnas → otro UPDATE
+    ]
+    """
+    
+    # 🆔 Héroe a actualizar (obligatorio)
+    id: HeroId
+
+
+class HeroBulkDeleteFilter(SQLModel):
+    """
+    🧮 FILTRO DE BORRADO MASIVO: los mismos filtros que GET /heroes/
+    
+    ⚠️  Al menos uno es obligatorio: un filtro vacío borraría TODOS los héroes
+    """
+    
+    name: str | None = Field(default=None, min_length=1, max_length=100)
+    name_prefix: str | None = Field(default=None, min_length=1, max_length=100)
+    min_age: int | None = Field(default=None, ge=0, le=SQLITE_INT_MAX)
+    max_age: int | None = Field(default=None, ge=0, le=SQLITE_INT_MAX)
+
+
+class HeroBulkDelete(SQLModel):
+    """
+    🗑️  REQUEST DE BORRADO MASIVO: body de DELETE /heroes/bulk
+    
+    📝 EJEMPLOS DE REQUEST (uno u otro, no los dos):
+    {"ids": [1, 2, 999]}
+    {"filter": {"name_prefix": "Test", "max_age": 10}}
+    """
+    
+    # 🆔 IDs concretos a borrar
+    ids: list[HeroId] | None = None
+    
+    # 🧮 O bien: borrar todos los héroes que cumplan el filtro
+    filter: HeroBulkDeleteFilter | None = None
+
+
+class HeroBulkOutcome(SQLModel):
+    """📋 Resultado de UN héroe en un PATCH/DELETE masivo"""
+    
+    id: int
+    
+    # ✅ updated/deleted: se escribió | ➖ unchanged: no se envió ningún campo
+    # ❓ not_found: no existe ningún héroe con ese ID
+    status: Literal["updated", "unchanged", "deleted", "not_found"]
+
+
+class HeroBulkWriteResult(SQLModel):
+    """
+    📊 RESPUESTA DE PATCH/DELETE MASIVO: un resultado por ID, en el orden del request
+    
+    📝 EJEMPLO DE RESPUESTA:
+    {"results": [{"id": 1, "status": "deleted"}, {"id": 999, "status": "not_found"}]}
+    """
+    
+    results: list[HeroBulkOutcome]
+
+
+class HeroBatchRequest(SQLModel):
+    """
+    🧺 REQUEST DE LECTURA POR LOTES: body de POST /heroes/batch
+    
+    💡 Es lo mismo que GET /heroes/batch?ids=1,2,3, pero para listas que no
+    caben en una URL.
+    
+    📝 EJEMPLO DE REQUEST:
+    {"ids": [3, 1, 999]}
+    """
+    
+    # 🆔 IDs a buscar, en el orden en que se quieren recibir
+    ids: list[HeroId]
+
+
+class HeroBatchResult(SQLModel):
+    """
+    🧺 RESPUESTA DE LECTURA POR LOTES: héroes encontrados + IDs que no existen
+    
+    📝 EJEMPLO DE RESPUESTA (para ids=3,1,999):
+    {
+        "heroes": [{"name": "Thor", "age": null, "id": 3}, {"name": "Spider-Man", "age": 25, "id": 1}],
+        "missing": [999]
+    }
+    """
+    
+    # 🦸 Héroes en el orden pedido (un ID repetido aparece una vez)
+    heroes: list[HeroPublic]
+    
+    # ❓ IDs que no existen (en lugar de un 404 para toda la request)
+    missing: list[int]
+
+
+class HeroChange(SQLModel):
+    """
+    📰 UN CAMBIO del changelog (lo escriben los triggers en cada escritura)
+    
+    📝 EJEMPLO:
+    {"seq": 42, "op": "update", "hero_id": 7, "fields": ["age"]}
+    """
+    
+    # 🔢 Posición en el changelog: crece siempre y nunca se repite
+    seq: int
+    op: Literal["insert", "update", "delete"]
+    hero_id: int
+    
+    # ✏️  Solo en los update: qué campos cambiaron (los valores, con GET /heroes/batch)
+    fields: list[str] | None = None
+
+
+class HeroChangesPage(SQLModel):
+    """
+    📰 RESPUESTA DE GET /heroes/changes: cambios posteriores a `since`
+    
+    📝 EJEMPLO DE RESPUESTA (para since=41):
+    {"changes": [{"seq": 42, "op": "delete", "hero_id": 7, "fields": null}], "next": 42, "head": 42, "has_more": false}
+    """
+    
+    changes: list[HeroChange]
+    
+    # ➡️  `since` de la siguiente llamada (el último seq devuelto)
+    next: int
+    
+    # 🔝 Último seq del changelog en este momento
+    head: int
+    
+    # 📄 True = hay más cambios: volver a llamar enseguida con since=next
+    has_more: bool
+
 
 class Hero(HeroBase, table=True):
     """
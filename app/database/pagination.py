@@ -0,0 +1,152 @@
+"""
+📄 Keyset Pagination - Paginación por Cursor 📄
+
+📚 PROPÓSITO EDUCATIVO:
+Este archivo demuestra la paginación por "keyset" (también llamada paginación
+por cursor), la alternativa eficiente a LIMIT/OFFSET para tablas grandes.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Por qué OFFSET se vuelve lento en páginas profundas
+- ✅ Búsqueda (seek) sobre la clave primaria con WHERE id > :after_id
+- ✅ Cursores opacos codificados en base64
+- ✅ Validación de parámetros con errores HTTP 400
+
+🐢 EL PROBLEMA DE OFFSET:
+"LIMIT 100 OFFSET 1000000" obliga a SQLite a recorrer y DESCARTAR un millón de
+filas antes de devolver las 100 que pediste. La página 10.000 es miles de veces
+más lenta que la página 1.
+
+🚀 LA SOLUCIÓN KEYSET:
+"WHERE id > :after_id ORDER BY id LIMIT 100" salta directamente a la posición
+usando el índice de la clave primaria. Cada página cuesta lo mismo, sin importar
+qué tan profunda sea.
+"""
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+from app.database.models import SQLITE_INT_MAX, SQLITE_INT_MIN
+
+
+def _encode(payload: dict) -> str:
+    """📦 dict → JSON compacto → base64 url-safe sin relleno"""
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    """📦 Inverso de _encode(); cualquier fallo es un HTTP 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
+
+
+def _is_int(value) -> bool:
+    # ⚠️  En Python bool es subclase de int: True no es un ID válido
+    # ⚠️  Y SQLite no admite enteros fuera de 64 bits (OverflowError → 500)
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and SQLITE_INT_MIN <= value <= SQLITE_INT_MAX
+    )
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    🔐 Codifica el último ID de una página como un cursor opaco
+
+    💡 ¿Por qué opaco?
+    El cliente solo debe devolver el cursor tal cual, sin interpretarlo.
+    Así podemos cambiar su contenido en el futuro sin romper a nadie.
+    """
+    return _encode({"after_id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    🔓 Decodifica un cursor opaco y devuelve el ID desde el que continuar
+
+    ⚠️  Un cursor manipulado o corrupto produce un HTTP 400 (Bad Request)
+    """
+    after_id = _decode(cursor).get("after_id")
+    if not _is_int(after_id):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return after_id
+
+
+def encode_sort_cursor(sort: str, key, last_id: int) -> str:
+    """
+    🔐 Cursor para listados ordenados por otra columna (name, age...)
+
+    💡 Guarda el valor de esa columna en la última fila (key) y su id para
+    desempatar, y también el orden: un cursor de sort=name no vale para sort=age.
+    """
+    return _encode({"sort": sort, "key": key, "after_id": last_id})
+
+
+def decode_sort_cursor(cursor: str, sort: str) -> tuple[object, int]:
+    """🔓 Devuelve (key, id) de la última fila; 400 si el cursor es de otro orden"""
+    payload = _decode(cursor)
+    after_id = payload.get("after_id")
+    if payload.get("sort") != sort or "key" not in payload or not _is_int(after_id):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload["key"], after_id
+
+
+def encode_rank_cursor(rank: float, last_id: int) -> str:
+    """
+    🔐 Cursor para resultados ORDENADOS POR RELEVANCIA (búsqueda)
+
+    💡 El orden es (rank, id): el rank solo no basta porque dos héroes
+    pueden empatar; el id desempata y hace el orden total.
+    """
+    return _encode({"rank": rank, "after_id": last_id})
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """🔓 Devuelve (rank, id) de la última fila de la página anterior"""
+    payload = _decode(cursor)
+    rank, after_id = payload.get("rank"), payload.get("after_id")
+    if not _is_int(after_id) or not isinstance(rank, (int, float)) or isinstance(rank, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return float(rank), after_id
+
+
+def resolve_after_id(cursor: str | None, after_id: int | None, offset: int) -> int | None:
+    """
+    🧭 Decide desde qué ID continuar a partir de los parámetros de la request
+
+    📝 REGLAS:
+    - cursor (opaco) y after_id (explícito) son dos formas de decir lo mismo
+    - offset solo existe por compatibilidad y NO se puede combinar con un cursor
+    - Si no se envía nada, se empieza desde el principio (None)
+    """
+    if cursor is not None and after_id is not None:
+        raise HTTPException(status_code=400, detail="Use either cursor or after_id, not both")
+
+    if cursor is not None:
+        after_id = decode_cursor(cursor)
+
+    if after_id is not None and offset:
+        raise HTTPException(status_code=400, detail="offset cannot be combined with a cursor")
+
+    return after_id
+
+
+def next_rank_cursor_for(rows: list[tuple[float, int]], limit: int) -> str | None:
+    """
+    ⏭️  Cursor de la siguiente página de una búsqueda (filas (rank, id))
+
+    💡 Si la página vino llena (len == limit) puede haber más filas;
+    si vino incompleta, llegamos al final y no hay siguiente cursor.
+    """
+    if limit and len(rows) == limit:
+        return encode_rank_cursor(*rows[-1])
+    return None
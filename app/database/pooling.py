@@ -0,0 +1,230 @@
+"""
+🏊 Connection Pooling - Pool de Conexiones Configurable y Medido 🏊
+
+📚 PROPÓSITO EDUCATIVO:
+Abrir una conexión a SQLite (y aplicarle los PRAGMAs) cuesta mucho más que
+reutilizar una abierta: por eso el engine guarda un POOL. Su tamaño decide
+cuántas requests pueden usar la BD a la vez; si se queda corto, las demás
+ESPERAN una conexión libre (hasta POOL_TIMEOUT) y esa espera no aparece en
+ninguna consulta SQL. Este módulo elige el pool según la URL, deja ajustar
+cada parámetro desde Settings y mide cuánto tarda cada checkout.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ QueuePool, StaticPool y NullPool: cuándo conviene cada uno
+- ✅ pool_size + max_overflow: conexiones permanentes y temporales
+- ✅ pool_timeout, pool_recycle, pool_pre_ping
+- ✅ Medir la espera del pool: una subclase que cronometra connect()
+
+🧭 PRESETS (POOL_CLASS=auto):
+- SQLite en archivo → QueuePool 8 + 32 de overflow: hasta 40 conexiones, las
+  mismas que threads tiene el pool de anyio para los endpoints "def"
+- SQLite :memory: → StaticPool: UNA conexión compartida (cada conexión nueva
+  a :memory: sería una BD distinta y vacía)
+- Otra BD (PostgreSQL, MySQL...) → QueuePool 5 + 10, pre_ping y recycle de
+  30 min (el servidor puede cerrar conexiones inactivas)
+
+⚠️  ¿Y un pool por thread (SingletonThreadPool)? En esta app una sesión pasa
+de un thread a otro (la dependencia y el endpoint corren en threads distintos
+del pool de anyio): un pool por thread le daría la MISMA conexión a dos
+requests a la vez. Por eso no es una opción.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool, StaticPool
+
+from app.config import settings
+from app.metrics import db_pool_checkout_seconds, db_pool_timeouts_total
+
+
+@dataclass(frozen=True)
+class PoolPreset:
+    """🎛️  Valores por defecto de un tipo de BD (Settings puede cambiar cada uno)"""
+    pool: str
+    size: int = 5
+    max_overflow: int = 10
+    timeout: float = 30.0
+    recycle: int = -1
+    pre_ping: bool = False
+
+
+PRESETS = {
+    "sqlite-file": PoolPreset("queue", size=8, max_overflow=32, timeout=10.0),
+    "sqlite-memory": PoolPreset("static"),
+    "server": PoolPreset("queue", size=5, max_overflow=10, timeout=30.0, recycle=1800, pre_ping=True),
+}
+
+
+class PoolStats:
+    """
+    📊 Contadores del pool de UN engine
+
+    💡 Viven en la clase del pool (no en la instancia): engine.dispose() crea
+    un pool nuevo con la misma clase, así que las estadísticas sobreviven.
+    """
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.pool: Pool | None = None  # 🔗 El pool actual (se actualiza si se recrea)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0  # ⏳ Threads esperando una conexión AHORA
+        self.peak_checked_out = 0
+        self.max_checkout_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def started(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def finished(self, seconds: float, timed_out: bool | None) -> None:
+        """📝 timed_out: False = conexión entregada, True = timeout, None = error al abrirla"""
+        with self._lock:
+            self.waiting -= 1
+            if timed_out is None:
+                return
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+            checked_out = getattr(self.pool, "checkedout", None)
+            if callable(checked_out):
+                self.peak_checked_out = max(self.peak_checked_out, checked_out())
+
+
+class TimedPool:
+    """
+    ⏱️  MIXIN: cronometra cada pool.connect() (esperar + abrir + pre_ping)
+
+    📝 Se combina con la clase real del pool (ver pool_options()):
+    class TimedQueuePool(TimedPool, QueuePool)
+    """
+
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats.pool = self
+
+    def connect(self):
+        stats = self.stats
+        stats.started()
+        start = time.perf_counter()
+        timed_out = True
+        try:
+            connection = super().connect()
+            timed_out = False
+            return connection
+        except exc.TimeoutError:
+            # 🚫 "QueuePool limit ... reached": nadie devolvió una conexión a tiempo
+            db_pool_timeouts_total.inc(stats.name)
+            raise
+        except Exception:
+            # 💥 Fallo al abrir la conexión: ni checkout ni timeout
+            timed_out = None
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.finished(elapsed, timed_out)
+            if timed_out is False:
+                db_pool_checkout_seconds.observe(elapsed, stats.name)
+
+
+# 🗂️  Estadísticas por nombre de engine ("sync", "read-0", "async"...)
+pool_stats: dict[str, PoolStats] = {}
+
+
+def _preset_name(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return "server"
+    database = parsed.database or ""
+    in_memory = not database or database == ":memory:" or "mode=memory" in str(parsed)
+    return "sqlite-memory" if in_memory else "sqlite-file"
+
+
+def resolve_pool(url: str) -> dict[str, Any]:
+    """
+    🧭 Configuración final del pool para `url`: preset + lo definido en Settings
+
+    📝 Devuelve {"pool": "queue", "size": 8, ...} (lo que enseña /debug/pool)
+    """
+    preset = PRESETS[_preset_name(url)]
+    overrides = {
+        "size": settings.POOL_SIZE,
+        "max_overflow": settings.POOL_MAX_OVERFLOW,
+        "timeout": settings.POOL_TIMEOUT,
+        "recycle": settings.POOL_RECYCLE,
+        "pre_ping": settings.POOL_PRE_PING,
+    }
+    config = {
+        "pool": preset.pool if settings.POOL_CLASS == "auto" else settings.POOL_CLASS,
+        "size": preset.size,
+        "max_overflow": preset.max_overflow,
+        "timeout": preset.timeout,
+        "recycle": preset.recycle,
+        "pre_ping": preset.pre_ping,
+    }
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    return config
+
+
+def pool_options(url: str, name: str, *, is_async: bool = False) -> dict[str, Any]:
+    """
+    🔧 Argumentos de create_engine() / create_async_engine() para el pool de `url`
+
+    💡 Solo QueuePool acepta tamaño, overflow y timeout (pasárselos a StaticPool
+    o NullPool es un error de SQLAlchemy)
+    """
+    config = resolve_pool(url)
+    base = {
+        "queue": AsyncAdaptedQueuePool if is_async else QueuePool,
+        "static": StaticPool,
+        "null": NullPool,
+    }[config["pool"]]
+    stats = pool_stats[name] = PoolStats(name, url)
+    options: dict[str, Any] = {
+        # 📛 __module__ del pool original: SQLAlchemy nombra el logger del pool por su
+        # módulo, y así sus mensajes siguen en "sqlalchemy.pool" y no bajo "app"
+        "poolclass": type(
+            f"Timed{base.__name__}", (TimedPool, base), {"stats": stats, "__module__": base.__module__}
+        ),
+        "pool_recycle": config["recycle"],
+        "pool_pre_ping": config["pre_ping"],
+    }
+    if config["pool"] == "queue":
+        options.update(
+            pool_size=config["size"],
+            max_overflow=config["max_overflow"],
+            pool_timeout=config["timeout"],
+        )
+    return options
+
+
+def pool_report(stats: PoolStats) -> dict[str, Any]:
+    """📋 Configuración + estado actual + contadores de un pool (para /debug/pool)"""
+    config = resolve_pool(stats.url)
+    if config["pool"] != "queue":
+        for key in ("size", "max_overflow", "timeout"):
+            config.pop(key)
+    state = {}
+    for key, method_name in (("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow")):
+        method = getattr(stats.pool, method_name, None)
+        if callable(method):
+            state[key] = method()
+    return {
+        **config,
+        **state,
+        "waiting": stats.waiting,
+        "peak_checked_out": stats.peak_checked_out,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "max_checkout_ms": round(stats.max_checkout_seconds * 1000, 3),
+        "checkout_seconds": db_pool_checkout_seconds.snapshot(stats.name),
+    }
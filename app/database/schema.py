@@ -0,0 +1,280 @@
+"""
+🏗️  Schema Bootstrap - Creación del Esquema de la Base de Datos 🏗️
+
+📚 PROPÓSITO EDUCATIVO:
+Este archivo crea TODO lo que la aplicación necesita en la base de datos:
+las tablas de los modelos SQLModel y los objetos extra de SQLite (tablas
+auxiliares y TRIGGERS) que SQLModel no sabe declarar por sí solo.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ SQLModel.metadata.create_all() para crear tablas desde los modelos
+- ✅ CREATE ... IF NOT EXISTS: el bootstrap se puede ejecutar mil veces
+- ✅ TRIGGERS: código SQL que la BD ejecuta sola en cada INSERT/UPDATE/DELETE
+- ✅ Por qué un trigger funciona igual para el ORM, el SQL puro y el modo async
+- ✅ Tablas virtuales FTS5 para búsqueda de texto completo
+- ✅ Un contador de filas mantenido por triggers: COUNT(*) en O(1)
+- ✅ Un changelog (registro de cambios) escrito por triggers para sincronizar clientes
+
+💡 ¿Por qué triggers?
+Si el número de versión lo actualizara cada endpoint, bastaría con olvidarlo
+en UNO (o escribir con otra herramienta) para servir datos viejos. El trigger
+vive en la base de datos: ninguna escritura se lo puede saltar.
+"""
+from sqlalchemy import Connection
+from sqlmodel import SQLModel
+
+# 📦 Importar los modelos registra sus tablas en SQLModel.metadata
+from app.database import models  # noqa: F401
+
+# 🔢 VERSIONES (ETags)
+# - table_versions: un contador por tabla que sube en CADA escritura
+# - hero_versions: el valor del contador en la última escritura de cada héroe
+# Como el contador nunca se repite, un héroe borrado y vuelto a crear con el
+# mismo ID tampoco repite versión (y por tanto tampoco ETag).
+VERSION_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS hero_versions (
+        hero_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('heroes', 0)",
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_version_insert AFTER INSERT ON heroes
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE name = 'heroes';
+        INSERT INTO hero_versions (hero_id, version)
+        VALUES (new.id, (SELECT version FROM table_versions WHERE name = 'heroes'))
+        ON CONFLICT (hero_id) DO UPDATE SET version = excluded.version;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_version_update AFTER UPDATE ON heroes
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE name = 'heroes';
+        DELETE FROM hero_versions WHERE hero_id = old.id AND old.id != new.id;
+        INSERT INTO hero_versions (hero_id, version)
+        VALUES (new.id, (SELECT version FROM table_versions WHERE name = 'heroes'))
+        ON CONFLICT (hero_id) DO UPDATE SET version = excluded.version;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_version_delete AFTER DELETE ON heroes
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE name = 'heroes';
+        DELETE FROM hero_versions WHERE hero_id = old.id;
+    END
+    """,
+]
+
+# 🧮 TOTAL DE FILAS (cabecera X-Total-Count)
+# SELECT count(*) FROM heroes recorre TODA la tabla (o un índice entero): con
+# millones de héroes, en cada request. table_counts guarda el total y los
+# triggers lo suben o bajan en cada INSERT/DELETE, así que leerlo es UNA fila.
+# 💡 Un UPDATE no cambia el total: no necesita trigger.
+COUNT_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS table_counts (
+        name TEXT PRIMARY KEY,
+        row_count INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_count_insert AFTER INSERT ON heroes
+    BEGIN
+        UPDATE table_counts SET row_count = row_count + 1 WHERE name = 'heroes';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_count_delete AFTER DELETE ON heroes
+    BEGIN
+        UPDATE table_counts SET row_count = row_count - 1 WHERE name = 'heroes';
+    END
+    """,
+]
+
+# 🔍 BÚSQUEDA DE TEXTO (FTS5)
+# heroes_fts es un índice invertido "external content": NO guarda otra copia de
+# los nombres, solo los tokens → rowid. content='heroes' le dice de dónde leer
+# el texto original y content_rowid='id' que su rowid es heroes.id.
+# - unicode61 remove_diacritics 2: "Pérez" se encuentra buscando "perez"
+# - prefix='2 3': índices extra para que "spi"* no recorra todos los tokens
+# Los triggers lo mantienen sincronizado con CUALQUIER escritura en heroes.
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS heroes_fts USING fts5(
+        name,
+        content='heroes',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_fts_insert AFTER INSERT ON heroes
+    BEGIN
+        INSERT INTO heroes_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    # 💡 En una tabla external content, borrar = insertar el comando 'delete'
+    # con los valores VIEJOS (FTS5 los necesita para encontrar los tokens)
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_fts_delete AFTER DELETE ON heroes
+    BEGIN
+        INSERT INTO heroes_fts (heroes_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    # ⚡ Solo si cambia el nombre (o el id): un PATCH de la edad no toca el índice
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_fts_update AFTER UPDATE ON heroes
+    WHEN old.name IS NOT new.name OR old.id != new.id
+    BEGIN
+        INSERT INTO heroes_fts (heroes_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO heroes_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+
+# 📰 CHANGELOG (GET /heroes/changes, ver app/database/changes.py)
+# Una fila por escritura: seq (creciente), op, hero_id y, en los UPDATE, los
+# campos que cambiaron ("age,name"). Sin valores: el cliente que los quiera
+# los pide con GET /heroes/batch?ids=... (y secret_name no se copia a otra tabla).
+# - AUTOINCREMENT: seq NUNCA se reutiliza, ni después de compactar (sin él,
+#   SQLite podría repetir el mayor rowid si se borrara)
+# - Un UPDATE que no cambia nada no deja rastro (WHEN ...)
+# - Cambiar el id de un héroe = borrar el viejo + crear el nuevo
+# ⚠️  Si Hero gana una columna, añádela al trigger de UPDATE.
+CHANGES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS hero_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        op TEXT NOT NULL,
+        hero_id INTEGER NOT NULL,
+        fields TEXT
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_changes_insert AFTER INSERT ON heroes
+    BEGIN
+        INSERT INTO hero_changes (op, hero_id) VALUES ('insert', new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_changes_update AFTER UPDATE ON heroes
+    WHEN old.id = new.id AND (
+        old.name IS NOT new.name OR old.age IS NOT new.age OR old.secret_name IS NOT new.secret_name
+    )
+    BEGIN
+        INSERT INTO hero_changes (op, hero_id, fields) VALUES ('update', new.id, rtrim(
+            CASE WHEN old.name IS NOT new.name THEN 'name,' ELSE '' END ||
+            CASE WHEN old.age IS NOT new.age THEN 'age,' ELSE '' END ||
+            CASE WHEN old.secret_name IS NOT new.secret_name THEN 'secret_name,' ELSE '' END,
+            ','
+        ));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_changes_rekey AFTER UPDATE ON heroes
+    WHEN old.id != new.id
+    BEGIN
+        INSERT INTO hero_changes (op, hero_id) VALUES ('delete', old.id);
+        INSERT INTO hero_changes (op, hero_id) VALUES ('insert', new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS heroes_changes_delete AFTER DELETE ON heroes
+    BEGIN
+        INSERT INTO hero_changes (op, hero_id) VALUES ('delete', old.id);
+    END
+    """,
+]
+
+# 🧹 COMPACTACIÓN: conservar solo los :keep cambios más recientes
+# 💡 seq es el rowid: borrar "seq <= X" es un rango de la clave primaria
+CHANGES_COMPACT = "DELETE FROM hero_changes WHERE seq <= (SELECT max(seq) FROM hero_changes) - :keep"
+
+
+# 📥 CARGA MASIVA (app/tools/import_heroes.py)
+# Los triggers AFTER INSERT trabajan fila a fila: con millones de filas, el de
+# FTS por sí solo multiplica por 4 el tiempo de carga. El importador los quita
+# DENTRO de la transacción de cada lote, inserta, pone al día las tablas
+# auxiliares con UNA sentencia por tabla y vuelve a crearlos antes del COMMIT.
+# Como el DDL de SQLite es transaccional, nadie ve nunca la BD sin triggers.
+# ⚠️  Si cambias un trigger AFTER INSERT, cambia también BULK_INSERT_SYNC
+#    (o BULK_INSERT_CHANGES para el del changelog).
+BULK_INSERT_TRIGGERS = (
+    "heroes_version_insert", "heroes_count_insert", "heroes_fts_insert", "heroes_changes_insert",
+)
+
+# 💡 :first_id = max(id) ANTES del lote (los nuevos son los id > :first_id),
+# :rows = filas insertadas. Todo el lote cuenta como UNA escritura de versión.
+BULK_INSERT_SYNC = [
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'heroes'",
+    """
+    INSERT INTO hero_versions (hero_id, version)
+    SELECT id, (SELECT version FROM table_versions WHERE name = 'heroes')
+    FROM heroes WHERE id > :first_id
+    ON CONFLICT (hero_id) DO UPDATE SET version = excluded.version
+    """,
+    "UPDATE table_counts SET row_count = row_count + :rows WHERE name = 'heroes'",
+    "INSERT INTO heroes_fts (rowid, name) SELECT id, name FROM heroes WHERE id > :first_id",
+]
+
+# 📰 Lo que haría heroes_changes_insert, aparte: el seeder no lo usa, porque en
+# una BD nueva las filas sembradas son el estado inicial, no cambios que sincronizar
+BULK_INSERT_CHANGES = (
+    "INSERT INTO hero_changes (op, hero_id) SELECT 'insert', id FROM heroes WHERE id > :first_id ORDER BY id"
+)
+
+
+def _table_exists(connection: Connection, name: str) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).first() is not None
+
+
+def create_db_and_tables(connection: Connection) -> None:
+    """
+    🏗️  Crea tablas, tablas auxiliares y triggers (idempotente)
+
+    📝 Recibe una Connection sync para poder usarse tanto con el engine
+    normal (engine.begin()) como con el async (await conn.run_sync(...)).
+    """
+    SQLModel.metadata.create_all(connection)
+
+    if connection.dialect.name != "sqlite":
+        return
+
+    for ddl in VERSION_DDL:
+        connection.exec_driver_sql(ddl)
+
+    # 🧮 Si el contador es nuevo, se inicializa con UN count(*) de los héroes que
+    # YA existían (en la misma transacción que crea los triggers: no se pierde nada)
+    counts_is_new = not _table_exists(connection, "table_counts")
+    for ddl in COUNT_DDL:
+        connection.exec_driver_sql(ddl)
+    if counts_is_new:
+        connection.exec_driver_sql(
+            "INSERT INTO table_counts (name, row_count) SELECT 'heroes', count(*) FROM heroes"
+        )
+
+    # 🔍 Si el índice FTS es nuevo, hay que llenarlo con los héroes que YA existían
+    # ('rebuild' lo reconstruye desde la tabla de contenido; los triggers se
+    # encargan de todo lo que se escriba a partir de ahora)
+    fts_is_new = not _table_exists(connection, "heroes_fts")
+    for ddl in FTS_DDL:
+        connection.exec_driver_sql(ddl)
+    if fts_is_new:
+        connection.exec_driver_sql("INSERT INTO heroes_fts (heroes_fts) VALUES ('rebuild')")
+
+    # 📰 El changelog empieza VACÍO: los héroes que ya existían no son "cambios"
+    # (un cliente nuevo hace primero una lectura completa, ver app/database/changes.py)
+    for ddl in CHANGES_DDL:
+        connection.exec_driver_sql(ddl)
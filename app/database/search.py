@@ -0,0 +1,88 @@
+"""
+🔍 Full-Text Search - Búsqueda de Texto Completo con FTS5 🔍
+
+📚 PROPÓSITO EDUCATIVO:
+El índice ix_heroes_name sirve para "name = 'X'" o "name LIKE 'X%'", pero NO
+para encontrar "man" dentro de "Spider-Man": "LIKE '%man%'" recorre TODA la
+tabla. FTS5 es un índice invertido (token → filas), como el de un buscador:
+buscar una palabra cuesta lo mismo con mil héroes que con millones.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Tablas virtuales FTS5 y el operador MATCH
+- ✅ Ranking por relevancia con bm25 (columna oculta rank: menor = mejor)
+- ✅ Convertir texto del usuario en una consulta FTS5 SEGURA
+- ✅ Usar una tabla que no es un modelo SQLModel desde el ORM (table/column)
+- ✅ Acotar el trabajo de ranking en búsquedas muy amplias
+
+⏱️  ¿CUÁNTO CUESTA?
+Encontrar las coincidencias es rapidísimo; lo caro es PUNTUARLAS. Con 2
+millones de héroes, una palabra rara tarda ~1 ms, pero una que aparece en
+un millón de nombres tarda >1 s en ordenarse por bm25. Por eso solo se
+puntúan las primeras SEARCH_RANK_WINDOW coincidencias (ver rank_window_bound).
+
+📝 EJEMPLO:
+q = "spider ma"  →  MATCH '"spider"* "ma"*'
+→ héroes con una palabra que empiece por "spider" Y otra que empiece por "ma"
+
+🏗️  El índice y sus triggers se crean en schema.py.
+"""
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import column, literal_column, table, text
+from sqlmodel import Session
+
+from app.config import settings
+
+# 🗂️  heroes_fts no es un modelo: lo describimos con table()/column() para el ORM
+# 💡 rowid = heroes.id (content_rowid='id'); rank = puntuación bm25 de la búsqueda
+heroes_fts = table("heroes_fts", column("rowid"), column("rank"))
+
+# 📏 ID de la coincidencia número SEARCH_RANK_WINDOW + 1 (recorrido por rowid: sin puntuar)
+_WINDOW_BOUND_SQL = text("""
+    SELECT rowid FROM heroes_fts
+    WHERE heroes_fts MATCH :query
+    ORDER BY rowid
+    LIMIT 1 OFFSET :window
+""")
+
+# 🔤 Palabras del usuario (letras/dígitos Unicode); todo lo demás se ignora
+_TERM = re.compile(r"\w+")
+
+
+def to_match_query(q: str) -> str:
+    """
+    🛡️  Convierte el texto del usuario en una consulta FTS5 segura
+
+    ⚠️  ¿Por qué no pasar q tal cual a MATCH?
+    FTS5 tiene su propia sintaxis (AND, OR, NOT, NEAR, comillas, columnas...).
+    Un usuario que escriba 'spider"' provocaría un error de sintaxis (500).
+    Aquí cada palabra se convierte en una frase entre comillas con "*"
+    (búsqueda por prefijo, ideal para "buscar mientras escribes").
+    """
+    terms = _TERM.findall(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query has no searchable terms")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def match(query: str):
+    """🔍 Expresión "heroes_fts MATCH :query" para usar en .where() del ORM"""
+    return literal_column("heroes_fts").op("MATCH")(query)
+
+
+def rank_window_bound(session: Session, query: str) -> int | None:
+    """
+    📏 Límite de rowid para puntuar como mucho SEARCH_RANK_WINDOW coincidencias
+
+    📝 Devuelve None si hay pocas coincidencias (se puntúan todas). Si hay
+    más, devuelve el ID de la primera que queda FUERA: añadiendo
+    "rowid < límite" la búsqueda solo ordena por relevancia las N primeras.
+
+    💡 Recorrer las coincidencias por rowid no calcula bm25: cuesta
+    milisegundos aunque haya millones.
+    """
+    if not settings.SEARCH_RANK_WINDOW:
+        return None
+    params = {"query": query, "window": settings.SEARCH_RANK_WINDOW}
+    return session.execute(_WINDOW_BOUND_SQL, params).scalar()
@@ -0,0 +1,108 @@
+"""
+⚡ Fast JSON Responses - Del Cursor a los Bytes sin Modelos Intermedios ⚡
+
+📚 PROPÓSITO EDUCATIVO:
+Con response_model=list[HeroPublic], cada héroe de un listado se procesa
+DOS veces: el endpoint construye un HeroPublic por fila (validación) y FastAPI
+vuelve a validarlo y serializarlo antes de enviarlo. Para 100 filas son 100
+objetos Pydantic que solo existen para convertirse en JSON.
+
+Este módulo compila UNA vez un serializador (TypeAdapter de un TypedDict con
+los campos de HeroPublic) y convierte las filas de la BD en bytes JSON de una
+sola pasada. El endpoint devuelve un Response con esos bytes: FastAPI no
+vuelve a validar nada, pero el response_model del decorador sigue definiendo
+el esquema OpenAPI (que no cambia).
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ TypeAdapter: el serializador de Pydantic (en Rust) sin clases de modelo
+- ✅ TypedDict: un "esquema" para dicts normales (sin validar al construirlos)
+- ✅ Devolver un Response directamente: FastAPI se salta el response_model
+- ✅ Guardar en caché los BYTES: un acierto no vuelve a serializar nada
+
+⚙️  ACTIVACIÓN:
+RESPONSE_MODE=fast (por defecto) o RESPONSE_MODE=model (el camino clásico
+con HeroPublic, útil para comparar en benchmarks).
+
+📝 FLUJO:
+1. payload = heroes_payload(filas)    → bytes JSON (fast) o list[HeroPublic] (model)
+2. La caché guarda el payload tal cual
+3. return json_response(payload, response) → Response con los bytes y las
+   cabeceras (ETag, X-Next-Cursor) ya puestas en `response`
+
+⚠️  El TypedDict DEBE tener los mismos campos, en el mismo orden, que
+HeroPublic: es lo que garantiza que el JSON sea idéntico en los dos modos.
+"""
+from collections.abc import Iterable
+from typing import Any, TypedDict
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.database.models import HeroBatchResult, HeroPublic
+
+
+class HeroRow(TypedDict):
+    """📋 Los campos de HeroPublic (name, age, id) para dicts sin validar"""
+    name: str
+    age: int | None
+    id: int
+
+
+class HeroBatchRow(TypedDict):
+    """🧺 Los campos de HeroBatchResult (GET/POST /batch)"""
+    heroes: list[HeroRow]
+    missing: list[int]
+
+
+# 🏭 Serializadores compilados UNA vez al importar el módulo
+_HERO = TypeAdapter(HeroRow)
+_HERO_LIST = TypeAdapter(list[HeroRow])
+_HERO_BATCH = TypeAdapter(HeroBatchRow)
+
+# 📦 Lo que guarda la caché y recibe json_response(), según RESPONSE_MODE
+HeroPayload = bytes | HeroPublic
+HeroListPayload = bytes | list[HeroPublic]
+HeroBatchPayload = bytes | HeroBatchResult
+
+
+def _as_row(hero: Any) -> HeroRow:
+    # 💡 hero: cualquier objeto con .id, .name y .age (Row de SQLAlchemy o Hero)
+    # 🔒 Solo los campos públicos: secret_name nunca entra en el dict
+    return {"name": hero.name, "age": hero.age, "id": hero.id}
+
+
+def hero_payload(hero: Any) -> HeroPayload:
+    """🦸 Un héroe → bytes JSON (fast) o HeroPublic (model)"""
+    if settings.RESPONSE_MODE == "fast":
+        return _HERO.dump_json(_as_row(hero))
+    return HeroPublic(id=hero.id, name=hero.name, age=hero.age)
+
+
+def heroes_payload(heroes: Iterable[Any]) -> HeroListPayload:
+    """📄 Una página de héroes → bytes JSON (fast) o list[HeroPublic] (model)"""
+    if settings.RESPONSE_MODE == "fast":
+        return _HERO_LIST.dump_json([_as_row(hero) for hero in heroes])
+    return [HeroPublic(id=hero.id, name=hero.name, age=hero.age) for hero in heroes]
+
+
+def batch_payload(heroes: Iterable[Any], missing: list[int]) -> HeroBatchPayload:
+    """🧺 Héroes encontrados + ids que faltan → bytes JSON (fast) o HeroBatchResult (model)"""
+    if settings.RESPONSE_MODE == "fast":
+        return _HERO_BATCH.dump_json({"heroes": [_as_row(hero) for hero in heroes], "missing": missing})
+    return HeroBatchResult(
+        heroes=[HeroPublic(id=hero.id, name=hero.name, age=hero.age) for hero in heroes],
+        missing=missing,
+    )
+
+
+def json_response(payload: HeroPayload | HeroListPayload | HeroBatchPayload, response: Response) -> Any:
+    """
+    📤 Respuesta del endpoint para un payload de hero_payload()/heroes_payload()
+
+    💡 Al devolver un Response propio, FastAPI ignora el `response` que
+    inyectó al endpoint: por eso se copian aquí sus cabeceras.
+    """
+    if isinstance(payload, bytes):
+        return Response(content=payload, media_type="application/json", headers=response.headers)
+    return payload
@@ -13,32 +13,153 @@ de forma segura y eficiente en FastAPI usando el patrón de Dependency Injection
 - ✅ Configuración centralizada de base de datos
 - ✅ Patrón de sesiones por request
 
+- ✅ Separar lecturas y escrituras en pools distintos (ReadSessionDep / WriteSessionDep)
+
 💡 PATRÓN:
 Cada request HTTP obtiene su propia sesión de BD que se cierra automáticamente
 al terminar el request, garantizando no memory leaks ni conexiones colgadas.
+
+📖 LECTURAS vs ✏️  ESCRITURAS:
+- WriteSessionDep: engine principal (el único que puede escribir)
+- ReadSessionDep: engines de READ_DATABASE_URLS (con SQLite, el mismo archivo
+  en modo solo lectura). Los listados pesados no ocupan las conexiones de los
+  escritores, y un INSERT por error en un GET falla en lugar de escribir.
+- Lee-lo-que-escribiste: si la request ya confirmó una escritura (o la propia
+  sesión de lectura escribe algo), sus lecturas siguientes van al principal.
 """
 
+import itertools
+import logging
 from typing import Annotated
 from fastapi import Depends
 
+from sqlalchemy import Engine
 from sqlmodel import Session, create_engine
 
 # Importar configuración centralizada
 from app.config import settings
+from app.database.pooling import pool_options
+from app.database.slow_queries import install_slow_query_log
+from app.database.sqlite_tuning import install_sqlite_pragmas
+from app.metrics import install_sql_metrics
 
-# 🐛 Log para verificar configuración (útil en desarrollo)
-print("🔧 Comprobación de mismo hilo:", settings.CHECK_SAME_THREAD)
+logger = logging.getLogger(__name__)
 
 # 🏗️  CREAR ENGINE: Configuración de conexión a la base de datos
 # Engine es el "motor" que maneja todas las conexiones a la BD
 engine = create_engine(
     settings.DATABASE_URL,        # 📍 URL de conexión (ej: sqlite:///marvel.db)
     connect_args=settings.connect_args,  # 🔧 Argumentos específicos de SQLite  
-    echo=settings.SQL_ECHO        # 🐛 Mostrar SQL en consola si está habilitado
+    echo=settings.SQL_ECHO,       # 🐛 Mostrar SQL en consola si está habilitado
+    **pool_options(settings.DATABASE_URL, "sync"),  # 🏊 Clase y tamaño del pool (preset + Settings)
 )
 
+# 🏎️  Perfil de rendimiento: aplica los PRAGMAs (WAL, mmap, caché...) a cada conexión del pool
+install_sqlite_pragmas(engine)
+
+# 📈 Métricas: cuenta y cronometra cada sentencia SQL y publica el estado del pool
+install_sql_metrics(engine, "sync")
+
+# 🐢 Slow query log: sentencias por encima de SLOW_QUERY_MS, con su ruta y su plan
+install_slow_query_log(engine, "sync")
+
+# 📖 ENGINES DE LECTURA: un pool por URL de READ_DATABASE_URLS (vacío = todo al principal)
+read_engines = [
+    create_engine(
+        url, connect_args=settings.connect_args, echo=settings.SQL_ECHO,
+        **pool_options(url, f"read-{number}"),
+    )
+    for number, url in enumerate(settings.READ_DATABASE_URLS)
+]
+for number, read_engine in enumerate(read_engines):
+    install_sqlite_pragmas(read_engine, read_only=True)
+    install_sql_metrics(read_engine, f"read-{number}")
+    install_slow_query_log(read_engine, f"read-{number}")
+
+# 🔁 Turno para repartir las sesiones entre los engines de lectura
+_read_turn = itertools.count()
+
+# 🐛 Log para verificar configuración (visible con LOG_LEVEL=DEBUG)
+logger.debug(
+    "engine_created",
+    extra={
+        "url": engine.url.render_as_string(),
+        "read_urls": [read_engine.url.render_as_string() for read_engine in read_engines],
+        "check_same_thread": settings.CHECK_SAME_THREAD,
+    },
+)
+
+
+def dispose_engines() -> None:
+    """
+    🧹 Cierra las conexiones de todos los pools (lo llama el lifespan al apagar)
 
-def get_session():
+    💡 Los engines siguen sirviendo: si alguien vuelve a pedir una conexión,
+    el pool abre una nueva.
+    """
+    for pooled in (engine, *read_engines):
+        pooled.dispose()
+
+
+def pick_read_engine() -> Engine:
+    """🔁 Siguiente engine de lectura por turnos (el principal si no hay ninguno)"""
+    if not read_engines:
+        return engine
+    return read_engines[next(_read_turn) % len(read_engines)]
+
+
+class RequestWrites:
+    """
+    ✏️  ¿Ya confirmó esta request alguna escritura?
+
+    📝 FastAPI crea UNA instancia por request y se la da a todas las
+    dependencias que la piden: así la sesión de escritura puede avisar a la
+    de lectura.
+    """
+
+    def __init__(self):
+        self.committed = False
+
+
+class WriteSession(Session):
+    """✏️  Sesión del engine principal que avisa a la request cuando confirma"""
+
+    def __init__(self, writes: RequestWrites):
+        super().__init__(engine)
+        self.writes = writes
+
+    def commit(self) -> None:
+        super().commit()
+        self.writes.committed = True
+
+
+class ReadSession(Session):
+    """
+    📖 Sesión que lee del engine de lectura y escribe en el principal
+
+    🧭 get_bind() decide qué engine ejecuta cada sentencia:
+    - INSERT/UPDATE/DELETE o flush del ORM → principal (y desde entonces
+      TODO va al principal: esta sesión debe leer lo que escribió)
+    - Si otra sesión de la request ya confirmó una escritura → principal
+    - Lo demás → el engine de lectura elegido al crear la sesión
+    """
+
+    def __init__(self, writes: RequestWrites):
+        super().__init__(engine)
+        self.writes = writes
+        self.reader = pick_read_engine()
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        if self.wrote or self._flushing or getattr(clause, "is_dml", False):
+            self.wrote = True
+            return engine
+        if self.writes.committed:
+            return engine
+        return self.reader
+
+
+def get_session(writes: Annotated[RequestWrites, Depends()]):
     """
     🔄 GENERADOR DE SESIONES: Dependency Injection para FastAPI
     
@@ -56,17 +177,29 @@ def get_session():
     5. Endpoint usa la sesión
     6. Al terminar endpoint, sesión se cierra automáticamente
     
+    ✏️  Es la sesión de ESCRITURA (engine principal): WriteSession avisa a
+    la request al confirmar para que las lecturas siguientes vean el cambio.
+    
     💡 ¿Por qué yield en lugar de return?
     - yield convierte la función en un generador
     - Permite ejecutar código DESPUÉS de que el endpoint termine
     - FastAPI maneja automáticamente el cleanup
     """
-    with Session(engine) as session:
+    with WriteSession(writes) as session:
         # 🎯 yield entrega la sesión al endpoint que la requiere
         # Cuando el endpoint termina, continúa aquí y cierra la sesión
         yield session
 
 
+def get_read_session(writes: Annotated[RequestWrites, Depends()]):
+    """
+    📖 GENERADOR DE SESIONES DE LECTURA: igual que get_session(), pero los
+    SELECT van al pool de lectura (ver ReadSession)
+    """
+    with ReadSession(writes) as session:
+        yield session
+
+
 # 📝 ANOTACIÓN DE TIPO: Simplifica el uso de dependency injection
 # SessionDep = Annotated[Session, Depends(get_session)]
 # 
@@ -80,3 +213,9 @@ def get_session():
 # - Tipado fuerte para autocompletado
 # - Menos propenso a errores
 SessionDep = Annotated[Session, Depends(get_session)]
+
+# ✏️  Para endpoints que escriben (POST/PATCH/DELETE): engine principal
+WriteSessionDep = SessionDep
+
+# 📖 Para endpoints que solo leen (GET): pool de lectura
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
@@ -0,0 +1,233 @@
+"""
+🐢 Slow Query Log - Qué Sentencia Hizo Lento al Endpoint 🐢
+
+📚 PROPÓSITO EDUCATIVO:
+SQL_ECHO es todo o nada: imprime CADA sentencia y no dice cuánto tardó. Las
+métricas dicen QUE una ruta va lenta, pero no POR QUÉ. Este módulo escucha
+los eventos de cursor del engine y guarda solo las sentencias que superan
+SLOW_QUERY_MS, con todo lo necesario para investigarlas:
+- La sentencia y la FORMA de sus parámetros (tipos, nunca los valores)
+- La ruta que la lanzó (GET /heroes/{hero_id})
+- Su EXPLAIN QUERY PLAN, capturado UNA vez por sentencia distinta
+  ("SCAN heroes" en lugar de "SEARCH heroes USING INDEX" delata el problema)
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ before/after_cursor_execute: cronometrar cada sentencia en el engine
+- ✅ ContextVar: saber qué request lanzó la consulta (también en threads)
+- ✅ EXPLAIN QUERY PLAN en la misma conexión, con los mismos parámetros
+- ✅ Ring buffer (deque con maxlen): memoria acotada pase lo que pase
+- ✅ Rate limit: con la BD saturada, TODO va lento; no hay que empeorarlo
+
+🌐 Se consulta en GET /debug/slow-queries (y en los logs: evento "slow_query")
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.config import settings
+from app.metrics import db_slow_queries_total, start_statement_timer, statement_elapsed
+
+logger = logging.getLogger(__name__)
+
+# 🧵 Scope ASGI de la request en curso (Starlette añade scope["route"] al enrutar)
+_current_scope: ContextVar[dict | None] = ContextVar("slow_query_scope", default=None)
+
+# 🗺️  Solo estas sentencias admiten EXPLAIN QUERY PLAN (PRAGMA, BEGIN... no)
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete", "replace")
+
+# 📏 Con más parámetros que esto (p.ej. un IN de 1000 ids) se resume la forma
+_MAX_SHAPE_PARAMS = 20
+
+
+def parameters_shape(parameters: Any) -> Any:
+    """
+    🔍 FORMA de los parámetros: tipos en lugar de valores
+
+    📝 {"hero_id": 5} → {"hero_id": "int"}; (5, "x") → ["int", "str"]
+    💡 Nunca se guardan los valores: secret_name no debe acabar en un log
+    """
+    if isinstance(parameters, dict):
+        items = list(parameters.items())
+    elif isinstance(parameters, (list, tuple)):
+        items = list(enumerate(parameters))
+    else:
+        return type(parameters).__name__
+    if len(items) > _MAX_SHAPE_PARAMS:
+        return {"count": len(items), "types": sorted({type(value).__name__ for _, value in items})}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in items}
+    return [type(value).__name__ for _, value in items]
+
+
+def current_route() -> str | None:
+    """🛣️  "GET /heroes/{hero_id}" de la request en curso (None fuera de una request)"""
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+class SlowQueryLog:
+    """
+    📒 REGISTRO: ring buffer de consultas lentas + planes + rate limit
+
+    💡 Los eventos llegan desde muchos threads a la vez (uno por request), así
+    que todo el estado compartido se toca con un lock.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, rate: int, max_plans: int):
+        self.threshold = threshold_ms / 1000
+        self.rate = rate
+        self.max_plans = max_plans
+        self.entries: deque[dict] = deque(maxlen=size)
+        # 🗺️  Un plan por sentencia distinta (la clave es el texto SQL)
+        self.plans: dict[str, list[str] | None] = {}
+        self.recorded = 0
+        self.suppressed = 0
+        self._window_start = 0.0
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def _allow(self, now: float) -> bool:
+        """🚦 Como mucho `rate` entradas por segundo; el resto solo se cuenta"""
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_count = 0
+        if self._window_count >= self.rate:
+            self.suppressed += 1
+            return False
+        self._window_count += 1
+        return True
+
+    def _plan_for(self, conn, statement: str, parameters: Any) -> list[str] | None:
+        """🗺️  EXPLAIN QUERY PLAN de `statement` (solo la primera vez que se ve)"""
+        with self._lock:
+            if statement in self.plans:
+                return self.plans[statement]
+            if len(self.plans) >= self.max_plans:
+                return None
+            # 📌 Se reserva ANTES de explicar: otro thread no la explica a la vez
+            self.plans[statement] = None
+        plan = explain_query_plan(conn, statement, parameters)
+        with self._lock:
+            self.plans[statement] = plan
+        return plan
+
+    def record(self, conn, engine_name: str, statement: str, parameters: Any, executemany: bool, elapsed: float):
+        with self._lock:
+            if not self._allow(time.monotonic()):
+                return
+            self.recorded += 1
+        rows = None
+        # 📦 executemany: una lista de juegos de parámetros; basta con el primero
+        # ⚠️  Con "insertmanyvalues" SQLAlchemy marca executemany pero pasa UN solo juego
+        if executemany and isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, dict)):
+            rows = len(parameters)
+            parameters = parameters[0]
+        plan = self._plan_for(conn, statement, parameters)
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "engine": engine_name,
+            "duration_ms": round(elapsed * 1000, 3),
+            "route": current_route(),
+            "statement": statement,
+            "parameters": parameters_shape(parameters),
+            "executemany": rows,
+            "plan": plan,
+        }
+        with self._lock:
+            self.entries.append(entry)
+        logger.warning("slow_query", extra={key: entry[key] for key in ("engine", "duration_ms", "route", "statement")})
+
+    def report(self) -> dict:
+        """📋 Estado para /debug/slow-queries (las más recientes primero)"""
+        with self._lock:
+            entries = list(reversed(self.entries))
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "recorded": self.recorded,
+                "suppressed": self.suppressed,
+                "distinct_statements": len(self.plans),
+                "entries": entries,
+            }
+
+
+def explain_query_plan(conn, statement: str, parameters: Any) -> list[str] | None:
+    """
+    🗺️  Ejecuta EXPLAIN QUERY PLAN en la MISMA conexión y con los mismos parámetros
+
+    ⚠️  Se usa un cursor nuevo: el de la consulta original aún tiene filas sin leer.
+    Solo SQLite (otras BD tienen otra sintaxis de EXPLAIN).
+    """
+    kind = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    if conn.dialect.name != "sqlite" or kind not in _EXPLAINABLE:
+        return None
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            # 📝 Filas: (id, parent, notused, detail); basta con el detalle
+            return [row[3] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as error:
+        # 💥 El plan es un extra: nunca debe romper la consulta que se está midiendo
+        return [f"EXPLAIN failed: {error}"]
+
+
+# 📒 Registro único del proceso (lo comparten todos los engines)
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_MS, settings.SLOW_QUERY_BUFFER, settings.SLOW_QUERY_RATE, settings.SLOW_QUERY_MAX_PLANS
+)
+
+
+def install_slow_query_log(engine: Engine, name: str) -> None:
+    """
+    📌 Registra los eventos de cronometraje en `engine` (SLOW_QUERY_LOG=false: nada)
+
+    ⚡ Para un AsyncEngine, pasa async_engine.sync_engine (igual que con las métricas)
+    """
+    if not settings.SLOW_QUERY_LOG:
+        return
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # ⏱️  En el ExecutionContext, como en app/metrics.py (clave propia: son independientes)
+        start_statement_timer(conn, context, "slow_query_start")
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = statement_elapsed(conn, context, "slow_query_start")
+        if elapsed >= slow_query_log.threshold:
+            db_slow_queries_total.inc(name)
+            slow_query_log.record(conn, name, statement, parameters, executemany, elapsed)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+class SlowQueryMiddleware:
+    """
+    🧅 MIDDLEWARE ASGI: deja el scope de la request en un ContextVar
+
+    💡 El ContextVar se copia al thread donde corre un endpoint "def", así que
+    los eventos del engine saben qué ruta lanzó cada consulta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
@@ -0,0 +1,82 @@
+"""
+🏎️  SQLite Performance Profile - Perfil de Rendimiento de SQLite 🏎️
+
+📚 PROPÓSITO EDUCATIVO:
+Los PRAGMAs de SQLite configuran la CONEXIÓN, no la base de datos (con la
+excepción de journal_mode=WAL, que queda guardado en el archivo). Como el
+engine mantiene un pool de varias conexiones, hay que aplicarlos a CADA
+conexión en cuanto se abre. Para eso usamos el evento "connect" de SQLAlchemy.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Eventos de SQLAlchemy (event.listens_for)
+- ✅ PRAGMAs de SQLite: WAL, synchronous, mmap, caché, temp_store, busy_timeout
+- ✅ Conexión DBAPI "cruda" vs conexión de SQLAlchemy
+- ✅ Verificar la configuración real consultando los PRAGMAs
+
+📝 FLUJO:
+1. El pool necesita una conexión nueva → sqlite3.connect(...)
+2. SQLAlchemy dispara el evento "connect"
+3. apply_sqlite_pragmas() ejecuta "PRAGMA x = y" en esa conexión
+4. La conexión entra al pool ya configurada
+"""
+from typing import Any
+
+from sqlalchemy import Connection, Engine, event
+
+from app.config import settings
+
+# 📋 PRAGMAs que forman el perfil (se reportan aunque el perfil esté desactivado)
+PROFILE_PRAGMAS = ("busy_timeout", "journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store")
+
+
+def _execute_pragmas(dbapi_connection: Any, pragmas: dict[str, Any]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any = None) -> None:
+    """
+    🔧 LISTENER "connect": aplica el perfil de Settings a una conexión recién abierta
+
+    💡 Los nombres y valores de los PRAGMAs vienen de Settings, que ya los
+    validó contra listas de valores permitidos, así que es seguro formatearlos.
+    """
+    _execute_pragmas(dbapi_connection, settings.sqlite_pragmas)
+
+
+def apply_sqlite_read_pragmas(dbapi_connection: Any, connection_record: Any = None) -> None:
+    """📖 LISTENER "connect" de las conexiones de solo lectura (sin journal_mode ni synchronous)"""
+    _execute_pragmas(dbapi_connection, settings.sqlite_read_pragmas)
+
+
+def install_sqlite_pragmas(engine: Engine, *, read_only: bool = False) -> None:
+    """
+    📌 Registra apply_sqlite_pragmas en el engine (solo si es SQLite)
+
+    ⚡ Para un AsyncEngine, pasa async_engine.sync_engine: los eventos de
+    conexión siempre se registran en el engine sync subyacente.
+
+    📖 read_only=True para los engines de lectura (mode=ro): journal_mode es
+    de la BD y ya lo fija el engine principal.
+    """
+    if engine.dialect.name == "sqlite" and settings.sqlite_pragmas:
+        event.listen(engine, "connect", apply_sqlite_read_pragmas if read_only else apply_sqlite_pragmas)
+
+
+def read_sqlite_pragmas(connection: Connection) -> dict[str, Any]:
+    """
+    🔍 Consulta los valores ACTIVOS de los PRAGMAs del perfil
+
+    📝 Útil para verificar al arrancar que el perfil realmente se aplicó
+    (p.ej. journal_mode no puede pasar a WAL en una BD :memory:)
+    """
+    if connection.dialect.name != "sqlite":
+        return {}
+    return {
+        name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+        for name in PROFILE_PRAGMAS
+    }
@@ -0,0 +1,96 @@
+"""
+🏷️  ETags and Conditional GET - Peticiones Condicionales 🏷️
+
+📚 PROPÓSITO EDUCATIVO:
+Un ETag es una "huella" de la versión de un recurso. El servidor la envía en
+la cabecera ETag; en la siguiente petición el cliente la devuelve en
+If-None-Match. Si no ha cambiado, respondemos 304 Not Modified SIN cuerpo:
+nada que consultar a fondo, nada que serializar, casi nada que enviar.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Cabeceras ETag / If-None-Match (RFC 9110)
+- ✅ Respuesta 304 Not Modified
+- ✅ Versiones mantenidas por triggers (ver schema.py)
+- ✅ Consultas "baratas" (una fila por clave primaria) antes de las caras
+
+📝 FLUJO:
+1ª petición:  GET /heroes/1                      → 200 + ETag: "hero-1-v42" + JSON
+2ª petición:  GET /heroes/1  If-None-Match: "hero-1-v42"  → 304 (sin cuerpo)
+"""
+from fastapi import Response
+from sqlalchemy import Select, column, func, select, table, text
+from sqlmodel import Session
+
+from app.database.models import Hero
+
+# 🔍 Versión de un héroe; NULL (sin fila) = héroe anterior a los triggers → versión 0
+_HERO_VERSION_SQL = text("""
+    SELECT coalesce(v.version, 0) AS version
+    FROM heroes h
+    LEFT JOIN hero_versions v ON v.hero_id = h.id
+    WHERE h.id = :hero_id
+""")
+
+# 🗂️  hero_versions como tabla "ligera" (sin modelo): basta para usarla desde el ORM
+_hero_versions = table("hero_versions", column("hero_id"), column("version"))
+
+# 🔍 Versión de toda la tabla (cambia con CUALQUIER escritura)
+_TABLE_VERSION_SQL = text("SELECT version FROM table_versions WHERE name = 'heroes'")
+
+
+def hero_etag(hero_id: int, version: int) -> str:
+    """🏷️  ETag fuerte de un héroe: cambia cada vez que ESE héroe se escribe"""
+    return f'"hero-{hero_id}-v{version}"'
+
+
+def list_etag(version: int) -> str:
+    """🏷️  ETag fuerte de un listado: cambia con cualquier escritura en la tabla"""
+    return f'"heroes-v{version}"'
+
+
+def read_hero_version(session: Session, hero_id: int) -> int | None:
+    """🔢 Versión actual del héroe, o None si el héroe no existe"""
+    return session.execute(_HERO_VERSION_SQL, {"hero_id": hero_id}).scalar()
+
+
+def orm_hero_with_version(hero_id: int) -> Select:
+    """
+    🦸 SELECT del héroe + su versión en UNA consulta (para el ETag)
+
+    📝 SQL GENERADO (el mismo LEFT JOIN que usa /heroes_sql):
+    SELECT heroes.*, coalesce(hero_versions.version, 0) AS version
+    FROM heroes LEFT OUTER JOIN hero_versions ON hero_versions.hero_id = heroes.id
+    WHERE heroes.id = ?
+    """
+    return (
+        select(Hero, func.coalesce(_hero_versions.c.version, 0).label("version"))
+        .outerjoin(_hero_versions, _hero_versions.c.hero_id == Hero.id)
+        .where(Hero.id == hero_id)
+    )
+
+
+def read_table_version(session: Session) -> int:
+    """🔢 Versión actual de la tabla heroes"""
+    return session.execute(_TABLE_VERSION_SQL).scalar() or 0
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    ⚖️  ¿Coincide If-None-Match con nuestro ETag?
+
+    📝 REGLAS (comparación "débil", la que exige If-None-Match):
+    - "*" coincide con cualquier versión
+    - Puede traer varios ETags separados por comas
+    - W/"x" y "x" se consideran iguales
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """📭 Respuesta 304: sin cuerpo, solo con el ETag vigente"""
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,82 @@
+"""
+📝 Structured Logging - Logs Estructurados 📝
+
+📚 PROPÓSITO EDUCATIVO:
+print() escribe en stdout de forma SÍNCRONA en cada llamada, no se puede
+apagar sin tocar el código y produce texto libre difícil de analizar. Un
+logger del módulo logging se puede filtrar por nivel, redirigir y apagar
+desde la configuración, y con un formateador JSON cada evento es una línea
+que cualquier herramienta (jq, Loki, Elasticsearch...) sabe leer.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ logging.getLogger(__name__): un logger por módulo, todos bajo "app"
+- ✅ Niveles (DEBUG < INFO < WARNING < ERROR) y LOG_LEVEL=OFF para apagarlos
+- ✅ Campos estructurados con extra={...}
+- ✅ Un Formatter propio que emite JSON
+
+📝 USO:
+logger = logging.getLogger(__name__)
+logger.debug("heroes_listed", extra={"router": "orm", "count": 10})
+→ {"ts": "...", "level": "DEBUG", "logger": "app.routes.heroes", "event": "heroes_listed", "router": "orm", "count": 10}
+"""
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from app.config import settings
+
+# 🔎 Atributos que todo LogRecord trae de serie: lo demás vino en extra={...}
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _STANDARD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """🧾 Una línea JSON por evento: ts, level, logger, event + campos de extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """🖥️  Formato legible para la consola: LEVEL logger event clave=valor ..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in _extra_fields(record).items())
+        line = f"{record.levelname:<7} {record.name} {record.getMessage()} {fields}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging() -> None:
+    """
+    🔧 Configura el logger "app" según LOG_LEVEL y LOG_FORMAT (idempotente)
+
+    💡 Solo toca el logger "app": los de uvicorn y SQLAlchemy siguen igual.
+    """
+    logger = logging.getLogger("app")
+    logger.handlers.clear()
+    logger.propagate = False
+
+    if settings.LOG_LEVEL == "OFF":
+        # 🔇 Ni siquiera se construyen los mensajes: isEnabledFor() devuelve False
+        logger.setLevel(logging.CRITICAL + 1)
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(settings.LOG_LEVEL)
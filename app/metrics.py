@@ -0,0 +1,393 @@
+"""
+📈 Metrics - Métricas de Requests y SQL en formato Prometheus 📈
+
+📚 PROPÓSITO EDUCATIVO:
+Para optimizar hay que MEDIR en producción, no solo en el benchmark. Este
+archivo cuenta cuántas requests llegan a cada ruta, cuánto tardan, cuántas
+consultas SQL hace cada una (y cuánto tardan) y cómo está el pool de
+conexiones. Todo se publica en GET /metrics en el formato de texto que
+entiende Prometheus (y que también se puede leer a ojo).
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Contadores e histogramas (buckets acumulados, _sum, _count)
+- ✅ Middleware ASGI "puro": envuelve la app sin crear tareas extra
+- ✅ contextvars: estado POR REQUEST que sigue a la request hasta el thread pool
+- ✅ Eventos before/after_cursor_execute de SQLAlchemy para cronometrar SQL
+- ✅ Etiquetas con cardinalidad acotada (plantilla de ruta, no la URL real)
+
+📝 FLUJO DE UNA REQUEST:
+1. MetricsMiddleware crea un RequestStats y lo guarda en un ContextVar
+2. El endpoint (en el thread pool) ejecuta SQL → los eventos del engine
+   suman consultas y tiempo en ESE RequestStats
+3. El endpoint anota las filas que devuelve con record_rows()
+4. Al terminar la respuesta, el middleware vuelca todo en los histogramas
+
+⚠️  Las métricas viven en memoria del proceso: con varios workers, cada uno
+publica las suyas (Prometheus las suma por instancia).
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.config import settings
+from app.warmup import WARMUP_SCOPE_KEY
+
+# 🪣 Buckets (segundos) para latencias de requests y de consultas SQL
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# 🪣 Buckets para "cuántas consultas hizo la request" y "cuántas filas devolvió"
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+ROW_COUNT_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    """🏷️  ('method', 'route'), ('GET', '/heroes/') → {method="GET",route="/heroes/"}"""
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class Counter:
+    """
+    🔢 CONTADOR: solo sube (requests, consultas...). Uno por combinación de etiquetas.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {value:g}"
+
+
+class Histogram:
+    """
+    📊 HISTOGRAMA: reparte observaciones en buckets para calcular percentiles
+
+    💡 Cada observación suma 1 a UN bucket; al publicar se acumulan
+    (Prometheus espera le="0.1" = "cuántas fueron <= 0.1").
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        # label_values → [conteo por bucket (+Inf al final), suma, total]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, *label_values) -> dict:
+        """📋 Una serie como dict (buckets acumulados, sum, count) para endpoints JSON"""
+        with self._lock:
+            counts, total, count = self._series.get(label_values, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            counts = list(counts)
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "sum": total, "count": count}
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        label_names = self.labels + ("le",)
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                labels = _format_labels(label_names, (*label_values, bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {total:g}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class GaugeFunction:
+    """
+    🌡️  GAUGE CALCULADO AL PUBLICAR: el valor se lee en el momento del scrape
+    (p.ej. conexiones del pool ocupadas AHORA)
+    """
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...], collect: Callable[[], dict[tuple, float]]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.collect = collect
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} gauge"
+        for label_values, value in sorted(self.collect().items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {value:g}"
+
+
+@dataclass
+class RequestStats:
+    """📋 Lo que hizo UNA request en la base de datos (vive en un ContextVar)"""
+    queries: int = 0
+    query_seconds: float = 0.0
+    rows: int = 0
+
+
+# 🧵 Request en curso; None fuera de una request (lifespan, scripts, benchmarks)
+_current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+# 🗄️  Engines registrados por install_sql_metrics() (para las métricas del pool)
+_engines: dict[str, Engine] = {}
+
+# 🔌 Métrica publicada → método del pool de SQLAlchemy que la calcula
+_POOL_METHODS = {"size": "size", "checked_out": "checkedout", "checked_in": "checkedin", "overflow": "overflow"}
+
+
+def _pool_stats() -> dict[str, dict[tuple, float]]:
+    """🔌 Estado de cada pool: tamaño, conexiones ocupadas/libres y overflow"""
+    stats: dict[str, dict[tuple, float]] = {stat: {} for stat in _POOL_METHODS}
+    for name, engine in _engines.items():
+        for stat, method_name in _POOL_METHODS.items():
+            # 💡 No todos los pools tienen estos métodos (p.ej. StaticPool, NullPool)
+            method = getattr(engine.pool, method_name, None)
+            if callable(method):
+                stats[stat][(name,)] = method()
+    return stats
+
+
+def _pool_gauge(stat: str, help_text: str) -> GaugeFunction:
+    return GaugeFunction(f"db_pool_{stat}", help_text, ("engine",), lambda: _pool_stats()[stat])
+
+
+# 🚦 Puertas de admission control registradas por app/admission.py (grupo → puerta)
+_admission_gates: dict[str, Any] = {}
+
+
+def register_admission_gate(gate: Any) -> None:
+    """🚪 Publica `active` y `queued` de una puerta (sin importar app.admission aquí)"""
+    _admission_gates[gate.name] = gate
+
+
+def _admission_gauge(stat: str, help_text: str) -> GaugeFunction:
+    return GaugeFunction(
+        f"admission_{stat}",
+        help_text,
+        ("group",),
+        lambda: {(name,): getattr(gate, stat) for name, gate in _admission_gates.items()},
+    )
+
+
+# 📋 TODAS LAS MÉTRICAS (el orden es el orden de publicación)
+http_requests_total = Counter(
+    "http_requests_total", "Requests HTTP por método, ruta y código de estado", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Latencia de las requests HTTP", LATENCY_BUCKETS, ("method", "route")
+)
+db_queries_total = Counter("db_queries_total", "Sentencias SQL ejecutadas por tipo", ("statement",))
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "Latencia de cada sentencia SQL", LATENCY_BUCKETS, ("statement",)
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "Sentencias SQL ejecutadas por request", QUERY_COUNT_BUCKETS, ("method", "route")
+)
+db_query_seconds_per_request = Histogram(
+    "db_query_seconds_per_request", "Tiempo total en SQL por request", LATENCY_BUCKETS, ("method", "route")
+)
+db_rows_per_request = Histogram(
+    "db_rows_per_request", "Filas de la BD devueltas al cliente por request", ROW_COUNT_BUCKETS, ("method", "route")
+)
+db_write_batch_size = Histogram(
+    "db_write_batch_size", "Escrituras confirmadas por transacción (WRITE_MODE=group)", BATCH_SIZE_BUCKETS, ()
+)
+# 🏊 Lo que tarda pedir una conexión al pool (esperar + abrir), ver app/database/pooling.py
+db_pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds", "Latencia de obtener una conexión del pool", LATENCY_BUCKETS, ("engine",)
+)
+db_pool_timeouts_total = Counter(
+    "db_pool_timeouts_total", "Peticiones de conexión que agotaron POOL_TIMEOUT", ("engine",)
+)
+# 🐢 Sentencias por encima de SLOW_QUERY_MS (ver app/database/slow_queries.py)
+db_slow_queries_total = Counter(
+    "db_slow_queries_total", "Sentencias SQL más lentas que SLOW_QUERY_MS", ("engine",)
+)
+# 🚦 Admission control (ver app/admission.py)
+admission_shed_total = Counter(
+    "admission_shed_total", "Requests rechazadas con 503 por grupo y motivo", ("group", "reason")
+)
+admission_queue_wait_seconds = Histogram(
+    "admission_queue_wait_seconds", "Espera en la cola de admisión (requests admitidas)", LATENCY_BUCKETS, ("group",)
+)
+
+METRICS = (
+    http_requests_total,
+    http_request_duration_seconds,
+    db_queries_total,
+    db_query_duration_seconds,
+    db_queries_per_request,
+    db_query_seconds_per_request,
+    db_rows_per_request,
+    db_write_batch_size,
+    db_pool_checkout_seconds,
+    db_pool_timeouts_total,
+    db_slow_queries_total,
+    _pool_gauge("size", "Conexiones permanentes configuradas en el pool"),
+    _pool_gauge("checked_out", "Conexiones del pool en uso ahora mismo"),
+    _pool_gauge("checked_in", "Conexiones libres en el pool"),
+    _pool_gauge("overflow", "Conexiones por encima de pool_size (negativo: huecos del pool aún sin abrir)"),
+    admission_shed_total,
+    admission_queue_wait_seconds,
+    _admission_gauge("active", "Requests admitidas en curso por grupo de rutas"),
+    _admission_gauge("queued", "Requests esperando en la cola de admisión"),
+)
+
+
+def render_metrics() -> str:
+    """📝 Todas las métricas en formato de texto de Prometheus"""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+def record_rows(count: int) -> None:
+    """
+    📏 Anota cuántas filas de la BD devuelve la request en curso
+
+    💡 Los eventos de cursor no ven cuántas filas se LEEN (eso ocurre después,
+    en fetchall()), así que lo anota el endpoint, que sí lo sabe.
+    """
+    stats = _current_request.get()
+    if stats is not None:
+        stats.rows += count
+
+
+# 🔌 EVENTOS DEL ENGINE ------------------------------------------------------
+
+def start_statement_timer(conn, context, key: str) -> None:
+    """
+    ⏱️  Guarda el inicio de la sentencia en su ExecutionContext (`context`)
+
+    💡 Si la sentencia falla, after_cursor_execute no se dispara: el contexto
+    muere con ella y no queda nada pendiente. Una pila en conn.info crecería
+    con cada IntegrityError durante toda la vida de la conexión.
+    📝 Sin contexto (sentencias internas de SQLAlchemy) se usa conn.info, que
+    solo guarda el último inicio: tampoco crece.
+    """
+    if context is None:
+        conn.info[key] = time.perf_counter()
+    else:
+        setattr(context, key, time.perf_counter())
+
+
+def statement_elapsed(conn, context, key: str) -> float:
+    """⏱️  Segundos desde start_statement_timer() para la misma sentencia"""
+    start = conn.info[key] if context is None else getattr(context, key)
+    return time.perf_counter() - start
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_statement_timer(conn, context, "metrics_query_start")
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = statement_elapsed(conn, context, "metrics_query_start")
+    # 🏷️  Etiqueta acotada: la primera palabra (SELECT, INSERT...), nunca la sentencia entera
+    kind = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+    if kind not in ("select", "insert", "update", "delete", "with", "pragma"):
+        kind = "other"
+    db_queries_total.inc(kind)
+    db_query_duration_seconds.observe(elapsed, kind)
+
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+
+
+def install_sql_metrics(engine: Engine, name: str) -> None:
+    """
+    📌 Registra los eventos de cronometraje SQL y el pool del engine
+
+    ⚡ Para un AsyncEngine, pasa async_engine.sync_engine (igual que con los PRAGMAs)
+    """
+    if not settings.METRICS_ENABLED:
+        return
+    _engines[name] = engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# 🧅 MIDDLEWARE --------------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    ⏱️  MIDDLEWARE ASGI: mide cada request HTTP y vuelca su RequestStats
+
+    💡 ¿Por qué ASGI "puro" y no @app.middleware("http")?
+    BaseHTTPMiddleware crea tareas y streams intermedios en cada request;
+    aquí solo envolvemos send() para ver el código de estado.
+
+    🏷️  La etiqueta route es la PLANTILLA (/heroes/{hero_id}), no la URL:
+    con la URL real habría una serie nueva por cada ID.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # 🔥 Las requests de calentamiento del arranque (app/warmup.py) no cuentan
+        if scope["type"] != "http" or WARMUP_SCOPE_KEY in scope:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status = 500  # 💥 Si la app lanza una excepción, nunca llega a enviar el estado
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_request.reset(token)
+            route = scope.get("route")
+            # 🚫 Sin ruta = 404 de una URL inexistente: todas a una sola serie
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            http_requests_total.inc(method, route_path, status)
+            http_request_duration_seconds.observe(elapsed, method, route_path)
+            db_queries_per_request.observe(stats.queries, method, route_path)
+            db_query_seconds_per_request.observe(stats.query_seconds, method, route_path)
+            db_rows_per_request.observe(stats.rows, method, route_path)
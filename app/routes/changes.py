@@ -0,0 +1,83 @@
+"""
+📰 Changes routes - Change feed de héroes (delta + Server-Sent Events) 📰
+
+📚 PROPÓSITO EDUCATIVO:
+En lugar de releer GET /heroes/ cada X segundos para descubrir qué cambió,
+el cliente guarda un cursor (seq) y pide solo los cambios posteriores. El
+changelog lo escriben triggers (app/database/schema.py), así que recoge las
+escrituras de /heroes y /heroes_sql, en cualquier backend.
+
+🌐 RUTAS:
+- GET /heroes/changes?since=N - Cambios posteriores a N (paginado con `next`)
+- GET /heroes/changes/stream - Los mismos cambios EMPUJADOS por SSE
+
+⚠️  Se monta ANTES que los routers de héroes: si no, /heroes/{hero_id}
+capturaría "/heroes/changes" (y respondería 422: "changes" no es un int).
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.database.changes import ChangesExpired, change_broadcaster, change_events, read_changes, run_on_db
+from app.database.models import SQLITE_INT_MAX, HeroChangesPage
+
+router = APIRouter(prefix="/heroes", tags=["changes"])
+
+
+@router.get("/changes", response_model=HeroChangesPage)
+async def read_hero_changes(
+    since: Annotated[int | None, Query(ge=0, le=SQLITE_INT_MAX)] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+):
+    """
+    📰 SINCRONIZACIÓN DELTA: cambios con seq > since, del más viejo al más nuevo
+
+    📝 USO:
+    - Sin since → solo {"head": N}: el cursor desde el que empezar
+    - since=N → hasta `limit` cambios; has_more=true → repetir con since=next
+    - 410 Gone → el historial posterior a `since` ya se compactó: leer todo otra vez
+
+    💡 Los cambios dicen QUÉ cambió (op, hero_id, fields); los datos nuevos se
+    piden de una vez con GET /heroes/batch?ids=...
+    """
+    try:
+        return await run_on_db(read_changes, since, limit)
+    except ChangesExpired as error:
+        raise HTTPException(status_code=410, detail=str(error))
+
+
+@router.get("/changes/stream", response_class=StreamingResponse)
+async def stream_hero_changes(
+    since: Annotated[int | None, Query(ge=0, le=SQLITE_INT_MAX)] = None,
+    last_event_id: Annotated[int | None, Header(ge=0, le=SQLITE_INT_MAX)] = None,
+):
+    """
+    📡 SERVER-SENT EVENTS: un evento "change" por cambio, en cuanto se confirma
+
+    📝 FORMATO (text/event-stream):
+    id: 42
+    event: change
+    data: {"seq":42,"op":"update","hero_id":7,"fields":["age"]}
+
+    - Last-Event-ID (lo envía el navegador al reconectar) manda sobre ?since
+    - event: reset → se perdió historial: resincronizar y abrir otro stream
+    - ": ping" cada CHANGES_HEARTBEAT segundos sin cambios
+
+    ⚠️  No pasa por el admission control (una conexión abierta durante horas
+    ocuparía un hueco para siempre): su límite es CHANGES_MAX_SUBSCRIBERS.
+    """
+    if change_broadcaster.full:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many change streams, retry later",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+    start = last_event_id if last_event_id is not None else since
+    return StreamingResponse(
+        change_events(start),
+        media_type="text/event-stream",
+        # 🚫 Sin caché ni buffering en proxies (nginx): cada evento debe salir ya
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,103 @@
+"""
+🔍 Debug routes - Endpoints de diagnóstico 🔍
+
+📚 PROPÓSITO EDUCATIVO:
+Endpoints de solo lectura para observar el estado interno de la aplicación
+mientras está en marcha: nos ayudan a medir y ajustar el rendimiento.
+
+🌐 RUTAS:
+- GET /debug/cache - Contadores de la caché de héroes (aciertos, fallos, expulsiones)
+- GET /debug/pool - Pools de conexiones: configuración, ocupación y esperas
+- GET /debug/admission - Admission control: en curso, en cola y rechazadas por grupo
+- GET /debug/slow-queries - Últimas consultas lentas con su ruta y su EXPLAIN QUERY PLAN
+- GET /debug/changes - Change feed: streams SSE abiertos, lotes publicados/perdidos
+"""
+from fastapi import APIRouter
+
+from app.admission import admission_gates
+from app.cache import hero_cache
+from app.config import settings
+from app.database.changes import change_broadcaster, change_compactor
+from app.database.pooling import pool_report, pool_stats
+from app.database.slow_queries import slow_query_log
+
+# 🛣️  Router: prefix="/debug" agrupa todas las rutas de diagnóstico
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/cache")
+def read_cache_stats():
+    """
+    🧠 ESTADÍSTICAS DE LA CACHÉ
+
+    📊 ¿Cómo interpretarlas?
+    - hit_ratio bajo → quizá CACHE_MAX_ENTRIES es pequeño o CACHE_TTL_SECONDS muy corto
+    - muchas evictions → la caché está llena; subir CACHE_MAX_ENTRIES
+    - muchas invalidations → hay mucha escritura; la caché ayuda menos
+    """
+    return hero_cache.stats()
+
+
+@router.get("/pool")
+def read_pool_stats():
+    """
+    🏊 ESTADO DE LOS POOLS DE CONEXIONES (uno por engine: sync, read-0, async...)
+
+    📊 ¿Cómo interpretarlo?
+    - waiting > 0 o timeouts subiendo → el pool se queda corto (POOL_SIZE/POOL_MAX_OVERFLOW)
+    - peak_checked_out muy por debajo de size → sobran conexiones abiertas
+    - checkout_seconds con buckets altos → las requests esperan conexión ANTES de su SQL
+    - overflow alto y sostenido → subir POOL_SIZE (las de overflow se abren y cierran)
+    """
+    return {name: pool_report(stats) for name, stats in pool_stats.items()}
+
+
+@router.get("/admission")
+def read_admission_stats():
+    """
+    🚦 ESTADO DEL ADMISSION CONTROL (una puerta por grupo de rutas)
+
+    📊 ¿Cómo interpretarlo?
+    - queued > 0 a menudo → el grupo va al límite (ADMISSION_CONCURRENCY)
+    - shed.queue_full / shed.queue_timeout subiendo → sobrecarga: se rechaza con 503
+    - shed.pool_timeout → el pool de la BD se queda corto aun con la puerta
+    (threadpool_size es el límite de threads de los endpoints "def")
+    """
+    return {
+        "enabled": settings.ADMISSION_CONTROL,
+        "threadpool_size": settings.THREADPOOL_SIZE,
+        "retry_after": settings.ADMISSION_RETRY_AFTER,
+        "groups": {name: gate.stats() for name, gate in admission_gates.items()},
+    }
+
+
+@router.get("/slow-queries")
+def read_slow_queries():
+    """
+    🐢 CONSULTAS LENTAS (las más recientes primero, hasta SLOW_QUERY_BUFFER)
+
+    📊 ¿Cómo interpretarlas?
+    - plan con "SCAN heroes" → recorre la tabla entera: falta un índice o el filtro no lo usa
+    - plan con "USE TEMP B-TREE FOR ORDER BY" → ordena en memoria en cada consulta
+    - plan bueno pero duration_ms alto → espera de locks o BD saturada (mira /debug/pool)
+    - suppressed > 0 → hubo más lentas de las que SLOW_QUERY_RATE deja registrar
+    """
+    return {"enabled": settings.SLOW_QUERY_LOG, **slow_query_log.report()}
+
+
+@router.get("/changes")
+def read_change_feed_stats():
+    """
+    📰 ESTADO DEL CHANGE FEED (broadcaster SSE + compactación)
+
+    📊 ¿Cómo interpretarlo?
+    - dropped subiendo → hay streams lentos: recuperan el hueco leyendo de la BD
+    - subscribers cerca de max_subscribers → subir CHANGES_MAX_SUBSCRIBERS
+    - compacted alto → mucha escritura: quizá CHANGES_RETENTION se queda corto
+      para clientes que se desconectan un rato (recibirían 410 / reset)
+    """
+    return {
+        **change_broadcaster.stats(),
+        "retention": change_compactor.keep,
+        "compacted": change_compactor.deleted,
+    }
@@ -24,17 +24,73 @@ Compara este archivo con heroes_sql.py para ver las diferencias entre ORM y SQL
 - Puede ser más lento en consultas complejas
 - Curva de aprendizaje adicional
 """
-from typing import Annotated
+import logging
+from typing import Annotated, Any
 
 # FastAPI imports - Framework web para crear APIs REST
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 # SQLModel imports - ORM que combina SQLAlchemy + Pydantic
-from sqlmodel import select  # Constructor de consultas SQL de forma pythónica
+from sqlmodel import Session, and_, delete, or_, select, update  # Constructores de consultas SQL de forma pythónica
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # INSERT con ON CONFLICT
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 # Imports locales - Nuestros modelos y configuración
-from app.database.share_db_session import SessionDep  # Dependencia de sesión DB
-from app.database.models import Hero, HeroCreate, HeroPublic, HeroUpdate
+from app.cache import MISSING, PageRange, hero_cache
+from app.config import settings
+from app.database.share_db_session import ReadSessionDep, WriteSessionDep  # Sesiones de lectura/escritura
+from app.database.batch import BatchBodyIdsDep, BatchLoader, BatchQueryIdsDep, load_batch
+from app.database.bulk import (
+    BULK_OPENAPI_EXTRA,
+    bulk_outcomes,
+    check_bulk_size,
+    chunked,
+    delete_filters,
+    group_updates,
+    read_bulk_heroes,
+    update_statuses,
+)
+from app.database.counts import orm_total_statement, set_total_headers
+from app.database.export import ExportFormat, export_response, stream_partitions
+from app.database.filters import (
+    HeroFiltersDep,
+    next_list_cursor,
+    orm_conditions,
+    orm_order_by,
+    resolve_list_position,
+)
+from app.database.group_commit import run_write
+from app.database.pagination import decode_rank_cursor, next_rank_cursor_for
+from app.database.search import heroes_fts, match, rank_window_bound, to_match_query
+from app.database.serialization import batch_payload, hero_payload, heroes_payload, json_response
+from app.database.versions import (
+    etag_matches,
+    hero_etag,
+    list_etag,
+    not_modified,
+    orm_hero_with_version,
+    read_hero_version,
+    read_table_version,
+)
+from app.metrics import record_rows
+from app.database.models import (
+    SQLITE_INT_MAX,
+    SQLITE_INT_MIN,
+    Hero,
+    HeroBatchResult,
+    HeroBulkDelete,
+    HeroBulkItem,
+    HeroBulkResult,
+    HeroBulkUpdateItem,
+    HeroBulkWriteResult,
+    HeroCreate,
+    HeroPublic,
+    HeroUpdate,
+)
+
+logger = logging.getLogger(__name__)
 
 # 🛣️  Router: Agrupa endpoints relacionados con héroes (versión ORM)
 # prefix="/heroes" significa que todas las rutas empiezan con /heroes
@@ -42,7 +98,7 @@ router = APIRouter(prefix="/heroes", tags=["heroes"])
 
 
 @router.post("/", response_model=HeroPublic)
-def create_hero(hero: HeroCreate, session: SessionDep):
+def create_hero(hero: HeroCreate, session: WriteSessionDep):
     """
     🎯 LECCIÓN 1: CREAR un nuevo héroe usando SQLModel ORM
     
@@ -50,8 +106,8 @@ def create_hero(hero: HeroCreate, session: SessionDep):
     - ORM maneja automáticamente el SQL INSERT
     - model_validate() convierte schemas a modelos de tabla
     - session.add() añade objeto a la sesión (no a la BD aún)
-    - session.commit() guarda cambios en la base de datos
-    - session.refresh() actualiza objeto con datos de la BD (como el ID)
+    - session.flush() ejecuta el INSERT y rellena el ID generado
+    - run_write() confirma la transacción (sola, o agrupada con WRITE_MODE=group)
     
     📝 COMPARACIÓN con SQL puro:
     ORM: 4 líneas de código
@@ -60,172 +116,596 @@ def create_hero(hero: HeroCreate, session: SessionDep):
     🔄 FLUJO:
     1. Convertir HeroCreate a modelo Hero
     2. Añadir a sesión (en memoria)
-    3. Confirmar transacción (guardar en BD)
-    4. Refrescar para obtener ID generado
+    3. flush() para escribirlo y obtener el ID
+    4. Confirmar transacción (guardar en BD)
+    """
+    
+    def insert_hero(db: Session) -> HeroPublic:
+        # 📝 db: la sesión donde se escribe (la de la request, o la del escritor de grupo)
+        
+        # PASO 1: Convertir schema HeroCreate a modelo de tabla Hero
+        # 💡 model_validate() toma los datos de HeroCreate y crea un objeto Hero
+        # 🔄 Equivale a: Hero(name=hero.name, age=hero.age, secret_name=hero.secret_name)
+        db_hero = Hero.model_validate(hero)
+        
+        # PASO 2: Añadir el objeto a la sesión (aún no está en la BD)
+        # 📝 session.add() marca el objeto para ser insertado
+        db.add(db_hero)
+        
+        # PASO 3: Ejecutar el INSERT sin confirmar todavía
+        # 🆔 flush() envía el INSERT y SQLite devuelve el ID auto-generado:
+        # no hace falta el SELECT de session.refresh()
+        db.flush()
+        
+        # ⚠️  Copiar a HeroPublic ANTES del commit (commit() "caduca" los objetos)
+        return HeroPublic.model_validate(db_hero)
+    
+    # PASO 4: Confirmar la transacción (guardar en base de datos)
+    # 💾 run_write() ejecuta insert_hero y hace el commit
+    public_hero = run_write(session, insert_hero)
+    
+    # PASO 5: Invalidar la caché (el héroe nuevo puede aparecer en la última página)
+    hero_cache.invalidate(public_hero.id, shifts=True)
+    
+    # PASO 6: Devolver el héroe
+    return public_hero
+
+
+@router.post("/bulk", response_model=HeroBulkResult, openapi_extra=BULK_OPENAPI_EXTRA)
+def create_heroes_bulk(
+    heroes: Annotated[list[HeroBulkItem], Depends(read_bulk_heroes)],
+    session: WriteSessionDep,
+    upsert: bool = False,
+):
+    """
+    🎯 LECCIÓN 1B: CREAR muchos héroes de una sola vez usando ORM
+    
+    Conceptos que aprenderás aquí:
+    - insert(Hero) con una LISTA de diccionarios = inserción masiva (executemany)
+    - returning(..., sort_by_parameter_order=True) garantiza el orden de los IDs
+    - on_conflict_do_update() para "upsert" (INSERT o UPDATE según el ID)
+    - UNA sola transacción (un solo commit) para todos los lotes
+    
+    📝 COMPARACIÓN con POST /heroes/:
+    Individual: 1 request + 1 INSERT + 1 COMMIT + 1 SELECT (refresh) por héroe
+    Masivo:     1 request + 1 INSERT por lote + 1 COMMIT en total
+    
+    📄 FORMATOS: JSON array o NDJSON (Content-Type: application/x-ndjson)
+    """
+    
+    # PASO 1: Construir la sentencia INSERT ... RETURNING id
+    # 🔢 sort_by_parameter_order=True: ids[i] corresponde siempre a heroes[i]
+    stmt = sqlite_insert(Hero).returning(Hero.id, sort_by_parameter_order=True)
+    if upsert:
+        # 🔄 ON CONFLICT (id) DO UPDATE: si el ID ya existe, se actualiza la fila
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Hero.id],
+            set_={
+                "name": stmt.excluded.name,
+                "age": stmt.excluded.age,
+                "secret_name": stmt.excluded.secret_name,
+            },
+        )
+    
+    # PASO 2: Insertar por lotes dentro de UNA transacción
+    ids: list[int] = []
+    try:
+        for chunk in chunked(heroes, settings.BULK_CHUNK_SIZE):
+            # 💡 id=None deja que SQLite genere el ID automáticamente
+            rows = [hero.model_dump() for hero in chunk]
+            ids.extend(session.execute(stmt, rows).scalars().all())
+        session.commit()
+    except IntegrityError:
+        # 🚫 HTTP 409 = "Conflict" - p.ej. un ID repetido sin upsert=true
+        # ↩️  rollback: NINGÚN héroe del request queda guardado (todo o nada)
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Hero id already exists")
+    
+    # PASO 3: Invalidar la caché de todos los héroes insertados o actualizados
+    hero_cache.invalidate_many(ids, shifts=True)
+    
+    # PASO 4: Devolver los IDs en el mismo orden del request
+    return HeroBulkResult(ids=ids)
+
+
+@router.patch("/bulk", response_model=HeroBulkWriteResult)
+def update_heroes_bulk(items: list[HeroBulkUpdateItem], session: WriteSessionDep):
+    """
+    🎯 LECCIÓN 4B: ACTUALIZAR muchos héroes de una vez usando ORM
+    
+    Conceptos que aprenderás aquí:
+    - "ORM Bulk UPDATE by Primary Key": session.execute(update(Hero), [filas])
+    - UNA sentencia (executemany) por cada conjunto distinto de columnas
+    - Un resultado por héroe (updated / unchanged / not_found) en lugar de un 404
+    - UNA sola transacción para todo el request
+    
+    📝 SQL GENERADO ([{"id": 1, "age": 26}, {"id": 2, "age": 40}, {"id": 3, "name": "Thor"}]):
+    UPDATE heroes SET age=? WHERE heroes.id = ?     ← executemany con 2 filas
+    UPDATE heroes SET name=? WHERE heroes.id = ?    ← 1 fila
+    
+    ⚠️  El ORM exige que cada ID exista (si no, StaleDataError): por eso
+    antes se comprueba qué IDs existen, con un SELECT ... IN por lote.
     """
     
-    # PASO 1: Convertir schema HeroCreate a modelo de tabla Hero
-    # 💡 model_validate() toma los datos de HeroCreate y crea un objeto Hero
-    # 🔄 Equivale a: Hero(name=hero.name, age=hero.age, secret_name=hero.secret_name)
-    db_hero = Hero.model_validate(hero)
+    # PASO 1: Agrupar las actualizaciones por columnas enviadas
+    groups = group_updates(items)
+    
+    # PASO 2: ¿Qué IDs existen? (BatchLoader: WHERE id IN (...) por lote)
+    _, missing = load_batch(get_hero_loader(session), [item.id for item in items])
+    statuses = update_statuses(items, missing)
+    
+    # PASO 3: Un UPDATE por grupo, solo con los héroes que existen
+    # 💡 El ORM agrupa en un executemany las filas SEGUIDAS con las mismas columnas:
+    # por eso se le pasa cada grupo por separado
+    try:
+        for columns, rows in groups.items():
+            rows = [row for row in rows if statuses[row["id"]] == "updated"]
+            if columns and rows:
+                session.execute(update(Hero), rows)
+        session.commit()
+    except StaleDataError:
+        # 🏁 Otra request borró alguno de los héroes entre el PASO 2 y el 3
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Heroes changed during the bulk update, retry")
+    except IntegrityError:
+        # 🚫 p.ej. {"name": null}: name es NOT NULL → no se guarda NADA del request
+        session.rollback()
+        raise HTTPException(status_code=400, detail="Bulk update violates a database constraint")
+    
+    # PASO 4: Invalidar la caché de los héroes actualizados
+    hero_cache.invalidate_many([hero_id for hero_id, status in statuses.items() if status == "updated"], shifts=False)
+    
+    return bulk_outcomes(statuses)
+
+
+@router.delete("/bulk", response_model=HeroBulkWriteResult)
+def delete_heroes_bulk(body: HeroBulkDelete, session: WriteSessionDep):
+    """
+    🎯 LECCIÓN 5B: ELIMINAR muchos héroes de una vez usando ORM
+    
+    Conceptos que aprenderás aquí:
+    - delete(Hero).where(Hero.id.in_(ids)): UN DELETE por lote de IDs
+    - O un DELETE con los filtros del listado (orm_conditions)
+    - .returning(Hero.id): qué se borró, para dar un resultado por ID
     
-    # PASO 2: Añadir el objeto a la sesión (aún no está en la BD)
-    # 📝 session.add() marca el objeto para ser insertado
-    session.add(db_hero)
+    📝 SQL GENERADO:
+    {"ids": [1, 2, 999]}             → DELETE FROM heroes WHERE id IN (?, ?, ?) RETURNING id
+    {"filter": {"name_prefix": "T"}} → DELETE FROM heroes WHERE name >= ? AND name < ? RETURNING id
     
-    # PASO 3: Confirmar la transacción (guardar en base de datos)
-    # 💾 session.commit() ejecuta el INSERT automáticamente
+    🚧 Con filtro se cuenta antes (count(*) sobre su índice): si borraría más de
+    BULK_MAX_ITEMS héroes → 413 sin borrar nada, igual que con ids
+    """
+    
+    # PASO 1: ¿Por IDs o por filtro? (400 si no es exactamente uno de los dos)
+    filters = delete_filters(body)
+    
+    # PASO 2: Borrar en UNA transacción, recibiendo los IDs borrados
+    if filters is None:
+        ids = list(dict.fromkeys(body.ids))
+        deleted: set[int] = set()
+        for chunk in chunked(ids, settings.BATCH_CHUNK_SIZE):
+            deleted.update(session.scalars(delete(Hero).where(Hero.id.in_(chunk)).returning(Hero.id)))
+    else:
+        check_bulk_size(session.exec(orm_total_statement(filters)).one())
+        statement = delete(Hero).where(*orm_conditions(filters, None, None)).returning(Hero.id)
+        ids = sorted(session.scalars(statement))
+        deleted = set(ids)
     session.commit()
     
-    # PASO 4: Refrescar el objeto para obtener datos generados por la BD
-    # 🆔 session.refresh() ejecuta un SELECT para obtener el ID auto-generado
-    # 🔄 Equivale al RETURNING en la versión SQL
-    session.refresh(db_hero)
+    # PASO 3: Invalidar la caché (borrar desplaza las páginas con OFFSET)
+    hero_cache.invalidate_many(list(deleted), shifts=True)
     
-    # PASO 5: Devolver el objeto (automáticamente se convierte a HeroPublic)
-    return db_hero
+    return bulk_outcomes({hero_id: "deleted" if hero_id in deleted else "not_found" for hero_id in ids})
 
 
 @router.get("/", response_model=list[HeroPublic])
 def read_heroes(
-    session: SessionDep,
-    offset: int = 0,
+    session: ReadSessionDep,
+    request: Request,
+    response: Response,
+    filters: HeroFiltersDep,
+    if_none_match: Annotated[str | None, Header()] = None,
+    cursor: str | None = None,
+    after_id: Annotated[int | None, Query(ge=SQLITE_INT_MIN, le=SQLITE_INT_MAX)] = None,
+    offset: Annotated[int, Query(deprecated=True)] = 0,
     limit: Annotated[int, Query(le=100)] = 100,
+    include_total: bool = False,
 ):
     """
     🎯 LECCIÓN 2: OBTENER todos los héroes con paginación usando ORM
     
     Conceptos que aprenderás aquí:
     - select() constructor de consultas pythónico
-    - Métodos .offset() y .limit() para paginación
+    - Paginación keyset con .where(Hero.id > after_id) y .limit()
     - session.exec() ejecuta la consulta construida
     - .all() obtiene todos los resultados como lista
     
     📝 COMPARACIÓN con SQL puro:
-    ORM: select(Hero).offset(offset).limit(limit)
-    SQL: "SELECT id, name, age FROM heroes ORDER BY id LIMIT :limit OFFSET :offset"
+    ORM: select(Hero).where(Hero.id > after_id).order_by(Hero.id).limit(limit)
+    SQL: "SELECT id, name, age FROM heroes WHERE id > :after_id ORDER BY id LIMIT :limit"
+    
+    📄 PAGINACIÓN:
+    - cursor: valor opaco devuelto en la cabecera X-Next-Cursor (recomendado)
+    - after_id: alternativa explícita al cursor
+    - offset: solo por compatibilidad (lento en páginas profundas)
+    
+    🧮 FILTROS Y ORDEN (ver app/database/filters.py):
+    - min_age / max_age: rango de edad → índice ix_heroes_age
+    - name / name_prefix: nombre exacto o que empieza por... → índice ix_heroes_name
+    - sort: id, name o age (con "-" delante, descendente)
+    - include_total: añade X-Total-Count y Link (ver app/database/counts.py)
+    
+    🏷️  ETAG: cambia con cualquier escritura en la tabla; con If-None-Match
+    vigente se responde 304 sin ejecutar la consulta del listado
     
     💡 VENTAJA: El ORM genera automáticamente el SQL óptimo
     """
     
-    # PASO 1: Construir consulta usando el constructor select()
-    # 🏗️  select(Hero) equivale a "SELECT * FROM heroes"
-    # 📄 .offset() y .limit() añaden paginación automáticamente
-    # 🔄 SQLModel genera el ORDER BY automáticamente para consistencia
-    query = select(Hero).offset(offset).limit(limit)
-    
-    # PASO 2: Ejecutar la consulta y obtener todos los resultados
+    # PASO 1: Decidir desde dónde continuar (cursor, after_id u offset)
+    # 🔑 key: valor de la columna de orden en la última fila (solo sort=name/age)
+    after_id, key = resolve_list_position(cursor, after_id, offset, filters)
+    
+    # PASO 1B: ¿Ya tenemos esta página en caché?
+    # 🔖 El token se toma ANTES de leer la BD (ver HeroCache en app/cache.py)
+    cache_params = (after_id, key, offset, limit, filters, include_total)
+    token = hero_cache.read_token()
+    cached = hero_cache.get_list(cache_params)
+    if cached is not MISSING:
+        heroes, next_cursor, etag, total = cached
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if include_total:
+            set_total_headers(response, request, total, next_cursor)
+        # ⚡ Con RESPONSE_MODE=fast la caché guarda los bytes JSON: nada que serializar
+        return json_response(heroes, response)
+    
+    # PASO 1C: Consulta barata de la versión de la tabla → ¿304?
+    # 📭 Si el cliente ya tiene esta versión no hace falta leer ni serializar nada
+    etag = list_etag(read_table_version(session))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    # PASO 2: Construir consulta usando el constructor select()
+    # 🏗️  select(Hero.id, Hero.name, Hero.age): solo las columnas públicas, como
+    # filas (Row) en lugar de objetos Hero que el ORM tendría que construir y vigilar
+    # 🔄 ORDER BY es obligatorio: la paginación keyset depende del orden
+    # 🚀 Filtros y keyset son rangos sobre índices (sin recorrer la tabla)
+    query = (
+        select(Hero.id, Hero.name, Hero.age)
+        .where(*orm_conditions(filters, after_id, key))
+        .order_by(*orm_order_by(filters))
+        .limit(limit)
+    )
+    if after_id is None and offset:
+        # 🐢 Camino heredado: SQLite recorre y descarta `offset` filas
+        query = query.offset(offset)
+    
+    # PASO 3: Ejecutar la consulta y obtener todos los resultados
     # 🚀 session.exec() ejecuta la consulta construida
-    # 📊 .all() devuelve lista de objetos Hero (no Row objects como en SQL puro)
-    heroes = session.exec(query).all()
+    # 📊 .all() devuelve lista de Row (id, name, age), igual que en SQL puro
+    rows = session.exec(query).all()
+    
+    # 📝 Log estructurado (DEBUG: apagado por defecto, sin coste en el camino caliente)
+    logger.debug("heroes_listed", extra={"router": "orm", "count": len(rows)})
+    record_rows(len(rows))  # 📈 Filas devueltas por esta request (métricas)
+    
+    # PASO 4: Informar al cliente cómo pedir la siguiente página
+    ids = [row.id for row in rows]
+    keys = [(getattr(row, filters.sort_column), row.id) for row in rows]
+    next_cursor = next_list_cursor(keys, limit, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    # PASO 4B: Total opcional (include_total=true)
+    # 🧮 Sin filtros lo da table_counts; con filtros, count(*) sobre su índice
+    total = None
+    if include_total:
+        total = session.exec(orm_total_statement(filters)).one()
+        set_total_headers(response, request, total, next_cursor)
+    
+    # PASO 5: Convertir las filas en la respuesta (ver app/database/serialization.py)
+    # ⚡ RESPONSE_MODE=fast: bytes JSON de una pasada, sin validar un HeroPublic por fila
+    heroes = heroes_payload(rows)
+    
+    # PASO 6: Guardar la página en caché (bytes o HeroPublic, nunca objetos del ORM)
+    # 📏 Solo con sort=id los IDs de la página forman un rango invalidable
+    # 🧮 Con total, CUALQUIER escritura puede cambiarlo: se invalida siempre
+    # 🔀 Con filtros y OFFSET, un UPDATE que mete o saca de los filtros un ID
+    #    anterior desplaza la página sin tocar su rango: también se invalida siempre
+    if filters.sort == "id" and not include_total and not (offset and filters.index_column):
+        page = PageRange.for_page(after_id, offset, ids, limit)
+    else:
+        page = PageRange.everything()
+    hero_cache.store_list(cache_params, page, (heroes, next_cursor, etag, total), token)
+    
+    # PASO 7: Devolver la página (el esquema OpenAPI sigue siendo list[HeroPublic])
+    return json_response(heroes, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_heroes(fmt: Annotated[ExportFormat, Query(alias="format")] = "ndjson"):
+    """
+    🎯 LECCIÓN 2B: EXPORTAR toda la tabla en streaming usando ORM
+    
+    Conceptos que aprenderás aquí:
+    - select() de COLUMNAS concretas (no objetos Hero completos)
+    - yield_per: el ORM entrega las filas por lotes en lugar de .all()
+    - StreamingResponse: el cliente recibe datos mientras se leen de la BD
+    
+    📝 FORMATOS:
+    - GET /heroes/export → NDJSON (un héroe por línea)
+    - GET /heroes/export?format=csv → CSV con cabecera
     
-    print(f"🦸‍♂️ Heroes retornados con ORM: {len(heroes)}")  # Log para debugging
+    💡 VENTAJA: La memoria usada es la misma con 10 héroes o con 10 millones
+    """
     
-    # PASO 3: Devolver lista (conversión automática a HeroPublic)
-    # ✨ SQLModel convierte automáticamente Hero -> HeroPublic
-    return heroes
+    # 🏗️  Solo columnas públicas: secret_name NUNCA se exporta
+    query = select(Hero.id, Hero.name, Hero.age).order_by(Hero.id)
+    return export_response(stream_partitions(query), fmt)
+
+
+@router.get("/search", response_model=list[HeroPublic])
+def search_heroes(
+    session: ReadSessionDep,
+    response: Response,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+):
+    """
+    🎯 LECCIÓN 2C: BUSCAR héroes por nombre (texto completo, FTS5) usando ORM
+    
+    Conceptos que aprenderás aquí:
+    - JOIN con una tabla virtual que no es un modelo (heroes_fts)
+    - MATCH: el índice invertido encuentra las filas sin recorrer la tabla
+    - ORDER BY rank: los más relevantes primero (bm25)
+    - Paginación keyset sobre (rank, id) con cursor opaco
+    
+    📝 EJEMPLOS:
+    - GET /heroes/search?q=spider      → "Spider-Man", "Spider-Woman"...
+    - GET /heroes/search?q=spi%20bo    → palabras que empiezan por "spi" Y "bo"
+    
+    📄 PAGINACIÓN: la cabecera X-Next-Cursor trae el cursor de la página siguiente
+    """
+    
+    # PASO 1: Texto del usuario → consulta FTS5 segura
+    match_query = to_match_query(q)
+    
+    # PASO 2: JOIN por rowid (= heroes.id) y orden por relevancia
+    # 🔄 rowid desempata: sin él, dos héroes con el mismo rank podrían
+    # repetirse o perderse entre páginas
+    query = (
+        select(Hero.id, Hero.name, Hero.age, heroes_fts.c.rank)
+        .join(heroes_fts, heroes_fts.c.rowid == Hero.id)
+        .where(match(match_query))
+        .order_by(heroes_fts.c.rank, heroes_fts.c.rowid)
+        .limit(limit)
+    )
+    
+    # PASO 3: Continuar después de la última fila de la página anterior
+    if cursor is not None:
+        rank, after_id = decode_rank_cursor(cursor)
+        query = query.where(or_(
+            heroes_fts.c.rank > rank,
+            and_(heroes_fts.c.rank == rank, heroes_fts.c.rowid > after_id),
+        ))
+    
+    # PASO 3B: Búsquedas muy amplias → puntuar solo las primeras coincidencias
+    bound = rank_window_bound(session, match_query)
+    if bound is not None:
+        query = query.where(heroes_fts.c.rowid < bound)
+    
+    rows = session.exec(query).all()
+    record_rows(len(rows))
+    
+    # PASO 4: Cursor de la página siguiente (si la página vino llena)
+    next_cursor = next_rank_cursor_for([(row.rank, row.id) for row in rows], limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return json_response(heroes_payload(rows), response)
+
+
+# 🧺 LECTURA POR LOTES ---------------------------------------------------------
+
+def get_hero_loader(session: ReadSessionDep) -> BatchLoader[int, Any]:
+    """🔌 DEPENDENCIA: un BatchLoader por request (FastAPI lo comparte dentro de ella)"""
+    def fetch(ids):
+        query = select(Hero.id, Hero.name, Hero.age).where(Hero.id.in_(ids))
+        return {row.id: row for row in session.exec(query)}
+    return BatchLoader(fetch)
+
+
+HeroLoaderDep = Annotated[BatchLoader[int, Any], Depends(get_hero_loader)]
+
+
+@router.get("/batch", response_model=HeroBatchResult)
+def read_heroes_batch(ids: BatchQueryIdsDep, loader: HeroLoaderDep, response: Response):
+    """
+    🎯 LECCIÓN 3B: OBTENER muchos héroes por ID en una sola request usando ORM
+    
+    Conceptos que aprenderás aquí:
+    - Hero.id.in_(ids): el ORM genera WHERE id IN (...)
+    - BatchLoader (app/database/batch.py): agrupa los ids en lotes y recuerda los cargados
+    - Los ids que no existen se devuelven en "missing" (sin 404)
+    
+    📝 EJEMPLO:
+    GET /heroes/batch?ids=3,1,999
+    → {"heroes": [<héroe 3>, <héroe 1>], "missing": [999]}
+    
+    💡 Los héroes llegan en el ORDEN pedido, no en el de la BD
+    """
+    heroes, missing = load_batch(loader, ids)
+    record_rows(len(heroes))
+    return json_response(batch_payload(heroes, missing), response)
+
+
+@router.post("/batch", response_model=HeroBatchResult)
+def read_heroes_batch_body(ids: BatchBodyIdsDep, loader: HeroLoaderDep, response: Response):
+    """
+    🎯 LECCIÓN 3C: Igual que GET /heroes/batch, con los ids en el body
+    
+    📝 EJEMPLO:
+    POST /heroes/batch
+    {"ids": [3, 1, 999]}
+    
+    💡 POST no porque escriba nada, sino porque una lista larga de ids no cabe en una URL
+    """
+    return read_heroes_batch(ids, loader, response)
 
 
 @router.get("/{hero_id}", response_model=HeroPublic)
-def read_hero(hero_id: int, session: SessionDep):
+def read_hero(
+    hero_id: int,
+    session: ReadSessionDep,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
     """
     🎯 LECCIÓN 3: OBTENER un héroe específico por ID usando ORM
     
     Conceptos que aprenderás aquí:
-    - session.get() método directo para buscar por clave primaria
+    - select(Hero, ...) con outerjoin(): el héroe y su versión en UNA consulta
     - Simplicidad del ORM vs consultas SQL manuales
     - Manejo automático de tipos de datos
     
     📝 COMPARACIÓN con SQL puro:
-    ORM: session.get(Hero, hero_id)
-    SQL: "SELECT id, name, age FROM heroes WHERE id = :hero_id" + fetchone()
+    ORM: session.execute(orm_hero_with_version(hero_id)).first()
+    SQL: "SELECT h.id, h.name, h.age, coalesce(v.version, 0) ... LEFT JOIN hero_versions" + fetchone()
     
-    💡 VENTAJA: Una sola línea de código para operación común
-    """
+    🏷️  ETAG: con If-None-Match vigente se responde 304 sin cargar el héroe
     
-    # PASO 1: Buscar héroe por ID usando session.get()
-    # 🎯 session.get(Modelo, id) es el método más eficiente para buscar por clave primaria
-    # 🔍 Automáticamente ejecuta "SELECT * FROM heroes WHERE id = ?"
-    hero = session.get(Hero, hero_id)
+    💡 session.get(Hero, hero_id) sería una línea, pero no trae la versión:
+    el ETag costaría una segunda consulta en cada lectura
+    """
     
-    # PASO 2: Validar que el héroe existe
-    if not hero:
+    # PASO 1: Buscar primero en la caché (sin tocar la base de datos)
+    token = hero_cache.read_token()
+    cached = hero_cache.get_hero(hero_id)
+    if cached is not MISSING:
+        public_hero, etag = cached
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        return json_response(public_hero, response)
+    
+    # PASO 1B: Con If-None-Match, consulta barata de la versión → 404 o 304 sin cargar el héroe
+    # 💡 Sin la cabecera no hay 304 posible: la versión llega con el héroe (PASO 2)
+    if if_none_match:
+        version = read_hero_version(session, hero_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Hero not found")
+        if etag_matches(if_none_match, hero_etag(hero_id, version)):
+            return not_modified(hero_etag(hero_id, version))
+    
+    # PASO 2: Buscar héroe por ID junto con su versión (LEFT JOIN a hero_versions)
+    # 🔍 Ejecuta "SELECT heroes.*, coalesce(version, 0) ... WHERE heroes.id = ?"
+    row = session.execute(orm_hero_with_version(hero_id)).first()
+    
+    # PASO 3: Validar que el héroe existe
+    if not row:
         # 🚫 HTTP 404 = "Not Found" - El recurso solicitado no existe
         raise HTTPException(status_code=404, detail="Hero not found")
-    
-    # PASO 3: Devolver el héroe (conversión automática a HeroPublic)
-    return hero
+    hero, version = row
+    etag = hero_etag(hero_id, version)
+    
+    # PASO 4: Guardar en caché y devolver el héroe (bytes JSON o HeroPublic)
+    record_rows(1)
+    public_hero = hero_payload(hero)
+    hero_cache.store_hero(hero_id, (public_hero, etag), token)
+    response.headers["ETag"] = etag
+    return json_response(public_hero, response)
 
 
 @router.patch("/{hero_id}", response_model=HeroPublic)
-def update_hero(hero_id: int, hero: HeroUpdate, session: SessionDep):
+def update_hero(hero_id: int, hero: HeroUpdate, session: WriteSessionDep):
     """
     🎯 LECCIÓN 4: ACTUALIZAR un héroe usando ORM (SIMPLE vs SQL)
     
     Conceptos que aprenderás aquí:
-    - session.get() para obtener el objeto a modificar
-    - sqlmodel_update() para actualización parcial automática
-    - ORM maneja automáticamente campos opcionales
-    - Transacciones automáticas más simples
+    - update(Hero): UPDATE "ORM-enabled" sin cargar antes el objeto
+    - .values(**datos) para actualización parcial
+    - .returning(Hero): el UPDATE devuelve el héroe ya actualizado
+    - El 404 se decide por la fila devuelta
     
     📝 COMPARACIÓN con SQL puro:
-    ORM: 6 líneas simples
-    SQL: ~30 líneas con construcción dinámica de queries
+    ORM: update(Hero).where(Hero.id == id).values(**datos).returning(Hero)
+    SQL: UPDATE heroes SET ... WHERE id = :hero_id RETURNING id, name, age
     
-    💡 VENTAJA: ORM maneja automáticamente la lógica de actualización parcial
-    """
+    🚀 RENDIMIENTO:
+    El camino clásico (session.get + commit + session.refresh) hace
+    SELECT + UPDATE + SELECT. Con RETURNING es UNA sola sentencia.
     
-    # PASO 1: Obtener el héroe existente de la base de datos
-    hero_db = session.get(Hero, hero_id)
-    if not hero_db:
-        raise HTTPException(status_code=404, detail="Hero not found")
+    💡 VENTAJA: El ORM sigue construyendo el SQL y devolviendo objetos Hero
+    """
     
-    # PASO 2: Extraer solo los campos que fueron enviados
+    # PASO 1: Extraer solo los campos que fueron enviados
     # 🎯 exclude_unset=True ignora campos no enviados (igual que en SQL)
     hero_data = hero.model_dump(exclude_unset=True)
-    
-    # PASO 3: Actualizar el objeto con los nuevos datos
-    # ✨ sqlmodel_update() es un método mágico que actualiza solo campos enviados
-    # 🔄 Equivale a hero_db.name = hero_data["name"] para cada campo
-    hero_db.sqlmodel_update(hero_data)
-    
-    # PASO 4: Guardar cambios en la base de datos
-    session.add(hero_db)  # Marcar objeto como modificado
-    session.commit()      # Ejecutar UPDATE automáticamente
-    session.refresh(hero_db)  # Refrescar objeto con datos actualizados
-    
-    return hero_db
+    if not hero_data:
+        # Nada que actualizar: devolver el héroe tal cual (un solo SELECT)
+        hero_db = session.get(Hero, hero_id)
+        if not hero_db:
+            raise HTTPException(status_code=404, detail="Hero not found")
+        return hero_db
+    
+    def update_hero_row(db: Session) -> HeroPublic:
+        # PASO 2: UPDATE + RETURNING en una sola sentencia
+        # 🔙 scalars().one_or_none() → el Hero actualizado, o None si el ID no existe
+        statement = update(Hero).where(Hero.id == hero_id).values(**hero_data).returning(Hero)
+        hero_db = db.scalars(statement).one_or_none()
+        if hero_db is None:
+            # ↩️  run_write() deshace la transacción al recibir la excepción
+            raise HTTPException(status_code=404, detail="Hero not found")
+        
+        # PASO 3: Copiar a HeroPublic ANTES del commit
+        # ⚠️  commit() "caduca" los objetos: leer hero_db después lanzaría otro SELECT
+        return HeroPublic.model_validate(hero_db)
+    
+    # 💾 Ejecutar y confirmar (sola o agrupada con WRITE_MODE=group)
+    public_hero = run_write(session, update_hero_row)
+    
+    # PASO 4: Invalidar la caché del héroe y de las páginas que lo contienen
+    hero_cache.invalidate(hero_id, shifts=False)
+    
+    return public_hero
 
 
 @router.delete("/{hero_id}")
-def delete_hero(hero_id: int, session: SessionDep):
+def delete_hero(hero_id: int, session: WriteSessionDep):
     """
     🎯 LECCIÓN 5: ELIMINAR un héroe usando ORM
     
     Conceptos que aprenderás aquí:
-    - session.delete() marca objeto para eliminación
-    - ORM maneja automáticamente el SQL DELETE
+    - delete(Hero): DELETE "ORM-enabled" sin cargar antes el objeto
+    - .returning(Hero.id) para saber si se borró algo
     - Validación y transacciones simplificadas
     
     📝 COMPARACIÓN con SQL puro:
-    ORM: 4 líneas simples
-    SQL: ~10 líneas con validación manual y DELETE
+    ORM: delete(Hero).where(Hero.id == hero_id).returning(Hero.id)
+    SQL: DELETE FROM heroes WHERE id = :hero_id RETURNING id
     
-    💡 VENTAJA: Menos posibilidad de errores, código más legible
+    🚀 RENDIMIENTO: session.get + session.delete hacen SELECT + DELETE;
+    así es un solo DELETE
     """
     
-    # PASO 1: Obtener el héroe a eliminar
-    hero = session.get(Hero, hero_id)
-    if not hero:
-        raise HTTPException(status_code=404, detail="Hero not found")
+    def delete_hero_row(db: Session) -> None:
+        # PASO 1: Eliminar y recibir el ID borrado (None si no existía)
+        # 🗑️  Equivale a session.get() + session.delete() en un solo viaje
+        statement = delete(Hero).where(Hero.id == hero_id).returning(Hero.id)
+        if db.scalars(statement).one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Hero not found")
     
-    # PASO 2: Marcar objeto para eliminación
-    # 🗑️  session.delete() marca el objeto para ser eliminado
-    session.delete(hero)
+    # PASO 2: Confirmar la eliminación
+    # 💾 run_write() hace permanente el DELETE (sola o agrupada con WRITE_MODE=group)
+    run_write(session, delete_hero_row)
     
-    # PASO 3: Confirmar la eliminación
-    # 💾 session.commit() ejecuta el DELETE automáticamente
-    session.commit()
+    # PASO 3: Invalidar la caché (borrar desplaza las páginas con OFFSET)
+    hero_cache.invalidate(hero_id, shifts=True)
     
     # PASO 4: Devolver confirmación
     return {"ok": True}
@@ -0,0 +1,164 @@
+"""
+⚡ Heroes API routes using ASYNC SQLModel ORM ⚡
+
+📚 PROPÓSITO EDUCATIVO:
+Versión asíncrona de heroes.py. Los endpoints son "async def" y usan
+AsyncSession, así que no ocupan un thread del pool mientras esperan a la BD.
+Compara este archivo con heroes.py: la lógica es idéntica, solo cambian
+los "await".
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ async def + await en endpoints FastAPI
+- ✅ await session.exec() / await session.get()
+- ✅ await session.commit() / await session.refresh()
+- ✅ session.add() sin await (solo marca en memoria)
+- ✅ UPDATE/DELETE ... RETURNING: una escritura = un viaje a la BD
+
+⚙️  ACTIVACIÓN:
+DB_BACKEND=async en .env monta este router en /heroes en lugar de heroes.py.
+Incluye el CRUD básico con paginación por cursor; los endpoints masivos y de
+exportación solo existen en la versión sync.
+"""
+from typing import Annotated
+
+# FastAPI imports - Framework web para crear APIs REST
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+# SQLModel imports - ORM que combina SQLAlchemy + Pydantic
+from sqlmodel import delete, select, update
+
+# Imports locales - Nuestros modelos y configuración
+from app.database.async_db_session import AsyncSessionDep  # Dependencia de sesión async
+from app.database.counts import orm_total_statement, set_total_headers
+from app.database.filters import (
+    HeroFiltersDep,
+    next_list_cursor,
+    orm_conditions,
+    orm_order_by,
+    resolve_list_position,
+)
+from app.metrics import record_rows
+from app.database.models import (
+    SQLITE_INT_MAX,
+    SQLITE_INT_MIN,
+    Hero,
+    HeroCreate,
+    HeroPublic,
+    HeroUpdate,
+)
+from app.database.serialization import heroes_payload, json_response
+
+# 🛣️  Router: mismo prefijo y tags que heroes.py (lo reemplaza cuando DB_BACKEND=async)
+router = APIRouter(prefix="/heroes", tags=["heroes"])
+
+
+@router.post("/", response_model=HeroPublic)
+async def create_hero(hero: HeroCreate, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 1 (ASYNC): CREAR un nuevo héroe
+
+    📝 COMPARACIÓN con heroes.py:
+    session.commit()  → await session.commit()
+    session.refresh() → await session.refresh()
+    """
+    db_hero = Hero.model_validate(hero)
+    session.add(db_hero)  # 📝 add() solo marca el objeto, no habla con la BD
+    await session.commit()  # ⏳ Aquí sí se espera a la BD (INSERT + COMMIT)
+    await session.refresh(db_hero)  # 🆔 SELECT para obtener el ID generado
+    return db_hero
+
+
+@router.get("/", response_model=list[HeroPublic])
+async def read_heroes(
+    session: AsyncSessionDep,
+    request: Request,
+    response: Response,
+    filters: HeroFiltersDep,
+    cursor: str | None = None,
+    after_id: Annotated[int | None, Query(ge=SQLITE_INT_MIN, le=SQLITE_INT_MAX)] = None,
+    offset: Annotated[int, Query(deprecated=True)] = 0,
+    limit: Annotated[int, Query(le=100)] = 100,
+    include_total: bool = False,
+):
+    """
+    🎯 LECCIÓN 2 (ASYNC): OBTENER héroes con paginación por cursor
+
+    💡 Misma consulta que heroes.py (columnas públicas, filtros y orden
+    incluidos); solo cambia await session.exec(...)
+    """
+    after_id, key = resolve_list_position(cursor, after_id, offset, filters)
+
+    query = (
+        select(Hero.id, Hero.name, Hero.age)
+        .where(*orm_conditions(filters, after_id, key))
+        .order_by(*orm_order_by(filters))
+        .limit(limit)
+    )
+    if after_id is None and offset:
+        query = query.offset(offset)
+
+    rows = (await session.exec(query)).all()
+    record_rows(len(rows))
+
+    keys = [(getattr(row, filters.sort_column), row.id) for row in rows]
+    next_cursor = next_list_cursor(keys, limit, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        total = (await session.exec(orm_total_statement(filters))).one()
+        set_total_headers(response, request, total, next_cursor)
+    # ⚡ Filas → bytes JSON sin un HeroPublic por fila (RESPONSE_MODE, ver serialization.py)
+    return json_response(heroes_payload(rows), response)
+
+
+@router.get("/{hero_id}", response_model=HeroPublic)
+async def read_hero(hero_id: int, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 3 (ASYNC): OBTENER un héroe por ID
+    """
+    hero = await session.get(Hero, hero_id)
+    if not hero:
+        raise HTTPException(status_code=404, detail="Hero not found")
+    record_rows(1)
+    return hero
+
+
+@router.patch("/{hero_id}", response_model=HeroPublic)
+async def update_hero(hero_id: int, hero: HeroUpdate, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 4 (ASYNC): ACTUALIZAR un héroe parcialmente
+
+    🚀 Igual que heroes.py: UN solo UPDATE ... RETURNING (sin get + refresh)
+    """
+    hero_data = hero.model_dump(exclude_unset=True)
+    if not hero_data:
+        hero_db = await session.get(Hero, hero_id)
+        if not hero_db:
+            raise HTTPException(status_code=404, detail="Hero not found")
+        return hero_db
+
+    statement = update(Hero).where(Hero.id == hero_id).values(**hero_data).returning(Hero)
+    hero_db = (await session.scalars(statement)).one_or_none()
+    if hero_db is None:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Hero not found")
+
+    await session.commit()  # 💡 expire_on_commit=False: hero_db sigue legible sin await
+    return hero_db
+
+
+@router.delete("/{hero_id}")
+async def delete_hero(hero_id: int, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 5 (ASYNC): ELIMINAR un héroe
+
+    🚀 DELETE ... RETURNING id: sin cargar antes el objeto con session.get()
+    """
+    statement = delete(Hero).where(Hero.id == hero_id).returning(Hero.id)
+    deleted_id = (await session.scalars(statement)).one_or_none()
+    if deleted_id is None:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Hero not found")
+
+    await session.commit()
+    return {"ok": True}
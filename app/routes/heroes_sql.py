@@ -8,24 +8,80 @@ Compara este archivo con heroes.py para ver las diferencias entre ORM y SQL.
 🎯 CONCEPTOS QUE APRENDERÁS:
 - ✅ Consultas SQL parametrizadas (previenen SQL injection)
 - ✅ Transacciones automáticas vs manuales
-- ✅ RETURNING clause para obtener datos insertados
+- ✅ RETURNING clause para obtener datos insertados, actualizados o borrados
 - ✅ Construcción dinámica de queries
 - ✅ Manejo de errores en bases de datos
-- ✅ Paginación con LIMIT/OFFSET
+- ✅ Paginación keyset (WHERE id > :after_id) y LIMIT/OFFSET
 
 ⚠️  IMPORTANTE: Siempre usa parámetros (:name) en lugar de concatenación de strings
 """
-from typing import Annotated
+import logging
+from functools import lru_cache
+from typing import Annotated, Any
 
 # FastAPI imports - Framework web para crear APIs REST
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 # SQLModel imports - ORM y utilidades SQL
-from sqlmodel import select, text  # text() convierte strings en SQL ejecutable
+from sqlmodel import Session, select, text  # text() convierte strings en SQL ejecutable
+from sqlalchemy import TextClause, bindparam
+from sqlalchemy.exc import IntegrityError
 
 # Imports locales - Nuestros modelos y configuración
-from app.database.share_db_session import SessionDep  # Dependencia de sesión DB
-from app.database.models import Hero, HeroCreate, HeroPublic, HeroUpdate
+from app.cache import MISSING, PageRange, hero_cache
+from app.config import settings
+from app.database.share_db_session import ReadSessionDep, WriteSessionDep  # Sesiones de lectura/escritura
+from app.database.batch import BatchBodyIdsDep, BatchLoader, BatchQueryIdsDep, load_batch
+from app.database.bulk import (
+    BULK_OPENAPI_EXTRA,
+    bulk_outcomes,
+    check_bulk_size,
+    chunked,
+    delete_filters,
+    group_updates,
+    read_bulk_heroes,
+    returned_ids_in_order,
+    update_statuses,
+)
+from app.database.counts import set_total_headers, sql_total_statement
+from app.database.export import ExportFormat, export_response, stream_partitions
+from app.database.filters import (
+    HeroFiltersDep,
+    next_list_cursor,
+    resolve_list_position,
+    sql_conditions,
+    sql_order_by,
+)
+from app.database.group_commit import run_write
+from app.database.pagination import decode_rank_cursor, next_rank_cursor_for
+from app.database.search import rank_window_bound, to_match_query
+from app.database.serialization import batch_payload, hero_payload, heroes_payload, json_response
+from app.database.versions import (
+    etag_matches,
+    hero_etag,
+    list_etag,
+    not_modified,
+    read_hero_version,
+    read_table_version,
+)
+from app.metrics import record_rows
+from app.database.models import (
+    SQLITE_INT_MAX,
+    SQLITE_INT_MIN,
+    Hero,
+    HeroBatchResult,
+    HeroBulkDelete,
+    HeroBulkItem,
+    HeroBulkResult,
+    HeroBulkUpdateItem,
+    HeroBulkWriteResult,
+    HeroCreate,
+    HeroPublic,
+    HeroUpdate,
+)
+
+logger = logging.getLogger(__name__)
 
 # 🛣️  Router: Agrupa endpoints relacionados con héroes (versión SQL)
 # prefix="/heroes_sql" significa que todas las rutas empiezan con /heroes_sql
@@ -33,7 +89,7 @@ router = APIRouter(prefix="/heroes_sql", tags=["heroes_sql"])
 
 
 @router.post("/", response_model=HeroPublic)
-def create_hero(hero: HeroCreate, session: SessionDep):
+def create_hero(hero: HeroCreate, session: WriteSessionDep):
     """
     🎯 LECCIÓN 1: CREAR un nuevo héroe usando SQL puro
     
@@ -41,38 +97,50 @@ def create_hero(hero: HeroCreate, session: SessionDep):
     - INSERT con parámetros seguros (:name, :age, :secret_name)
     - RETURNING para obtener el ID auto-generado por la base de datos
     - Cómo evitar SQL injection usando parámetros
-    - Transacciones automáticas con result.first()
+    - Commit explícito después de leer RETURNING (run_write)
     
     📝 FLUJO:
     1. Definir SQL con parámetros seguros
     2. Ejecutar con datos validados por Pydantic
-    3. Obtener resultado (activa auto-commit)
+    3. Obtener resultado y hacer commit
     4. Convertir a formato de respuesta
     """
     
-    # PASO 1: Definir la consulta SQL con parámetros seguros
-    # ⚠️  NUNCA uses f"INSERT ... VALUES ('{hero.name}')" - Es vulnerable a SQL injection
-    # ✅ SIEMPRE usa :name - SQLAlchemy escapa automáticamente los valores
-    sql = text("""
-        INSERT INTO heroes (name, age, secret_name) 
-        VALUES (:name, :age, :secret_name)
-        RETURNING id, name, age
-    """)
+    def insert_hero(db: Session):
+        # 📝 db: la sesión donde se escribe (la de la request, o la del escritor de grupo)
+        
+        # PASO 1: Definir la consulta SQL con parámetros seguros
+        # ⚠️  NUNCA uses f"INSERT ... VALUES ('{hero.name}')" - Es vulnerable a SQL injection
+        # ✅ SIEMPRE usa :name - SQLAlchemy escapa automáticamente los valores
+        sql = text("""
+            INSERT INTO heroes (name, age, secret_name) 
+            VALUES (:name, :age, :secret_name)
+            RETURNING id, name, age
+        """)
+        
+        # PASO 2: Ejecutar la consulta con datos del objeto hero
+        # Los datos vienen del JSON enviado por el cliente y son validados por Pydantic
+        result = db.execute(sql, {
+            "name": hero.name,        # ✅ Validado por HeroCreate schema
+            "age": hero.age,          # ✅ Debe ser un entero positivo  
+            "secret_name": hero.secret_name  # ✅ Campo privado, no se devuelve en la respuesta
+        })
+        
+        # PASO 3: Obtener el resultado
+        # 💡 result.first() consume el resultado de RETURNING
+        row = result.first()
+        if not row:
+            # Si no hay resultado, algo salió mal en la inserción
+            raise HTTPException(status_code=500, detail="Failed to create hero")
+        return row
     
-    # PASO 2: Ejecutar la consulta con datos del objeto hero
-    # Los datos vienen del JSON enviado por el cliente y son validados por Pydantic
-    result = session.execute(sql, {
-        "name": hero.name,        # ✅ Validado por HeroCreate schema
-        "age": hero.age,          # ✅ Debe ser un entero positivo  
-        "secret_name": hero.secret_name  # ✅ Campo privado, no se devuelve en la respuesta
-    })
-    
-    # PASO 3: Obtener el resultado (esto activa el auto-commit)
-    # 💡 result.first() consume el resultado y activa la transacción automática
-    row = result.first()
-    if not row:
-        # Si no hay resultado, algo salió mal en la inserción
-        raise HTTPException(status_code=500, detail="Failed to create hero")
+    # PASO 3B: Confirmar la transacción
+    # ⚠️  La sesión NO hace auto-commit: run_write() ejecuta insert_hero y hace el commit
+    # (solo, o junto con otras requests si WRITE_MODE=group)
+    row = run_write(session, insert_hero)
+    
+    # 🧠 Invalidar la caché (el héroe nuevo puede aparecer en la última página)
+    hero_cache.invalidate(row.id, shifts=True)
     
     # PASO 4: Convertir el resultado a formato de respuesta
     # 📊 HeroPublic NO incluye secret_name por seguridad
@@ -84,62 +152,474 @@ def create_hero(hero: HeroCreate, session: SessionDep):
     )
 
 
+@router.post("/bulk", response_model=HeroBulkResult, openapi_extra=BULK_OPENAPI_EXTRA)
+def create_heroes_bulk(
+    heroes: Annotated[list[HeroBulkItem], Depends(read_bulk_heroes)],
+    session: WriteSessionDep,
+    upsert: bool = False,
+):
+    """
+    🎯 LECCIÓN 1B: CREAR muchos héroes de una sola vez usando SQL puro
+    
+    Conceptos que aprenderás aquí:
+    - INSERT multi-fila: VALUES (...), (...), (...) en UNA sola sentencia
+    - ON CONFLICT (id) DO UPDATE para "upsert"
+    - RETURNING id para obtener los IDs generados
+    - INSERT ... SELECT ... ORDER BY: filas insertadas en el orden del request
+    - UNA sola transacción (un solo commit) para todos los lotes
+    
+    📝 SQL GENERADO (lote de 2 héroes):
+    INSERT INTO heroes (id, name, age, secret_name)
+    SELECT column2, column3, column4, column5
+    FROM (VALUES (0, :id_0, :name_0, :age_0, :secret_name_0),
+                 (1, :id_1, :name_1, :age_1, :secret_name_1))
+    WHERE true
+    ORDER BY column1
+    RETURNING id
+    
+    💡 column1 es el ordinal de cada fila: el ORDER BY fija el orden de
+    inserción (y con él el de los IDs generados), porque el de RETURNING
+    NO está garantizado. WHERE true evita que SQLite lea ON CONFLICT como
+    parte del FROM.
+    
+    ⚠️  Solo los NOMBRES de los parámetros se generan con f-string;
+    los VALORES siempre viajan como parámetros seguros.
+    """
+    
+    # PASO 1: Cláusula opcional de upsert
+    # 🔄 excluded.<columna> es el valor que intentábamos insertar
+    on_conflict = """
+        ON CONFLICT (id) DO UPDATE SET
+            name = excluded.name,
+            age = excluded.age,
+            secret_name = excluded.secret_name
+    """ if upsert else ""
+    
+    # PASO 2: Insertar por lotes dentro de UNA transacción
+    ids: list[int] = []
+    try:
+        for chunk in chunked(heroes, settings.BULK_CHUNK_SIZE):
+            placeholders = []
+            params = {}
+            for i, hero in enumerate(chunk):
+                # 🔢 El primer valor es el ordinal de la fila dentro del lote
+                placeholders.append(f"({i}, :id_{i}, :name_{i}, :age_{i}, :secret_name_{i})")
+                # 💡 id=None deja que SQLite genere el ID automáticamente
+                params[f"id_{i}"] = hero.id
+                params[f"name_{i}"] = hero.name
+                params[f"age_{i}"] = hero.age
+                params[f"secret_name_{i}"] = hero.secret_name
+            
+            sql = text(f"""
+                INSERT INTO heroes (id, name, age, secret_name)
+                SELECT column2, column3, column4, column5
+                FROM (VALUES {", ".join(placeholders)})
+                WHERE true
+                ORDER BY column1
+                {on_conflict}
+                RETURNING id
+            """)
+            # 🔀 RETURNING no sigue ningún orden: se reordena según el lote
+            returned = [row.id for row in session.execute(sql, params)]
+            ids.extend(returned_ids_in_order(chunk, returned))
+        
+        # PASO 3: Un solo commit para todo el request
+        session.commit()
+    except IntegrityError:
+        # 🚫 HTTP 409 = "Conflict" - p.ej. un ID repetido sin upsert=true
+        # ↩️  rollback: NINGÚN héroe del request queda guardado (todo o nada)
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Hero id already exists")
+    
+    # PASO 4: Invalidar la caché de todos los héroes insertados o actualizados
+    hero_cache.invalidate_many(ids, shifts=True)
+    
+    # PASO 5: Devolver los IDs en el mismo orden del request
+    return HeroBulkResult(ids=ids)
+
+
+# ✏️  UPDATE POR CONJUNTO DE COLUMNAS -------------------------------------------
+# 🔒 Solo estas columnas pueden aparecer en el SET (son los campos de HeroUpdate)
+_UPDATABLE_COLUMNS = frozenset(HeroUpdate.model_fields)
+
+
+@lru_cache(maxsize=None)
+def update_statement(columns: tuple[str, ...], returning: bool = False) -> TextClause:
+    """
+    🧱 UPDATE heroes SET <columnas> WHERE id = :id, construido UNA vez por conjunto de columnas
+    
+    📝 EJEMPLO:
+    update_statement(("name", "age")) → UPDATE heroes SET name = :name, age = :age WHERE id = :id
+    
+    💡 Solo hay 7 conjuntos posibles: tras la primera request, el f-string y
+    text() no se vuelven a ejecutar (lru_cache devuelve la misma sentencia)
+    """
+    if not columns or not _UPDATABLE_COLUMNS.issuperset(columns):
+        raise ValueError(f"Invalid update columns: {columns!r}")
+    sql = f"UPDATE heroes SET {', '.join(f'{column} = :{column}' for column in columns)} WHERE id = :id"
+    return text(sql + " RETURNING id, name, age" if returning else sql)
+
+
+@router.patch("/bulk", response_model=HeroBulkWriteResult)
+def update_heroes_bulk(items: list[HeroBulkUpdateItem], session: WriteSessionDep):
+    """
+    🎯 LECCIÓN 4B: ACTUALIZAR muchos héroes de una vez usando SQL puro
+    
+    Conceptos que aprenderás aquí:
+    - executemany: session.execute(sql, [params, params, ...]) = una sentencia, muchas filas
+    - UNA sentencia por cada conjunto distinto de columnas (group_updates)
+    - Un resultado por héroe (updated / unchanged / not_found) en lugar de un 404
+    - UNA sola transacción para todo el request
+    
+    📝 SQL GENERADO ([{"id": 1, "age": 26}, {"id": 2, "age": 40}, {"id": 3, "name": "Thor"}]):
+    UPDATE heroes SET age = :age WHERE id = :id     ← executemany con 2 filas
+    UPDATE heroes SET name = :name WHERE id = :id   ← 1 fila
+    SELECT id, name, age FROM heroes WHERE id IN (:id_1, :id_2, :id_3)
+    
+    💡 Un UPDATE de un ID que no existe no falla (0 filas): qué IDs existen se
+    comprueba DESPUÉS, en la misma transacción, con un solo SELECT ... IN
+    """
+    
+    # PASO 1: Agrupar las actualizaciones por columnas enviadas
+    groups = group_updates(items)
+    
+    try:
+        # PASO 2: Un executemany por grupo, con la sentencia cacheada de sus columnas
+        for columns, rows in groups.items():
+            if columns:
+                session.execute(update_statement(columns), rows)
+        
+        # PASO 3: ¿Qué IDs existen? (dentro de la transacción: nadie puede borrarlos ya)
+        _, missing = load_batch(get_hero_loader(session), [item.id for item in items])
+        session.commit()
+    except IntegrityError:
+        # 🚫 p.ej. {"name": null}: name es NOT NULL → no se guarda NADA del request
+        session.rollback()
+        raise HTTPException(status_code=400, detail="Bulk update violates a database constraint")
+    
+    # PASO 4: Invalidar la caché de los héroes actualizados
+    statuses = update_statuses(items, missing)
+    hero_cache.invalidate_many([hero_id for hero_id, status in statuses.items() if status == "updated"], shifts=False)
+    
+    return bulk_outcomes(statuses)
+
+
+# 🗑️  DELETE ... WHERE id IN (...) RETURNING id (un parámetro por id, ver _BATCH_SQL)
+_BULK_DELETE_SQL = text("DELETE FROM heroes WHERE id IN :ids RETURNING id").bindparams(
+    bindparam("ids", expanding=True)
+)
+
+
+@router.delete("/bulk", response_model=HeroBulkWriteResult)
+def delete_heroes_bulk(body: HeroBulkDelete, session: WriteSessionDep):
+    """
+    🎯 LECCIÓN 5B: ELIMINAR muchos héroes de una vez usando SQL puro
+    
+    Conceptos que aprenderás aquí:
+    - DELETE ... WHERE id IN (...): UN DELETE por lote de IDs
+    - O un DELETE con los filtros del listado (sql_conditions)
+    - RETURNING id: qué se borró, para dar un resultado por ID
+    
+    📝 SQL GENERADO:
+    {"ids": [1, 2, 999]}             → DELETE FROM heroes WHERE id IN (?, ?, ?) RETURNING id
+    {"filter": {"name_prefix": "T"}} → DELETE FROM heroes WHERE name >= :prefix AND name < :prefix_end RETURNING id
+    
+    🚧 Con filtro se cuenta antes (count(*) sobre su índice): si borraría más de
+    BULK_MAX_ITEMS héroes → 413 sin borrar nada, igual que con ids
+    """
+    
+    # PASO 1: ¿Por IDs o por filtro? (400 si no es exactamente uno de los dos)
+    filters = delete_filters(body)
+    
+    # PASO 2: Borrar en UNA transacción, recibiendo los IDs borrados
+    if filters is None:
+        ids = list(dict.fromkeys(body.ids))
+        deleted: set[int] = set()
+        for chunk in chunked(ids, settings.BATCH_CHUNK_SIZE):
+            deleted.update(row.id for row in session.execute(_BULK_DELETE_SQL, {"ids": list(chunk)}))
+    else:
+        check_bulk_size(session.execute(*sql_total_statement(filters)).scalar())
+        # ⚠️  Los fragmentos son FIJOS; los valores van como :parámetros
+        conditions, params = sql_conditions(filters, None, None)
+        sql = text(f"DELETE FROM heroes WHERE {' AND '.join(conditions)} RETURNING id")
+        ids = sorted(row.id for row in session.execute(sql, params))
+        deleted = set(ids)
+    session.commit()
+    
+    # PASO 3: Invalidar la caché (borrar desplaza las páginas con OFFSET)
+    hero_cache.invalidate_many(list(deleted), shifts=True)
+    
+    return bulk_outcomes({hero_id: "deleted" if hero_id in deleted else "not_found" for hero_id in ids})
+
+
 @router.get("/", response_model=list[HeroPublic])
 def read_heroes(
-    session: SessionDep,
-    offset: int = 0,
+    session: ReadSessionDep,
+    request: Request,
+    response: Response,
+    filters: HeroFiltersDep,
+    if_none_match: Annotated[str | None, Header()] = None,
+    cursor: str | None = None,
+    after_id: Annotated[int | None, Query(ge=SQLITE_INT_MIN, le=SQLITE_INT_MAX)] = None,
+    offset: Annotated[int, Query(deprecated=True)] = 0,
     limit: Annotated[int, Query(le=100)] = 100,
+    include_total: bool = False,
 ):
     """
     🎯 LECCIÓN 2: OBTENER todos los héroes con paginación usando SQL puro
     
     Conceptos que aprenderás aquí:
     - SELECT con ORDER BY para resultados consistentes
-    - LIMIT y OFFSET para paginación eficiente
+    - Paginación keyset: WHERE id > :after_id en lugar de OFFSET
     - Query parameters opcionales en FastAPI
     - Conversión de múltiples resultados a lista de objetos
     
     📝 PARÁMETROS:
-    - offset: Cuántos registros saltar (para paginación)
+    - cursor: Valor opaco recibido en la cabecera X-Next-Cursor
+    - after_id: Continuar después de este ID (alternativa explícita al cursor)
+    - offset: Cuántos registros saltar (obsoleto, solo por compatibilidad)
     - limit: Máximo de registros a devolver (máx. 100)
+    - min_age / max_age: Rango de edad (usa ix_heroes_age)
+    - name / name_prefix: Nombre exacto o prefijo (usa ix_heroes_name)
+    - sort: id, name, age; con "-" delante, descendente (p.ej. -age)
+    - include_total: añade X-Total-Count y Link (ver app/database/counts.py)
     
     📊 EJEMPLOS DE USO:
     - GET /heroes_sql/ → Primeros 100 héroes
     - GET /heroes_sql/?limit=10 → Primeros 10 héroes  
-    - GET /heroes_sql/?offset=10&limit=10 → Héroes 11-20
+    - GET /heroes_sql/?limit=10&cursor=<X-Next-Cursor> → Siguientes 10 héroes
+    - GET /heroes_sql/?offset=10&limit=10 → Héroes 11-20 (lento en páginas profundas)
+    - GET /heroes_sql/?min_age=18&max_age=30&sort=-age → Adultos jóvenes, mayores primero
+    - GET /heroes_sql/?name_prefix=Spi&sort=name → "Spider-Man", "Spider-Woman"...
+    
+    🏷️  ETAG: "heroes-v<versión de la tabla>"; con If-None-Match vigente → 304
     """
     
-    # PASO 1: Definir consulta con paginación
-    # 🔄 ORDER BY id asegura resultados consistentes en cada página
+    # PASO 1: Decidir desde dónde continuar (cursor, after_id u offset)
+    # 🔑 key: valor de la columna de orden en la última fila (solo sort=name/age)
+    after_id, key = resolve_list_position(cursor, after_id, offset, filters)
+    
+    # PASO 1B: ¿Ya tenemos esta página en caché? (compartida con /heroes)
+    cache_params = (after_id, key, offset, limit, filters, include_total)
+    token = hero_cache.read_token()
+    cached = hero_cache.get_list(cache_params)
+    if cached is not MISSING:
+        heroes, next_cursor, etag, total = cached
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if include_total:
+            set_total_headers(response, request, total, next_cursor)
+        # ⚡ Con RESPONSE_MODE=fast la caché guarda los bytes JSON: nada que serializar
+        return json_response(heroes, response)
+    
+    # PASO 1C: Consulta barata de la versión de la tabla → ¿304?
+    # 📭 SELECT version FROM table_versions es UNA fila por clave primaria
+    etag = list_etag(read_table_version(session))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    # PASO 2: Definir consulta con paginación
+    # 🔄 ORDER BY asegura resultados consistentes en cada página
     # 📄 LIMIT controla cuántos registros devolver
-    # ⏭️  OFFSET controla desde qué registro empezar
-    sql = text("""
+    # 🚀 Filtros y keyset (WHERE id > :after_id...) son rangos sobre índices
+    # 🐢 OFFSET recorre y descarta filas (solo se usa si no hay cursor)
+    # 🔒 Los fragmentos vienen de filters.py (fijos); los valores, como :parámetros
+    conditions, params = sql_conditions(filters, after_id, key)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = text(f"""
         SELECT id, name, age 
         FROM heroes 
-        ORDER BY id 
+        {where}
+        ORDER BY {sql_order_by(filters)} 
         LIMIT :limit OFFSET :offset
     """)
+    params.update(limit=limit, offset=0 if after_id is not None else offset)
     
-    # PASO 2: Ejecutar consulta con parámetros de paginación
-    result = session.execute(sql, {"limit": limit, "offset": offset})
+    # PASO 3: Ejecutar consulta con parámetros de paginación
+    result = session.execute(sql, params)
     
-    # PASO 3: Obtener TODOS los resultados como lista
+    # PASO 4: Obtener TODOS los resultados como lista
     # 💡 fetchall() devuelve una lista de Row objects
     rows = result.fetchall()
     
-    # PASO 4: Convertir cada Row a HeroPublic usando list comprehension
-    # 🔄 Esto es más eficiente que un bucle for tradicional
-    heroes = [
-        HeroPublic(id=row.id, name=row.name, age=row.age)
-        for row in rows
-    ]
+    # PASO 5: Convertir las filas en la respuesta (ver app/database/serialization.py)
+    # ⚡ RESPONSE_MODE=fast: Row → bytes JSON de una pasada, sin un HeroPublic por fila
+    # 🐢 RESPONSE_MODE=model: list[HeroPublic] que FastAPI valida y serializa otra vez
+    heroes = heroes_payload(rows)
+    
+    # 📝 Log estructurado (DEBUG: apagado por defecto, sin coste en el camino caliente)
+    logger.debug("heroes_listed", extra={"router": "sql", "count": len(rows)})
+    record_rows(len(rows))  # 📈 Filas devueltas por esta request (métricas)
+    
+    # PASO 6: Informar al cliente cómo pedir la siguiente página
+    ids = [row.id for row in rows]
+    keys = [(getattr(row, filters.sort_column), row.id) for row in rows]
+    next_cursor = next_list_cursor(keys, limit, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    # PASO 6B: Total opcional (include_total=true)
+    # 🧮 Sin filtros: SELECT row_count FROM table_counts (mantenida por triggers)
+    # 🗂️  Con filtros: SELECT count(*) ... WHERE <filtros> sobre su índice
+    total = None
+    if include_total:
+        total = session.execute(*sql_total_statement(filters)).scalar()
+        set_total_headers(response, request, total, next_cursor)
+    
+    # PASO 7: Guardar la página en caché junto con su rango de IDs
+    # 📏 Solo con sort=id los IDs de la página forman un rango invalidable
+    # 🧮 Con total, CUALQUIER escritura puede cambiarlo: se invalida siempre
+    # 🔀 Con filtros y OFFSET, un UPDATE que mete o saca de los filtros un ID
+    #    anterior desplaza la página sin tocar su rango: también se invalida siempre
+    if filters.sort == "id" and not include_total and not (offset and filters.index_column):
+        page = PageRange.for_page(after_id, offset, ids, limit)
+    else:
+        page = PageRange.everything()
+    hero_cache.store_list(cache_params, page, (heroes, next_cursor, etag, total), token)
+    return json_response(heroes, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_heroes(fmt: Annotated[ExportFormat, Query(alias="format")] = "ndjson"):
+    """
+    🎯 LECCIÓN 2B: EXPORTAR toda la tabla en streaming usando SQL puro
+    
+    Conceptos que aprenderás aquí:
+    - SELECT sin LIMIT leído por lotes desde el cursor
+    - Diferencia entre fetchall() (todo en memoria) y leer por partes
+    - StreamingResponse: el cliente recibe datos mientras se leen de la BD
+    
+    📝 FORMATOS:
+    - GET /heroes_sql/export → NDJSON (un héroe por línea)
+    - GET /heroes_sql/export?format=csv → CSV con cabecera
+    """
+    
+    # 🔒 Solo columnas públicas: secret_name NUNCA se exporta
+    sql = text("SELECT id, name, age FROM heroes ORDER BY id")
+    return export_response(stream_partitions(sql), fmt)
+
+
+@router.get("/search", response_model=list[HeroPublic])
+def search_heroes(
+    session: ReadSessionDep,
+    response: Response,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+):
+    """
+    🎯 LECCIÓN 2C: BUSCAR héroes por nombre (texto completo, FTS5) usando SQL puro
+    
+    Conceptos que aprenderás aquí:
+    - WHERE heroes_fts MATCH :query sobre la tabla virtual FTS5
+    - rank: columna oculta con la puntuación bm25 (menor = más relevante)
+    - JOIN por rowid para traer las columnas de heroes
+    - Paginación keyset sobre (rank, id)
+    
+    📝 SQL GENERADO (q = "spider"):
+    SELECT h.id, h.name, h.age, f.rank
+    FROM heroes_fts f JOIN heroes h ON h.id = f.rowid
+    WHERE heroes_fts MATCH '"spider"*'
+    ORDER BY f.rank, f.rowid LIMIT 20
+    """
+    
+    # PASO 1: Texto del usuario → consulta FTS5 segura (nunca concatenada en el SQL)
+    params = {"query": to_match_query(q), "limit": limit}
+    
+    # PASO 2: Condiciones extra (fragmentos FIJOS; los valores siempre son parámetros)
+    # - keyset: continuar después de la última fila de la página anterior
+    # - ventana: búsquedas muy amplias → puntuar solo las primeras coincidencias
+    conditions = []
+    if cursor is not None:
+        params["rank"], params["after_id"] = decode_rank_cursor(cursor)
+        conditions.append("AND (f.rank > :rank OR (f.rank = :rank AND f.rowid > :after_id))")
+    params["bound"] = rank_window_bound(session, params["query"])
+    if params["bound"] is not None:
+        conditions.append("AND f.rowid < :bound")
+    
+    # PASO 3: Buscar en el índice y unir con heroes por rowid
+    sql = text(f"""
+        SELECT h.id, h.name, h.age, f.rank AS rank
+        FROM heroes_fts f
+        JOIN heroes h ON h.id = f.rowid
+        WHERE heroes_fts MATCH :query {' '.join(conditions)}
+        ORDER BY f.rank, f.rowid
+        LIMIT :limit
+    """)
+    rows = session.execute(sql, params).fetchall()
+    record_rows(len(rows))
+    
+    # PASO 4: Cursor de la página siguiente
+    next_cursor = next_rank_cursor_for([(row.rank, row.id) for row in rows], limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return json_response(heroes_payload(rows), response)
+
+
+# 🧺 LECTURA POR LOTES ---------------------------------------------------------
+# 💡 expanding=True: "IN :ids" se convierte en "IN (?, ?, ?)", un parámetro por id
+_BATCH_SQL = text("SELECT id, name, age FROM heroes WHERE id IN :ids").bindparams(
+    bindparam("ids", expanding=True)
+)
+
+
+def get_hero_loader(session: ReadSessionDep) -> BatchLoader[int, Any]:
+    """🔌 DEPENDENCIA: un BatchLoader por request (FastAPI lo comparte dentro de ella)"""
+    def fetch(ids):
+        return {row.id: row for row in session.execute(_BATCH_SQL, {"ids": list(ids)})}
+    return BatchLoader(fetch)
+
+
+HeroLoaderDep = Annotated[BatchLoader[int, Any], Depends(get_hero_loader)]
+
+
+@router.get("/batch", response_model=HeroBatchResult)
+def read_heroes_batch(ids: BatchQueryIdsDep, loader: HeroLoaderDep, response: Response):
+    """
+    🎯 LECCIÓN 3B: OBTENER muchos héroes por ID en una sola request usando SQL puro
+    
+    Conceptos que aprenderás aquí:
+    - SELECT ... WHERE id IN (:id_1, :id_2, ...) con bindparam(expanding=True)
+    - BatchLoader (app/database/batch.py): agrupa los ids en lotes y recuerda los cargados
+    - Los ids que no existen se devuelven en "missing" (sin 404)
+    
+    📝 EJEMPLO:
+    GET /heroes_sql/batch?ids=3,1,999
+    → {"heroes": [<héroe 3>, <héroe 1>], "missing": [999]}
+    
+    💡 Los héroes llegan en el ORDEN pedido, no en el de la BD
+    """
+    heroes, missing = load_batch(loader, ids)
+    record_rows(len(heroes))
+    return json_response(batch_payload(heroes, missing), response)
+
+
+@router.post("/batch", response_model=HeroBatchResult)
+def read_heroes_batch_body(ids: BatchBodyIdsDep, loader: HeroLoaderDep, response: Response):
+    """
+    🎯 LECCIÓN 3C: Igual que GET /heroes_sql/batch, con los ids en el body
+    
+    📝 EJEMPLO:
+    POST /heroes_sql/batch
+    {"ids": [3, 1, 999]}
     
-    print(f"🦸‍♂️ Heroes retornados con SQL: {len(heroes)}")  # Log para debugging
-    return heroes
+    💡 POST no porque escriba nada, sino porque una lista larga de ids no cabe en una URL
+    """
+    return read_heroes_batch(ids, loader, response)
 
 
 @router.get("/{hero_id}", response_model=HeroPublic)
-def read_hero(hero_id: int, session: SessionDep):
+def read_hero(
+    hero_id: int,
+    session: ReadSessionDep,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
     """
     🎯 LECCIÓN 3: OBTENER un héroe específico por ID usando SQL puro
     
@@ -154,14 +634,37 @@ def read_hero(hero_id: int, session: SessionDep):
     2. Buscar el héroe en la base de datos
     3. Devolver error 404 si no existe
     4. Devolver el héroe si existe
+    
+    🏷️  ETAG: "hero-<id>-v<versión>"; con If-None-Match vigente → 304
     """
     
+    # PASO 0: Buscar primero en la caché (sin tocar la base de datos)
+    token = hero_cache.read_token()
+    cached = hero_cache.get_hero(hero_id)
+    if cached is not MISSING:
+        hero, etag = cached
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        return json_response(hero, response)
+    
+    # PASO 0B: Si el cliente envió If-None-Match, comprobar SOLO la versión
+    # 📭 Si coincide respondemos 304 sin leer ni convertir la fila completa
+    if if_none_match:
+        version = read_hero_version(session, hero_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Hero not found")
+        if etag_matches(if_none_match, hero_etag(hero_id, version)):
+            return not_modified(hero_etag(hero_id, version))
+    
     # PASO 1: Definir consulta para buscar UN héroe específico
     # 🎯 WHERE id = :hero_id filtra por el ID recibido en la URL
+    # 🏷️  LEFT JOIN trae su versión en la MISMA consulta (para el ETag)
     sql = text("""
-        SELECT id, name, age 
-        FROM heroes 
-        WHERE id = :hero_id
+        SELECT h.id, h.name, h.age, coalesce(v.version, 0) AS version
+        FROM heroes h
+        LEFT JOIN hero_versions v ON v.hero_id = h.id
+        WHERE h.id = :hero_id
     """)
     
     # PASO 2: Ejecutar consulta con el ID específico
@@ -177,16 +680,18 @@ def read_hero(hero_id: int, session: SessionDep):
         # 🚫 HTTP 404 = "Not Found" - El recurso solicitado no existe
         raise HTTPException(status_code=404, detail="Hero not found")
     
-    # PASO 5: Convertir el resultado a HeroPublic
-    return HeroPublic(
-        id=row.id,
-        name=row.name,
-        age=row.age
-    )
+    record_rows(1)
+    
+    # PASO 5: Convertir el resultado (bytes JSON o HeroPublic) y guardarlo en caché
+    hero = hero_payload(row)
+    etag = hero_etag(hero_id, row.version)
+    hero_cache.store_hero(hero_id, (hero, etag), token)
+    response.headers["ETag"] = etag
+    return json_response(hero, response)
 
 
 @router.patch("/{hero_id}", response_model=HeroPublic)
-def update_hero(hero_id: int, hero: HeroUpdate, session: SessionDep):
+def update_hero(hero_id: int, hero: HeroUpdate, session: WriteSessionDep):
     """
     🎯 LECCIÓN 4: ACTUALIZAR un héroe usando SQL dinámico (AVANZADO)
     
@@ -194,25 +699,21 @@ def update_hero(hero_id: int, hero: HeroUpdate, session: SessionDep):
     - PATCH vs PUT (actualización parcial vs completa)
     - Construcción dinámica de consultas SQL
     - exclude_unset=True para campos opcionales
-    - Múltiples consultas en una transacción
-    - Commit manual necesario (sin RETURNING)
+    - UPDATE ... RETURNING: actualizar y leer el resultado en UN viaje
+    - El 404 se decide por la fila devuelta (sin SELECT COUNT previo)
     
     📝 DIFERENCIAS:
     - PATCH: Solo actualiza campos enviados (ej: solo "age": 26)
     - PUT: Requiere todos los campos (reemplaza completo)
     
+    🚀 RENDIMIENTO:
+    Antes: SELECT COUNT + UPDATE + SELECT = 3 viajes a la BD, todos con el
+    lock de escritura de SQLite tomado. Ahora: 1 solo UPDATE ... RETURNING.
+    
     ⚡ RETO: ¿Puedes entender por qué necesitamos session.commit() aquí?
     """
     
-    # PASO 1: Verificar que el héroe existe antes de actualizar
-    # 💡 Siempre validar existencia antes de modificar
-    sql_check = text("SELECT COUNT(*) as count FROM heroes WHERE id = :hero_id")
-    result = session.execute(sql_check, {"hero_id": hero_id})
-    count_row = result.fetchone()
-    if not count_row or count_row.count == 0:
-        raise HTTPException(status_code=404, detail="Hero not found")
-    
-    # PASO 2: Extraer solo los campos que fueron enviados
+    # PASO 1: Extraer solo los campos que fueron enviados
     # 🎯 exclude_unset=True ignora campos no enviados en el JSON
     # Ejemplo: Si solo envías {"age": 26}, hero_data = {"age": 26}
     hero_data = hero.model_dump(exclude_unset=True)
@@ -225,41 +726,31 @@ def update_hero(hero_id: int, hero: HeroUpdate, session: SessionDep):
             raise HTTPException(status_code=404, detail="Hero not found")
         return HeroPublic(id=row.id, name=row.name, age=row.age)
     
-    # PASO 3: Construir UPDATE dinámicamente
-    # 🔧 Creamos la cláusula SET solo para campos enviados
-    set_clauses = []  # Lista de "campo = :valor"
-    params = {"hero_id": hero_id}  # Parámetros para la consulta
-    
-    # 🔄 Por cada campo enviado, añadir a SET clause
-    if "name" in hero_data:
-        set_clauses.append("name = :name")
-        params["name"] = hero_data["name"]
-    if "age" in hero_data:
-        set_clauses.append("age = :age")
-        params["age"] = hero_data["age"]
-    if "secret_name" in hero_data:
-        set_clauses.append("secret_name = :secret_name")
-        params["secret_name"] = hero_data["secret_name"]
-    
-    # PASO 4: Ejecutar UPDATE con campos dinámicos
-    # 💡 ', '.join(set_clauses) convierte lista en "name = :name, age = :age"
-    sql_update = text(f"""
-        UPDATE heroes 
-        SET {', '.join(set_clauses)}
-        WHERE id = :hero_id
-    """)
+    # PASO 2: Construir UPDATE dinámicamente
+    # 🔧 La cláusula SET lleva solo los campos enviados:
+    # {"age": 26} → UPDATE heroes SET age = :age WHERE id = :id RETURNING id, name, age
+    # 🧱 update_statement() construye cada conjunto de columnas UNA sola vez
+    params = {"id": hero_id, **hero_data}
+    
+    # PASO 3: UPDATE + RETURNING en una sola sentencia
+    # 🔙 RETURNING devuelve la fila YA actualizada (o ninguna si el ID no existe)
+    sql_update = update_statement(tuple(hero_data), returning=True)
+    
+    def update_hero_row(db: Session):
+        row = db.execute(sql_update, params).fetchone()
+        
+        # PASO 4: Sin fila devuelta = no había héroe con ese ID (nada que confirmar)
+        # ↩️  run_write() deshace la transacción al recibir la excepción
+        if not row:
+            raise HTTPException(status_code=404, detail="Hero not found")
+        return row
     
-    # ⚠️  Aquí SÍ necesitamos commit manual porque no usamos RETURNING
-    session.execute(sql_update, params)
-    session.commit()  # 🔑 IMPORTANTE: Sin esto los cambios se pierden
+    # ⚠️  La fila ya está leída, pero el cambio NO es permanente hasta el commit
+    # 🔑 IMPORTANTE: run_write() hace el commit; sin él los cambios se pierden
+    row = run_write(session, update_hero_row)
     
-    # PASO 5: Obtener el héroe actualizado para devolver
-    sql_select = text("SELECT id, name, age FROM heroes WHERE id = :hero_id")
-    result = session.execute(sql_select, {"hero_id": hero_id})
-    row = result.fetchone()
-    
-    if not row:
-        raise HTTPException(status_code=404, detail="Hero not found after update")
+    # 🧠 Invalidar la caché del héroe y de las páginas que lo contienen
+    hero_cache.invalidate(hero_id, shifts=False)
     
     return HeroPublic(
         id=row.id,
@@ -269,43 +760,45 @@ def update_hero(hero_id: int, hero: HeroUpdate, session: SessionDep):
 
 
 @router.delete("/{hero_id}")
-def delete_hero(hero_id: int, session: SessionDep):
+def delete_hero(hero_id: int, session: WriteSessionDep):
     """
     🎯 LECCIÓN 5: ELIMINAR un héroe usando SQL puro
     
     Conceptos que aprenderás aquí:
     - DELETE statement con WHERE clause
-    - Validación antes de eliminar (buena práctica)
-    - Transacciones manuales (sin RETURNING)
+    - DELETE ... RETURNING: saber QUÉ se borró sin consultar antes
+    - Transacciones manuales
     - Respuestas sin modelo específico
     
     📝 FLUJO:
-    1. Verificar que el héroe existe
-    2. Eliminar el registro
+    1. Eliminar el registro pidiendo su ID de vuelta
+    2. Si no volvió ninguna fila → 404
     3. Confirmar la transacción
     4. Devolver confirmación de éxito
     
-    ⚠️  CUIDADO: DELETE es irreversible - siempre validar antes
+    ⚠️  CUIDADO: DELETE es irreversible - por eso RETURNING nos dice
+    exactamente qué fila se eliminó
     """
     
-    # PASO 1: Verificar que el héroe existe antes de eliminar
-    # 🛡️  NUNCA elimines sin verificar - es una buena práctica de seguridad
-    sql_check = text("SELECT COUNT(*) as count FROM heroes WHERE id = :hero_id")
-    result = session.execute(sql_check, {"hero_id": hero_id})
-    count_row = result.fetchone()
-    
-    if not count_row or count_row.count == 0:
-        # 🚫 HTTP 404 si el héroe no existe
-        raise HTTPException(status_code=404, detail="Hero not found")
+    # PASO 1: Eliminar el héroe y recibir su ID en la misma sentencia
+    # 🗑️  DELETE FROM tabla WHERE condicion RETURNING columnas
+    # 🚀 Sustituye al antiguo SELECT COUNT(*) previo: 1 viaje en lugar de 2
+    sql_delete = text("DELETE FROM heroes WHERE id = :hero_id RETURNING id")
+    
+    def delete_hero_row(db: Session) -> None:
+        deleted = db.execute(sql_delete, {"hero_id": hero_id}).fetchone()
+        
+        # PASO 2: Validar con la fila devuelta
+        if not deleted:
+            # 🚫 HTTP 404 si el héroe no existe (no se borró nada)
+            raise HTTPException(status_code=404, detail="Hero not found")
     
-    # PASO 2: Eliminar el héroe de la base de datos
-    # 🗑️  DELETE FROM tabla WHERE condicion
-    sql_delete = text("DELETE FROM heroes WHERE id = :hero_id")
-    session.execute(sql_delete, {"hero_id": hero_id})
+    # PASO 3: Confirmar la transacción
+    # ⚠️  SIN commit los cambios NO se guardan permanentemente: lo hace run_write()
+    run_write(session, delete_hero_row)
     
-    # PASO 3: Confirmar la transacción manualmente
-    # ⚠️  SIN session.commit() los cambios NO se guardan permanentemente
-    session.commit()
+    # 🧠 Invalidar la caché (borrar desplaza las páginas con OFFSET)
+    hero_cache.invalidate(hero_id, shifts=True)
     
     # PASO 4: Devolver confirmación de éxito
     # 💡 No hay response_model porque devolvemos un dict simple
@@ -0,0 +1,167 @@
+"""
+⚡ Heroes API routes using ASYNC RAW SQL ⚡
+
+📚 PROPÓSITO EDUCATIVO:
+Versión asíncrona de heroes_sql.py. Las mismas consultas text() con
+parámetros seguros, ejecutadas con "await session.execute(...)".
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ await session.execute(text(...)) con AsyncSession
+- ✅ Los resultados ya vienen "bufferizados": fetchone()/fetchall() sin await
+- ✅ await session.commit() para confirmar escrituras
+
+⚙️  ACTIVACIÓN:
+DB_BACKEND=async en .env monta este router en /heroes_sql en lugar de heroes_sql.py.
+Incluye el CRUD básico con paginación por cursor; los endpoints masivos y de
+exportación solo existen en la versión sync.
+"""
+from typing import Annotated
+
+# FastAPI imports - Framework web para crear APIs REST
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+# SQLModel imports - text() convierte strings en SQL ejecutable
+from sqlmodel import text
+
+# Imports locales - Nuestros modelos y configuración
+from app.database.async_db_session import AsyncSessionDep  # Dependencia de sesión async
+from app.database.counts import set_total_headers, sql_total_statement
+from app.database.filters import (
+    HeroFiltersDep,
+    next_list_cursor,
+    resolve_list_position,
+    sql_conditions,
+    sql_order_by,
+)
+from app.metrics import record_rows
+from app.database.models import SQLITE_INT_MAX, SQLITE_INT_MIN, HeroCreate, HeroPublic, HeroUpdate
+from app.database.serialization import heroes_payload, json_response
+
+# 🛣️  Router: mismo prefijo y tags que heroes_sql.py (lo reemplaza cuando DB_BACKEND=async)
+router = APIRouter(prefix="/heroes_sql", tags=["heroes_sql"])
+
+
+@router.post("/", response_model=HeroPublic)
+async def create_hero(hero: HeroCreate, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 1 (ASYNC): CREAR un nuevo héroe con INSERT ... RETURNING
+    """
+    sql = text("""
+        INSERT INTO heroes (name, age, secret_name)
+        VALUES (:name, :age, :secret_name)
+        RETURNING id, name, age
+    """)
+    result = await session.execute(sql, {
+        "name": hero.name,
+        "age": hero.age,
+        "secret_name": hero.secret_name,
+    })
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=500, detail="Failed to create hero")
+    await session.commit()
+    return HeroPublic(id=row.id, name=row.name, age=row.age)
+
+
+@router.get("/", response_model=list[HeroPublic])
+async def read_heroes(
+    session: AsyncSessionDep,
+    request: Request,
+    response: Response,
+    filters: HeroFiltersDep,
+    cursor: str | None = None,
+    after_id: Annotated[int | None, Query(ge=SQLITE_INT_MIN, le=SQLITE_INT_MAX)] = None,
+    offset: Annotated[int, Query(deprecated=True)] = 0,
+    limit: Annotated[int, Query(le=100)] = 100,
+    include_total: bool = False,
+):
+    """
+    🎯 LECCIÓN 2 (ASYNC): OBTENER héroes con paginación por cursor
+    """
+    after_id, key = resolve_list_position(cursor, after_id, offset, filters)
+
+    conditions, params = sql_conditions(filters, after_id, key)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = text(f"""
+        SELECT id, name, age
+        FROM heroes
+        {where}
+        ORDER BY {sql_order_by(filters)}
+        LIMIT :limit OFFSET :offset
+    """)
+    params.update(limit=limit, offset=0 if after_id is not None else offset)
+
+    rows = (await session.execute(sql, params)).fetchall()
+    record_rows(len(rows))
+
+    keys = [(getattr(row, filters.sort_column), row.id) for row in rows]
+    next_cursor = next_list_cursor(keys, limit, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        total = (await session.execute(*sql_total_statement(filters))).scalar()
+        set_total_headers(response, request, total, next_cursor)
+    # ⚡ Filas → bytes JSON sin un HeroPublic por fila (RESPONSE_MODE, ver serialization.py)
+    return json_response(heroes_payload(rows), response)
+
+
+@router.get("/{hero_id}", response_model=HeroPublic)
+async def read_hero(hero_id: int, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 3 (ASYNC): OBTENER un héroe por ID
+    """
+    sql = text("SELECT id, name, age FROM heroes WHERE id = :hero_id")
+    row = (await session.execute(sql, {"hero_id": hero_id})).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Hero not found")
+    record_rows(1)
+    return HeroPublic(id=row.id, name=row.name, age=row.age)
+
+
+@router.patch("/{hero_id}", response_model=HeroPublic)
+async def update_hero(hero_id: int, hero: HeroUpdate, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 4 (ASYNC): ACTUALIZAR un héroe con UPDATE dinámico
+
+    🚀 UPDATE ... RETURNING: un solo viaje; el 404 lo decide la fila devuelta
+    """
+    hero_data = hero.model_dump(exclude_unset=True)
+    if not hero_data:
+        sql_select = text("SELECT id, name, age FROM heroes WHERE id = :hero_id")
+        row = (await session.execute(sql_select, {"hero_id": hero_id})).fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Hero not found")
+        return HeroPublic(id=row.id, name=row.name, age=row.age)
+
+    # 🔧 Solo los nombres de columna salen de una lista fija; los valores son parámetros
+    set_clauses = [
+        f"{column} = :{column}"
+        for column in ("name", "age", "secret_name")
+        if column in hero_data
+    ]
+    sql_update = text(f"""
+        UPDATE heroes
+        SET {', '.join(set_clauses)}
+        WHERE id = :hero_id
+        RETURNING id, name, age
+    """)
+    row = (await session.execute(sql_update, {**hero_data, "hero_id": hero_id})).fetchone()
+    if not row:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Hero not found")
+    await session.commit()
+    return HeroPublic(id=row.id, name=row.name, age=row.age)
+
+
+@router.delete("/{hero_id}")
+async def delete_hero(hero_id: int, session: AsyncSessionDep):
+    """
+    🎯 LECCIÓN 5 (ASYNC): ELIMINAR un héroe
+    """
+    sql_delete = text("DELETE FROM heroes WHERE id = :hero_id RETURNING id")
+    deleted = (await session.execute(sql_delete, {"hero_id": hero_id})).fetchone()
+    if not deleted:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Hero not found")
+    await session.commit()
+    return {"ok": True}
@@ -0,0 +1,31 @@
+"""
+📈 Metrics route - Endpoint de métricas para Prometheus 📈
+
+📚 PROPÓSITO EDUCATIVO:
+Prometheus "rasca" (scrape) periódicamente una URL de texto plano con todas
+las métricas. Este router solo publica lo que app/metrics.py ya ha medido.
+
+🌐 RUTAS:
+- GET /metrics - Requests, latencias, consultas SQL y estado del pool
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import render_metrics
+
+# 🛣️  Sin prefix: Prometheus busca /metrics por convención
+router = APIRouter(tags=["debug"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    📈 MÉTRICAS EN FORMATO PROMETHEUS
+
+    📊 ¿Qué mirar primero?
+    - http_request_duration_seconds: latencia por ruta (p99 con histogram_quantile)
+    - db_queries_per_request: rutas que hacen más consultas de las esperadas (N+1)
+    - db_pool_checked_out cerca de db_pool_size + overflow: el pool se queda corto
+    """
+    # 📝 version=0.0.4 es el formato de texto que espera Prometheus
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,279 @@
+"""
+🌱 Seed - Generador de Millones de Héroes Sintéticos 🌱
+
+📚 PROPÓSITO EDUCATIVO:
+marvel.db tiene un puñado de filas: con eso nunca se ve cómo se comporta la
+app con millones de héroes (planes de consulta, tamaño de los índices, FTS,
+cachés...). Este comando crea una BD NUEVA con N héroes "realistas" y
+reproducibles: la misma semilla genera exactamente los mismos datos.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Datos deterministas: random.Random(seed) propio, nunca el global
+- ✅ Distribuciones: nombres con sesgo Zipf (pocos nombres muy repetidos),
+  edades normales con un porcentaje de nulos, secret_name de longitud variable
+- ✅ Muestrear con una TABLA: se reparten 2^bits huecos según los pesos y
+  cada fila es un getrandbits() + una indexación (sin bisect por fila)
+- ✅ Generar por lotes y cargar con la maquinaria de import_heroes (índices
+  fuera, triggers por lote, PRAGMAs de carga)
+
+📏 MEDIDO (1 CPU modesta, perfil por defecto):
+- Generar: ~1,2 µs por fila; insertar: ~3 µs por fila con los triggers por lote
+- Una máquina de desarrollo normal va 2-3 veces más rápido
+
+🚀 PARA EJECUTAR:
+python -m app.tools.seed big.db --rows 10M
+python -m app.tools.seed big.db --rows 2M --names 5000 --skew 1.2 --age-null 0.1 --force
+DATABASE_FILE=big.db DATABASE_URL=sqlite:///big.db uv run fastapi dev main.py
+
+⚠️  IMPORTANTE:
+- Crea la BD desde cero: si el archivo ya existe hace falta --force (y se BORRA)
+- Como mucho 2^20 nombres distintos (el tamaño de la tabla de muestreo); con
+  sesgo, los nombres menos probables que 1 entre 2^20 pueden no salir nunca
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from itertools import accumulate
+
+from sqlmodel import create_engine
+
+from app.database.schema import BULK_INSERT_TRIGGERS, create_db_and_tables
+from app.tools.import_heroes import (
+    SECONDARY_INDEXES,
+    close_bulk_connection,
+    insert_batch,
+    open_bulk_connection,
+    schema_sql,
+)
+
+# 🎲 Tamaño de las tablas de muestreo (bits → 2^bits huecos)
+NAME_TABLE_BITS = 20
+AGE_TABLE_BITS = 12
+SECRET_TABLE_BITS = 16  # 💡 65.536 secret_names distintos
+
+# 🦸 Piezas para componer nombres: 40 x 40 combinaciones; a partir de ahí, con número
+_NAME_FIRST = (
+    "Captain", "Doctor", "Iron", "Spider", "Black", "Silver", "Scarlet", "Night", "Star", "Storm",
+    "Ghost", "Moon", "Thunder", "Shadow", "Crimson", "Golden", "Invisible", "Steel", "Phantom", "Atomic",
+    "Cosmic", "Mighty", "Dark", "Ice", "Fire", "Quantum", "Rocket", "Wonder", "Blue", "Green",
+    "Savage", "Mister", "Lady", "Agent", "Ultra", "Hyper", "Sonic", "Mystic", "Jade", "Electric",
+)
+_NAME_SECOND = (
+    "Man", "Woman", "Widow", "Hawk", "Panther", "Knight", "Falcon", "Surfer", "Witch", "Lord",
+    "Rider", "Wolf", "Fist", "Hammer", "Arrow", "Shield", "Torch", "Wasp", "Hulk", "Phoenix",
+    "Raven", "Viper", "Comet", "Blade", "Fury", "Spectre", "Titan", "Storm", "Claw", "Bolt",
+    "Ranger", "Sentinel", "Guardian", "Wraith", "Cyclone", "Nova", "Vision", "Samurai", "Ninja", "Queen",
+)
+_SYLLABLES = ("ka", "lo", "mi", "ra", "to", "ne", "sa", "vi", "du", "pe", "an", "el", "or", "is", "un")
+
+
+@dataclass(frozen=True)
+class SeedProfile:
+    """
+    🎛️  PERFIL: cómo son los héroes generados
+
+    💡 frozen=True: un perfil + una semilla describen una BD completa
+    (igual que HeroFilters describe un listado)
+    """
+
+    seed: int = 42
+    names: int = 100_000  # 🏷️  nombres distintos
+    skew: float = 1.0  # 📉 exponente Zipf: 0 = todos igual de probables
+    age_min: int = 10
+    age_max: int = 90
+    age_mean: float = 35.0
+    age_stddev: float = 12.0
+    age_null: float = 0.05  # 🕳️  fracción de héroes sin edad
+    secret_min: int = 6
+    secret_max: int = 24
+
+    def __post_init__(self):
+        if not 1 <= self.names <= 1 << NAME_TABLE_BITS:
+            raise ValueError(f"names must be between 1 and {1 << NAME_TABLE_BITS}")
+        if self.skew < 0:
+            raise ValueError("skew must be >= 0")
+        if self.age_min > self.age_max or self.age_stddev <= 0:
+            raise ValueError("age range must be non-empty and age_stddev > 0")
+        if not 0 <= self.age_null <= 1:
+            raise ValueError("age_null must be between 0 and 1")
+        if not 1 <= self.secret_min <= self.secret_max:
+            raise ValueError("secret length must satisfy 1 <= min <= max")
+
+
+def sampling_table(values: list, weights: list[float], bits: int) -> list:
+    """
+    🎲 Lista de 2^bits huecos con cada valor repetido según su peso
+
+    📝 El valor i ocupa los huecos entre round(acumulado[i-1]) y round(acumulado[i]):
+    muestrear es table[rng.getrandbits(bits)], una operación O(1) por fila.
+    """
+    size = 1 << bits
+    total = sum(weights)
+    table, filled = [], 0
+    for value, cumulative in zip(values, accumulate(weights)):
+        end = round(cumulative / total * size)
+        table.extend([value] * (end - filled))
+        filled = end
+    return table
+
+
+def hero_name(number: int) -> str:
+    """🏷️  Nombre número `number`: "Iron Hawk", y con número al agotar combinaciones"""
+    first = _NAME_FIRST[number % len(_NAME_FIRST)]
+    rest, second = divmod(number // len(_NAME_FIRST), len(_NAME_SECOND))
+    return f"{first} {_NAME_SECOND[second]}" + (f" {rest + 1}" if rest else "")
+
+
+class HeroGenerator:
+    """
+    🏭 GENERADOR: lotes de filas (name, age, secret_name) para insert_batch()
+
+    📝 Las tablas de muestreo se construyen UNA vez; cada lote solo hace
+    getrandbits() e indexaciones. Lotes sucesivos continúan la misma secuencia.
+    """
+
+    def __init__(self, profile: SeedProfile):
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+
+        # PASO 1: Nombres (barajados: el más frecuente no es el primero alfabéticamente)
+        names = [hero_name(number) for number in range(profile.names)]
+        self._rng.shuffle(names)
+        name_weights = [1 / (rank + 1) ** profile.skew for rank in range(profile.names)]
+        self._names = sampling_table(names, name_weights, NAME_TABLE_BITS)
+
+        # PASO 2: Edades: campana de Gauss recortada a [age_min, age_max] + nulos
+        ages = list(range(profile.age_min, profile.age_max + 1))
+        age_weights = [math.exp(-(((age - profile.age_mean) / profile.age_stddev) ** 2) / 2) for age in ages]
+        scale = (1 - profile.age_null) / sum(age_weights)
+        self._ages = sampling_table(
+            [*ages, None], [weight * scale for weight in age_weights] + [profile.age_null], AGE_TABLE_BITS
+        )
+
+        # PASO 3: secret_names de sílabas con longitud uniforme en [secret_min, secret_max]
+        self._secrets = [
+            self._secret_name(self._rng.randint(profile.secret_min, profile.secret_max))
+            for _ in range(1 << SECRET_TABLE_BITS)
+        ]
+
+    def _secret_name(self, length: int) -> str:
+        """🕵️  "Kalo Mira Tone..." recortado a `length` caracteres exactos"""
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append("".join(self._rng.choices(_SYLLABLES, k=self._rng.randint(2, 4))).capitalize())
+        secret = " ".join(words)[:length]
+        # ✂️  Sin espacio final: mantiene la longitud exacta
+        return secret[:-1] + "a" if secret.endswith(" ") else secret
+
+    def batch(self, size: int) -> list[tuple]:
+        """📦 `size` filas nuevas (siempre las mismas para la misma semilla y orden de llamadas)"""
+        bits = self._rng.getrandbits
+        names, ages, secrets = self._names, self._ages, self._secrets
+        return [
+            (names[bits(NAME_TABLE_BITS)], ages[bits(AGE_TABLE_BITS)], secrets[bits(SECRET_TABLE_BITS)])
+            for _ in range(size)
+        ]
+
+
+def seed_heroes(database: str, rows: int, profile: SeedProfile, batch_size: int = 100_000) -> None:
+    """
+    🌱 Inserta `rows` héroes generados con `profile` en la BD SQLite `database`
+
+    📝 FLUJO:
+    1. Esquema completo (idempotente) con un engine propio para ese archivo
+    2. Conexión de carga: índices secundarios fuera
+    3. Un insert_batch() por lote (triggers sustituidos por sentencias por lote)
+       SIN changelog: hero_changes empieza vacío (los clientes parten de head=0
+       y una lectura completa); en 10M filas son 10M inserts que luego se compactan
+    4. Índices reconstruidos + checkpoint del WAL
+
+    💡 También sirve para BDs que ya tienen el esquema (los benchmarks la usan así).
+    """
+    # PASO 1: Esquema
+    schema_engine = create_engine(f"sqlite:///{database}")
+    with schema_engine.begin() as connection:
+        create_db_and_tables(connection)
+    schema_engine.dispose()
+
+    # PASO 2: Conexión de carga sin índices secundarios
+    connection = open_bulk_connection(database)
+    triggers = schema_sql(connection, "trigger", BULK_INSERT_TRIGGERS)
+    indexes = schema_sql(connection, "index", SECONDARY_INDEXES)
+    for name in indexes:
+        connection.execute(f'DROP INDEX "{name}"')
+
+    # PASO 3: Generar e insertar lote a lote
+    generator = HeroGenerator(profile)
+    try:
+        for offset in range(0, rows, batch_size):
+            insert_batch(connection, generator.batch(min(batch_size, rows - offset)), triggers, changelog=False)
+    finally:
+        # PASO 4: Índices de vuelta (también si algo falló a medias)
+        close_bulk_connection(connection, indexes)
+
+
+def parse_count(value: str) -> int:
+    """🔢 "250000", "250k", "10M" → entero"""
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:].lower(), 1)
+    digits = value[:-1] if multiplier > 1 else value
+    try:
+        return int(float(digits.replace("_", "")) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count: {value!r}")
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = SeedProfile()
+    parser = argparse.ArgumentParser(description="Crea una BD nueva con N héroes sintéticos deterministas")
+    parser.add_argument("path", help="archivo SQLite a crear")
+    parser.add_argument("--rows", type=parse_count, default=1_000_000, help="héroes a generar (admite 500k, 10M)")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="semilla: misma semilla → mismos datos")
+    parser.add_argument("--names", type=parse_count, default=defaults.names, help="nombres distintos")
+    parser.add_argument("--skew", type=float, default=defaults.skew, help="sesgo Zipf de los nombres (0 = uniforme)")
+    parser.add_argument("--age-min", type=int, default=defaults.age_min)
+    parser.add_argument("--age-max", type=int, default=defaults.age_max)
+    parser.add_argument("--age-mean", type=float, default=defaults.age_mean)
+    parser.add_argument("--age-stddev", type=float, default=defaults.age_stddev)
+    parser.add_argument("--age-null", type=float, default=defaults.age_null, help="fracción de héroes sin edad")
+    parser.add_argument("--secret-min", type=int, default=defaults.secret_min, help="longitud mínima de secret_name")
+    parser.add_argument("--secret-max", type=int, default=defaults.secret_max, help="longitud máxima de secret_name")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="filas por lote (y por transacción)")
+    parser.add_argument("--force", action="store_true", help="borrar el archivo si ya existe")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        profile = SeedProfile(
+            seed=args.seed, names=args.names, skew=args.skew,
+            age_min=args.age_min, age_max=args.age_max, age_mean=args.age_mean,
+            age_stddev=args.age_stddev, age_null=args.age_null,
+            secret_min=args.secret_min, secret_max=args.secret_max,
+        )
+    except ValueError as error:
+        print(f"❌ {error}")
+        return 2
+
+    # 🧹 BD NUEVA: los datos dependen solo de la semilla y el perfil
+    if os.path.exists(args.path):
+        if not args.force:
+            print(f"❌ {args.path} ya existe (usa --force para borrarlo y crearlo de nuevo)")
+            return 2
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+
+    start = time.perf_counter()
+    seed_heroes(args.path, args.rows, profile, args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {args.rows:,} héroes en {args.path} en {elapsed:.1f}s ({args.rows / max(elapsed, 1e-9):,.0f} filas/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
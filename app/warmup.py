@@ -0,0 +1,163 @@
+"""
+🔥 Startup Warmup - Calentar la Aplicación Antes de Recibir Tráfico 🔥
+
+📚 PROPÓSITO EDUCATIVO:
+Un worker recién arrancado es lento en sus primeras requests aunque la BD sea
+rápida: todo lo "perezoso" se paga en ellas.
+- El pool de SQLAlchemy abre las conexiones la primera vez que se piden (y
+  cada una ejecuta sus PRAGMAs)
+- SQLAlchemy compila cada forma de consulta la primera vez que la ve
+- FastAPI prepara el estado interno de las rutas de un router (dependencias,
+  validadores...) la primera vez que una request llega a él
+
+Medido con /heroes/?limit=10: ~25 ms la primera request frente a ~3 ms las
+siguientes. Este módulo paga ese coste en el lifespan, ANTES de que el
+servidor acepte conexiones.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Prefill del pool: pedir N conexiones a la vez y devolverlas
+- ✅ Llamar a la app ASGI directamente (scope/receive/send) sin servidor ni httpx
+- ✅ Requests de calentamiento que no ensucian las métricas
+
+⚙️  CONFIGURACIÓN:
+- STARTUP_WARMUP=true (por defecto): prefill + requests de calentamiento
+- POOL_PREFILL: conexiones a abrir por engine (como mucho, el tamaño del pool)
+
+⚠️  Solo se calientan LECTURAS (GET): una escritura de calentamiento
+cambiaría los datos. El estado de las rutas se prepara por router, así que un
+GET basta para que el primer POST de ese router tampoco pague esa parte.
+"""
+import logging
+import time
+from contextlib import AsyncExitStack, ExitStack
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Engine, text
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    # 💤 Solo para anotaciones: el backend sync nunca importa la parte async
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# 🛣️  GETs de calentamiento: listado, detalle (404 barato con id=0) y búsqueda
+# 💡 Los routers async no tienen /search: con DB_BACKEND=async solo se calienta lo demás
+WARMUP_PATHS = (
+    "/heroes/?limit=1",
+    "/heroes_sql/?limit=1",
+    "/heroes/0",
+    "/heroes_sql/0",
+)
+SYNC_ONLY_WARMUP_PATHS = (
+    "/heroes/search?q=warmup&limit=1",
+    "/heroes_sql/search?q=warmup&limit=1",
+)
+
+# 🏷️  Marca en el scope ASGI: MetricsMiddleware no cuenta estas requests
+WARMUP_SCOPE_KEY = "heroes.warmup"
+
+
+def _prefill_size(pool) -> int:
+    """🔢 Conexiones a abrir: POOL_PREFILL, sin pasar del tamaño del pool (si lo tiene)"""
+    size = getattr(pool, "size", None)
+    limit = size() if callable(size) else 1
+    return max(0, min(settings.POOL_PREFILL, limit))
+
+
+def prefill_pool(engine: Engine) -> int:
+    """
+    🏊 Abre las conexiones del pool AHORA (y sus PRAGMAs) en lugar de en la primera request
+
+    💡 Se piden todas a la vez: si se pidieran y devolvieran de una en una, el
+    pool reutilizaría siempre la misma y solo se abriría una.
+    """
+    count = _prefill_size(engine.pool)
+    with ExitStack() as stack:
+        for _ in range(count):
+            connection = stack.enter_context(engine.connect())
+            connection.execute(text("SELECT 1"))
+    return count
+
+
+async def prefill_async_pool(async_engine: "AsyncEngine") -> int:
+    """🏊 Igual que prefill_pool(), con conexiones async"""
+    count = _prefill_size(async_engine.sync_engine.pool)
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            connection = await stack.enter_async_context(async_engine.connect())
+            await connection.execute(text("SELECT 1"))
+    return count
+
+
+async def _asgi_get(app, path_with_query: str) -> int:
+    """📨 GET en memoria contra la app ASGI; devuelve el código de estado"""
+    path, _, query = path_with_query.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+        WARMUP_SCOPE_KEY: True,
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def warm_up(app) -> None:
+    """
+    🔥 Calentamiento completo (lo llama el lifespan de main.py)
+
+    📝 FLUJO:
+    1. Prefill de los pools (principal y de lectura, o el async)
+    2. Un GET de cada WARMUP_PATHS: prepara las rutas y compila su SQL
+    """
+    if not settings.STARTUP_WARMUP:
+        return
+    start = time.perf_counter()
+
+    # PASO 1: Abrir las conexiones de los pools
+    if settings.DB_BACKEND == "async":
+        from app.database.async_db_session import async_engine
+        connections = await prefill_async_pool(async_engine)
+        paths = WARMUP_PATHS
+    else:
+        from app.database.share_db_session import engine, read_engines
+        connections = sum(prefill_pool(pooled) for pooled in (engine, *read_engines))
+        paths = WARMUP_PATHS + SYNC_ONLY_WARMUP_PATHS
+
+    # PASO 2: Requests de calentamiento (un fallo no impide arrancar)
+    statuses = {}
+    for path in paths:
+        try:
+            statuses[path] = await _asgi_get(app, path)
+        except Exception:
+            logger.exception("warmup_request_failed", extra={"path": path})
+
+    logger.info(
+        "startup_warmup",
+        extra={
+            "connections": connections,
+            "requests": statuses,
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+        },
+    )
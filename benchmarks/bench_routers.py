@@ -0,0 +1,303 @@
+"""
+📊 Router Benchmark - ORM vs SQL puro bajo carga 📊
+
+📚 PROPÓSITO EDUCATIVO:
+Todo el proyecto compara /heroes (SQLModel ORM) con /heroes_sql (SQL puro).
+Este script lo MIDE: crea una base de datos de prueba del tamaño que quieras,
+lanza todas las operaciones CRUD contra la aplicación ASGI (sin red, sin
+servidor) a varios niveles de concurrencia y guarda los resultados en JSON.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ httpx.ASGITransport: llamar a la app FastAPI directamente, sin uvicorn
+- ✅ asyncio + tareas concurrentes para simular muchos clientes
+- ✅ Percentiles de latencia (p50/p95/p99) y throughput (req/s)
+- ✅ tracemalloc para medir memoria asignada por operación
+- ✅ Eventos de SQLAlchemy para contar sentencias SQL por operación
+
+🚀 PARA EJECUTAR:
+python -m benchmarks.bench_routers --rows 100000 --requests 500 --concurrency 1,8,32
+
+📁 RESULTADOS:
+benchmarks/results/<commit>.json  → compáralos entre commits con --compare
+python -m benchmarks.bench_routers --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROUTERS = ("/heroes", "/heroes_sql")
+OPERATIONS = ("create", "read", "list", "update", "delete")
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ORM vs SQL puro (ASGI, sin red)")
+    parser.add_argument("--rows", type=int, default=10_000, help="héroes en la BD de prueba")
+    parser.add_argument("--requests", type=int, default=300, help="requests por operación y nivel")
+    parser.add_argument("--concurrency", default="1,8,32", help="niveles de concurrencia, separados por comas")
+    parser.add_argument("--alloc-samples", type=int, default=50, help="requests medidas con tracemalloc")
+    parser.add_argument("--seed", type=int, default=42, help="semilla para datos y operaciones")
+    parser.add_argument("--cache", action="store_true", help="medir con la caché de héroes activada")
+    parser.add_argument("--output", type=Path, help="archivo JSON de salida")
+    parser.add_argument("--compare", type=Path, help="JSON de un run anterior para comparar")
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    """🔖 Commit actual (para nombrar y comparar resultados)"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """📈 Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def seed_database(path: str, rows: int, seed: int) -> None:
+    """
+    🌱 Inserta `rows` héroes deterministas (misma semilla → mismos datos)
+
+    💡 Usa el generador de app/tools/seed.py con su perfil por defecto: nombres
+    repetidos con sesgo Zipf y edades con nulos, como en una BD real.
+    """
+    from app.tools.seed import SeedProfile, seed_heroes
+
+    seed_heroes(path, rows, SeedProfile(seed=seed))
+
+
+class Driver:
+    """
+    🏎️  Ejecuta operaciones CRUD contra la app ASGI y guarda las mediciones
+
+    📝 Cada operación es una corrutina que hace UNA request; timed() mide su latencia.
+    """
+
+    def __init__(self, client, router: str, max_id: int, rng: random.Random):
+        self.client = client
+        self.router = router
+        self.max_id = max_id
+        self.rng = rng
+        self.created: list[int] = []
+
+    async def create(self) -> None:
+        response = await self.client.post(
+            f"{self.router}/",
+            json={"name": f"Bench {self.rng.random()}", "age": 30, "secret_name": "bench"},
+        )
+        response.raise_for_status()
+        self.created.append(response.json()["id"])
+
+    async def read(self) -> None:
+        response = await self.client.get(f"{self.router}/{self.rng.randint(1, self.max_id)}")
+        if response.status_code not in (200, 404):
+            response.raise_for_status()
+
+    async def list(self) -> None:
+        after_id = self.rng.randint(0, self.max_id)
+        response = await self.client.get(f"{self.router}/", params={"after_id": after_id, "limit": 100})
+        response.raise_for_status()
+
+    async def update(self) -> None:
+        hero_id = self.rng.choice(self.created)
+        response = await self.client.patch(f"{self.router}/{hero_id}", json={"age": self.rng.randrange(100)})
+        response.raise_for_status()
+
+    async def delete(self) -> None:
+        # 🗑️  Solo borra héroes creados por el propio benchmark
+        hero_id = self.created.pop()
+        response = await self.client.delete(f"{self.router}/{hero_id}")
+        response.raise_for_status()
+
+
+async def timed(operation) -> float:
+    start = time.perf_counter()
+    await operation()
+    return time.perf_counter() - start
+
+
+async def run_level(driver: Driver, operation: str, requests: int, concurrency: int) -> dict:
+    """
+    ⚙️  Lanza `requests` llamadas con `concurrency` clientes simultáneos
+
+    📊 Devuelve latencias (ms), throughput (req/s) y sentencias SQL por operación
+    """
+    from benchmarks.sql_counter import statement_counter
+
+    method = getattr(driver, operation)
+    queue = list(range(requests))
+    latencies: list[float] = []
+
+    async def worker() -> None:
+        while queue:
+            queue.pop()
+            latencies.append(await timed(method))
+
+    statements_before = statement_counter.count
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    statements = statement_counter.count - statements_before
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "statements_per_op": round(statements / requests, 2),
+    }
+
+
+async def measure_allocations(driver: Driver, operation: str, samples: int) -> int:
+    """
+    🧠 Bytes asignados (pico) por operación, medidos con tracemalloc
+
+    💡 Se mide en una pasada aparte y secuencial: tracemalloc hace todo más
+    lento y no queremos que contamine las latencias.
+    """
+    method = getattr(driver, operation)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await method()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+    return int(statistics.median(peaks)) if peaks else 0
+
+
+async def run_benchmark(args: argparse.Namespace, levels: list[int]) -> dict:
+    import httpx
+
+    from main import app
+
+    rng = random.Random(args.seed)
+    results: dict = {}
+
+    # 🔄 Ejecutar el lifespan (bootstrap del esquema, warmup...) como haría uvicorn
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for router in ROUTERS:
+                driver = Driver(client, router, args.rows, rng)
+                results[router] = {}
+                for operation in OPERATIONS:
+                    results[router][operation] = {}
+                    for level in levels:
+                        print(f"⏱️  {router:<11} {operation:<7} c={level:<4}", end=" ", flush=True)
+                        stats = await run_level(driver, operation, args.requests, level)
+                        results[router][operation][str(level)] = stats
+                        print(
+                            f"{stats['throughput_rps']:>9} req/s  p50={stats['p50_ms']}ms "
+                            f"p99={stats['p99_ms']}ms  sql/op={stats['statements_per_op']}"
+                        )
+                    # 🧠 La pasada de memoria de create deja tantos héroes extra
+                    # como borra la pasada de memoria de delete
+                    alloc = await measure_allocations(driver, operation, args.alloc_samples)
+                    results[router][operation]["alloc_bytes_per_op"] = alloc
+    return results
+
+
+def print_comparison(current: dict, baseline_path: Path) -> None:
+    """🆚 Compara throughput y p99 con un run anterior (Δ% por operación y nivel)"""
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\n🆚 Comparación con {baseline_path} ({baseline['meta']['commit']})")
+    for router, operations in current["results"].items():
+        for operation, levels in operations.items():
+            for level, stats in levels.items():
+                if not isinstance(stats, dict):
+                    continue
+                old = baseline["results"].get(router, {}).get(operation, {}).get(level)
+                if not old:
+                    continue
+                rps = (stats["throughput_rps"] / old["throughput_rps"] - 1) * 100
+                p99 = (stats["p99_ms"] / old["p99_ms"] - 1) * 100 if old["p99_ms"] else 0.0
+                print(f"   {router:<11} {operation:<7} c={level:<4} req/s {rps:+6.1f}%  p99 {p99:+6.1f}%")
+
+
+def main() -> None:
+    args = parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    # 📁 BD temporal NUEVA: los resultados no dependen de marvel.db
+    workdir = tempfile.mkdtemp(prefix="heroes-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ["DATABASE_FILE"] = db_path
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.setdefault("CACHE_BACKEND", "lru" if args.cache else "none")
+
+    # ⚠️  Los módulos de la app leen la configuración al importarse:
+    # hay que importarlos DESPUÉS de fijar las variables de entorno
+    from app.database.schema import create_db_and_tables
+    from app.database.share_db_session import engine, read_engines
+    from benchmarks.sql_counter import install_statement_counter
+
+    with engine.begin() as connection:
+        create_db_and_tables(connection)
+    print(f"🌱 Sembrando {args.rows} héroes en {db_path}")
+    seed_database(db_path, args.rows, args.seed)
+    for counted_engine in (engine, *read_engines):
+        install_statement_counter(counted_engine)
+    if os.environ.get("DB_BACKEND", "sync").lower() == "async":
+        from app.database.async_db_session import async_engine
+        install_statement_counter(async_engine.sync_engine)
+
+    results = asyncio.run(run_benchmark(args, levels))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "rows": args.rows,
+            "requests": args.requests,
+            "concurrency": levels,
+            "seed": args.seed,
+            "cache": os.environ["CACHE_BACKEND"],
+            "db_backend": os.environ.get("DB_BACKEND", "sync"),
+            "response_mode": os.environ.get("RESPONSE_MODE", "fast"),
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\n💾 Resultados guardados en {output}")
+
+    if args.compare:
+        print_comparison(report, args.compare)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+🧊 Startup Benchmark - ¿Cuánto Tarda un Worker Nuevo en Estar Listo? 🧊
+
+📚 PROPÓSITO EDUCATIVO:
+bench_routers.py mide la app "caliente". Pero cada worker nuevo (un deploy,
+un reinicio, el autoescalado) empieza en frío: importa todos los módulos,
+ejecuta el lifespan y sus primeras requests pagan todo lo perezoso. Este
+script lo mide en procesos NUEVOS de Python, varias veces, y compara la
+primera request de cada endpoint con la segunda.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ Medir en un subproceso: en el proceso actual todo estaría ya importado
+- ✅ import → lifespan → primera request: dónde se va el tiempo de arranque
+- ✅ Presupuestos (--max-*-ms): fallar en CI si el arranque empeora
+
+📏 MÉTRICAS (mediana de --runs procesos):
+- import_ms: `import main` (FastAPI, SQLAlchemy, routers...)
+- lifespan_ms: esquema + PRAGMAs + warmup (STARTUP_WARMUP)
+- first_ms / second_ms por endpoint: primera y segunda request
+
+🚀 PARA EJECUTAR:
+python -m benchmarks.bench_startup --runs 5
+STARTUP_WARMUP=false python -m benchmarks.bench_startup   # 🆚 sin warmup
+python -m benchmarks.bench_startup --max-first-request-ms 15 --max-import-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# 🛣️  Primeras requests a medir (método, ruta): lecturas de los dos routers y una escritura
+REQUESTS = (
+    ("GET", "/heroes/?limit=20"),
+    ("GET", "/heroes_sql/?limit=20"),
+    ("GET", "/heroes/1"),
+    ("GET", "/heroes_sql/1"),
+    ("POST", "/heroes_sql/"),
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tiempo de arranque y latencia de la primera request")
+    parser.add_argument("--runs", type=int, default=5, help="procesos nuevos a medir")
+    parser.add_argument("--rows", type=int, default=10_000, help="héroes en la BD de prueba")
+    parser.add_argument("--seed", type=int, default=42, help="semilla para los datos")
+    parser.add_argument("--max-import-ms", type=float, help="falla (código 1) si la mediana de import_ms lo supera")
+    parser.add_argument("--max-first-request-ms", type=float, help="falla si la primera request más lenta lo supera")
+    parser.add_argument("--output", type=str, help="guardar el resultado en este JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+async def measure_requests(app) -> dict:
+    """⏱️  Lifespan + primera y segunda request de cada endpoint (dentro del subproceso)"""
+    import httpx
+
+    timings: dict = {}
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["lifespan_ms"] = (time.perf_counter() - start) * 1000
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for method, path in REQUESTS:
+                body = {"name": "Cold Start", "age": 1, "secret_name": "Bench"} if method == "POST" else None
+                laps = []
+                for _ in range(2):
+                    lap = time.perf_counter()
+                    response = await client.request(method, path, json=body)
+                    laps.append((time.perf_counter() - lap) * 1000)
+                    response.raise_for_status()
+                timings[f"{method} {path}"] = {"first_ms": laps[0], "second_ms": laps[1]}
+    return timings
+
+
+def child() -> None:
+    """👶 Lo que corre en cada proceso nuevo: importar la app y medir"""
+    import asyncio
+
+    start = time.perf_counter()
+    from main import app
+    import_ms = (time.perf_counter() - start) * 1000
+
+    timings = asyncio.run(measure_requests(app))
+    print(json.dumps({"import_ms": import_ms, **timings}))
+
+
+def run_child(env: dict) -> dict:
+    """🚀 Lanza un proceso nuevo de Python y lee su línea JSON"""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    args = parse_args()
+    if args.child:
+        child()
+        return 0
+
+    # 📁 BD temporal sembrada UNA vez; cada proceso trabaja sobre una copia igual
+    workdir = tempfile.mkdtemp(prefix="heroes-startup-")
+    template = os.path.join(workdir, "template.db")
+    os.environ["DATABASE_FILE"] = template
+    os.environ["DATABASE_URL"] = f"sqlite:///{template}"
+    os.environ.setdefault("CACHE_BACKEND", "none")
+    os.environ.setdefault("LOG_LEVEL", "OFF")
+    env = dict(os.environ)
+
+    # ⚠️  Igual que en bench_routers.py: importar la app DESPUÉS de fijar el entorno
+    # (aquí solo para crear el esquema; los procesos medidos importan todo desde cero)
+    from app.database.schema import create_db_and_tables
+    from app.database.share_db_session import dispose_engines, engine
+    from benchmarks.bench_routers import seed_database
+
+    with engine.begin() as connection:
+        create_db_and_tables(connection)
+    dispose_engines()
+    print(f"🌱 Sembrando {args.rows} héroes en {template}")
+    seed_database(template, args.rows, args.seed)
+
+    runs = []
+    for run in range(args.runs):
+        # 📋 Copia nueva por proceso: el POST de un run no cambia los datos del siguiente
+        db_path = os.path.join(workdir, f"run-{run}.db")
+        with open(template, "rb") as source, open(db_path, "wb") as target:
+            target.write(source.read())
+        runs.append(run_child({
+            **env,
+            "DATABASE_FILE": db_path,
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+        }))
+        print(f"🧊 run {run + 1}/{args.runs}: import {runs[-1]['import_ms']:.0f}ms, "
+              f"lifespan {runs[-1]['lifespan_ms']:.0f}ms")
+
+    # 📊 Medianas entre procesos (un proceso lento no decide el resultado)
+    summary = {
+        "import_ms": round(statistics.median(run["import_ms"] for run in runs), 1),
+        "lifespan_ms": round(statistics.median(run["lifespan_ms"] for run in runs), 1),
+        "requests": {},
+    }
+    print(f"\n📦 import main: {summary['import_ms']}ms   🔄 lifespan: {summary['lifespan_ms']}ms")
+    for method, path in REQUESTS:
+        name = f"{method} {path}"
+        first = round(statistics.median(run[name]["first_ms"] for run in runs), 2)
+        second = round(statistics.median(run[name]["second_ms"] for run in runs), 2)
+        summary["requests"][name] = {"first_ms": first, "second_ms": second}
+        print(f"   {name:<26} primera {first:>7}ms   segunda {second:>7}ms")
+
+    report = {
+        "meta": {
+            "runs": args.runs,
+            "rows": args.rows,
+            "startup_warmup": env.get("STARTUP_WARMUP", "true"),
+            "db_backend": env.get("DB_BACKEND", "sync"),
+        },
+        "summary": summary,
+    }
+    if args.output:
+        with open(args.output, "w") as target:
+            json.dump(report, target, indent=2)
+        print(f"💾 Resultados guardados en {args.output}")
+
+    # 🚦 Presupuestos: código 1 si el arranque en frío empeoró
+    failures = []
+    if args.max_import_ms is not None and summary["import_ms"] > args.max_import_ms:
+        failures.append(f"import_ms {summary['import_ms']} > {args.max_import_ms}")
+    slowest = max(request["first_ms"] for request in summary["requests"].values())
+    if args.max_first_request_ms is not None and slowest > args.max_first_request_ms:
+        failures.append(f"primera request {slowest}ms > {args.max_first_request_ms}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
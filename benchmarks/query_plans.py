@@ -0,0 +1,167 @@
+"""
+🗺️  Query Plan Check - ¿Usan los listados filtrados sus índices? 🗺️
+
+📚 PROPÓSITO EDUCATIVO:
+Que una consulta "vaya rápido" con 100 filas no dice nada. Lo que importa es
+su PLAN: si SQLite busca en un índice (SEARCH) o recorre la tabla (SCAN).
+Este script pide los listados de /heroes y /heroes_sql con cada combinación
+de filtros y orden (con include_total=true, así que también su count(*)),
+captura el SQL que ejecuta la app y comprueba su plan con EXPLAIN QUERY
+PLAN. Si algún listado filtrado recorre la tabla, termina con código 1:
+sirve como comprobación en CI.
+
+🎯 CONCEPTOS QUE APRENDERÁS:
+- ✅ EXPLAIN QUERY PLAN: SEARCH (índice) vs SCAN (tabla entera)
+- ✅ "USE TEMP B-TREE FOR ORDER BY": SQLite tiene que ordenar él mismo
+- ✅ Capturar el SQL real de la app con el evento before_cursor_execute
+- ✅ Las reglas que aplica app/database/filters.py
+
+📏 REGLAS:
+- Con filtros: toda lectura de heroes debe ser SEARCH con el índice del filtro
+  (ordenar después las filas encontradas está permitido), también el count(*)
+  del total (app/database/counts.py)
+- Sin filtros: el orden debe salir de un índice (sin TEMP B-TREE)
+
+🚀 PARA EJECUTAR:
+python -m benchmarks.query_plans --rows 20000
+"""
+import argparse
+import itertools
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+ROUTERS = ("/heroes", "/heroes_sql")
+SORTS = ("id", "-id", "name", "-name", "age", "-age")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Comprueba los planes de consulta de los listados")
+    parser.add_argument("--rows", type=int, default=20_000, help="héroes en la BD de prueba")
+    parser.add_argument("--seed", type=int, default=42, help="semilla para los datos")
+    parser.add_argument("--verbose", action="store_true", help="mostrar también los planes correctos")
+    return parser.parse_args()
+
+
+class StatementCapture:
+    """🎣 Guarda las consultas del listado (... ORDER BY ...) y de su total (count(*))"""
+
+    def __init__(self):
+        self.statements: list[tuple[str, tuple]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        # 🙈 Ignora los EXPLAIN QUERY PLAN del propio script
+        # 💡 El total sin filtros lee table_counts, no heroes: no se captura
+        is_listing = "ORDER BY" in statement or "count(*)" in statement
+        if "FROM heroes" in statement and is_listing and not statement.startswith("EXPLAIN"):
+            with self._lock:
+                self.statements.append((statement, tuple(parameters)))
+
+    def take(self) -> list[tuple[str, tuple]]:
+        with self._lock:
+            statements, self.statements = self.statements, []
+        return statements
+
+
+def filter_combinations(sample_name: str) -> list[dict]:
+    """🧮 Combinaciones de filtros a comprobar (vacía = listado sin filtros)"""
+    name_filters = [
+        {},
+        {"name": sample_name},
+        {"name_prefix": sample_name[:6]},
+        # 🔤 Prefijos límite de prefix_upper_bound(): U+10FFFF no tiene siguiente,
+        # U+D7FF salta los surrogates y uno hecho solo de U+10FFFF no tiene límite superior
+        {"name_prefix": sample_name[:3] + "\U0010ffff"},
+        {"name_prefix": sample_name[:3] + "\ud7ff"},
+        {"name_prefix": "\U0010ffff"},
+    ]
+    age_filters = [{}, {"min_age": 30}, {"max_age": 40}, {"min_age": 30, "max_age": 40}]
+    return [{**name, **age} for name, age in itertools.product(name_filters, age_filters)]
+
+
+def expected_index(filters: dict) -> str | None:
+    """🗂️  Índice que DEBE usar la consulta (el mismo criterio que HeroFilters.index_column)"""
+    if "name" in filters or "name_prefix" in filters:
+        return "ix_heroes_name"
+    if "min_age" in filters or "max_age" in filters:
+        return "ix_heroes_age"
+    return None
+
+
+def plan_problems(plan: list[str], filters: dict) -> list[str]:
+    """⚖️  Devuelve las reglas que incumple un plan (lista vacía = correcto)"""
+    index = expected_index(filters)
+    heroes_steps = [step for step in plan if " heroes" in step]
+    if index is None:
+        return [step for step in plan if "TEMP B-TREE" in step]
+    return [step for step in heroes_steps if not step.startswith("SEARCH heroes USING") or index not in step]
+
+
+def main() -> int:
+    args = parse_args()
+
+    # 📁 BD temporal NUEVA y sin caché: cada request llega a la BD
+    workdir = tempfile.mkdtemp(prefix="heroes-plans-")
+    db_path = os.path.join(workdir, "plans.db")
+    os.environ["DATABASE_FILE"] = db_path
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["CACHE_BACKEND"] = "none"
+    os.environ.setdefault("LOG_LEVEL", "OFF")
+
+    # ⚠️  Igual que en bench_routers.py: importar la app DESPUÉS de fijar el entorno
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.database.schema import create_db_and_tables
+    from app.database.share_db_session import engine, read_engines
+    from benchmarks.bench_routers import seed_database
+    from main import app
+
+    with engine.begin() as connection:
+        create_db_and_tables(connection)
+    print(f"🌱 Sembrando {args.rows} héroes en {db_path}")
+    seed_database(db_path, args.rows, args.seed)
+    with sqlite3.connect(db_path) as connection:
+        sample_name = connection.execute("SELECT name FROM heroes ORDER BY id LIMIT 1").fetchone()[0]
+
+    capture = StatementCapture()
+    # 📖 Los listados van al pool de lectura (READ_DATABASE_URLS); el principal por si está desactivado
+    for captured_engine in (engine, *read_engines):
+        event.listen(captured_engine, "before_cursor_execute", capture)
+
+    checked = failures = 0
+    with TestClient(app) as client, engine.connect() as connection:
+        # 🔥 Descartar las consultas del warmup del lifespan (app/warmup.py)
+        capture.take()
+        for router, filters, sort in itertools.product(ROUTERS, filter_combinations(sample_name), SORTS):
+            # 📄 Primera página y, si la hay, la siguiente (añade la condición keyset)
+            params = {**filters, "sort": sort, "limit": 1, "include_total": "true"}
+            first = client.get(f"{router}/", params=params)
+            first.raise_for_status()
+            statements = [(params, captured) for captured in capture.take()]
+            if cursor := first.headers.get("X-Next-Cursor"):
+                client.get(f"{router}/", params={**params, "cursor": cursor}).raise_for_status()
+                statements += [({**params, "cursor": "…"}, captured) for captured in capture.take()]
+
+            for request, (statement, parameters) in statements:
+                rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                plan = [row[-1] for row in rows]
+                problems = plan_problems(plan, filters)
+                checked += 1
+                if problems or args.verbose:
+                    mark = "❌" if problems else "✅"
+                    kind = "count" if "count(*)" in statement else "page"
+                    print(f"{mark} {router} [{kind}] {request}")
+                    for step in plan:
+                        print(f"      {step}")
+                failures += bool(problems)
+
+    print(f"\n🗺️  {checked} consultas comprobadas, {failures} con planes incorrectos")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+🔢 SQL Statement Counter - Contador de sentencias SQL 🔢
+
+📚 PROPÓSITO EDUCATIVO:
+Cuenta cuántas sentencias SQL ejecuta el engine usando el evento
+"before_cursor_execute" de SQLAlchemy. Dividido entre el número de requests
+nos dice cuántos viajes a la base de datos cuesta cada operación.
+"""
+import threading
+
+from sqlalchemy import Engine, event
+
+
+class StatementCounter:
+    """🔢 Contador seguro entre threads (los endpoints sync corren en un thread pool)"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        with self._lock:
+            self.count += 1
+
+
+# 🌍 Instancia global usada por bench_routers.py
+statement_counter = StatementCounter()
+
+
+def install_statement_counter(engine: Engine) -> None:
+    """📌 Registra el contador en el engine (para AsyncEngine, pasar .sync_engine)"""
+    event.listen(engine, "before_cursor_execute", statement_counter)
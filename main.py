@@ -15,6 +15,9 @@ la aplicación principal y se registran todas las rutas (routers).
 🌐 RUTAS DISPONIBLES:
 - /heroes      - CRUD con SQLModel ORM
 - /heroes_sql  - CRUD con SQL puro  
+- /heroes/changes - Change feed (delta con ?since= y SSE en /heroes/changes/stream)
+- /metrics     - Métricas en formato Prometheus
+- /debug       - Diagnóstico: caché, pools, admission, consultas lentas y change feed
 - /docs        - Documentación automática (Swagger UI)
 - /redoc       - Documentación alternativa (ReDoc)
 
@@ -24,17 +27,97 @@ o
 fastapi dev main.py
 """
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import settings
+from app.logging_config import configure_logging
+
+# 📝 Configurar logs ANTES de importar los routers (algunos módulos registran al importarse)
+configure_logging()
+logger = logging.getLogger("app.main")
+
+from app.admission import AdmissionMiddleware, pool_timeout_handler  # 🚦 Admission control
 
 # 📦 Importar routers desde módulos organizados
-from app.routes.heroes import router as heroes_router      # 🦸‍♂️ Rutas ORM
-from app.routes.heroes_sql import router as heroes_sql_router  # 🦸‍♂️ Rutas SQL
+from app.routes.changes import router as changes_router  # 📰 Change feed
+from app.routes.debug import router as debug_router  # 🔍 Rutas de diagnóstico
+# ⚡ DB_BACKEND=async monta las versiones async def (AsyncSession) en las mismas rutas
+if settings.DB_BACKEND == "async":
+    from app.routes.heroes_async import router as heroes_router      # ⚡ Rutas ORM async
+    from app.routes.heroes_sql_async import router as heroes_sql_router  # ⚡ Rutas SQL async
+else:
+    from app.routes.heroes import router as heroes_router      # 🦸‍♂️ Rutas ORM
+    from app.routes.heroes_sql import router as heroes_sql_router  # 🦸‍♂️ Rutas SQL
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    🔄 LIFESPAN: código que se ejecuta al arrancar (antes de yield) y al apagar (después)
+    
+    🏗️  Al arrancar creamos tablas y triggers que falten (idempotente).
+    🏎️  Luego mostramos los PRAGMAs de SQLite realmente activos, para
+    confirmar que el perfil de rendimiento se aplicó.
+    🧵 Antes de nada, fijamos el tamaño del thread pool (THREADPOOL_SIZE).
+    🔥 Después calentamos pools y rutas (app/warmup.py): la primera request
+    real ya no paga conexiones nuevas ni SQL sin compilar.
+    📰 Con todo listo, arrancan las tareas del change feed (app/database/changes.py).
+    📮 Al apagar, detenemos el escritor de group commit (si llegó a arrancar)
+    y cerramos las conexiones de los pools.
+    
+    💤 Los imports que solo se usan aquí van dentro: no cuestan nada al
+    importar main (p.ej. en herramientas que solo quieren `app`).
+    """
+    from app.admission import configure_thread_pool
+    from app.database.changes import change_broadcaster, change_compactor
+    from app.database.schema import create_db_and_tables
+    from app.database.sqlite_tuning import read_sqlite_pragmas
+    from app.warmup import warm_up
+    
+    # 🧵 Threads para los endpoints "def" (THREADPOOL_SIZE); el limitador es del event loop
+    configure_thread_pool()
+    if settings.DB_BACKEND == "async":
+        from app.database.async_db_session import async_engine
+        async with async_engine.begin() as connection:
+            await connection.run_sync(create_db_and_tables)
+            pragmas = await connection.run_sync(read_sqlite_pragmas)
+    else:
+        from app.database.share_db_session import engine
+        with engine.begin() as connection:
+            create_db_and_tables(connection)
+            pragmas = read_sqlite_pragmas(connection)
+    
+    logger.info("sqlite_profile", extra={"profile": settings.SQLITE_PROFILE, "pragmas": pragmas})
+    await warm_up(app)
+    # 📰 Change feed: broadcaster de los streams SSE + compactación del changelog
+    change_broadcaster.start()
+    change_compactor.start()
+    yield
+    
+    # 📡 Primero el change feed: cierra los streams SSE abiertos
+    await change_broadcaster.stop()
+    await change_compactor.stop()
+    # 📮 Al apagar: el escritor de grupo confirma lo pendiente y termina (WRITE_MODE=group)
+    # 🧹 Luego se cierran las conexiones de los pools
+    if settings.DB_BACKEND == "async":
+        await async_engine.dispose()
+    else:
+        from app.database.group_commit import group_writer
+        from app.database.share_db_session import dispose_engines
+        group_writer.stop()
+        dispose_engines()
+
 
 # 🏗️  CREAR APLICACIÓN FASTAPI: Configuración principal
 app = FastAPI(
     title="Heroes API",  # 📋 Nombre que aparece en la documentación
     description="API para gestión de héroes con implementaciones ORM y SQL",  # 📝 Descripción detallada
-    version="1.0.0"  # 🔢 Versión de la API (importante para versionado)
+    version="1.0.0",  # 🔢 Versión de la API (importante para versionado)
+    lifespan=lifespan  # 🔄 Código de arranque/apagado
 )
 
 # 🛣️  REGISTRAR ROUTERS: Organización modular de endpoints
@@ -45,12 +128,38 @@ app = FastAPI(
 # - Diferentes equipos pueden trabajar en diferentes routers
 # - Facilita testing de módulos específicos
 
+# 📰 Change feed: /heroes/changes* - ANTES que /heroes/{hero_id}, que lo capturaría
+app.include_router(changes_router)
+
 # 🦸‍♂️ Router ORM: /heroes/* - Demostración usando SQLModel ORM
 app.include_router(heroes_router)
 
 # 🦸‍♂️ Router SQL: /heroes_sql/* - Demostración usando SQL puro  
 app.include_router(heroes_sql_router)
 
+# 🔍 Router de diagnóstico: /debug/* - Estado interno (caché, etc.)
+app.include_router(debug_router)
+
+# 🚦 Admission control: con sobrecarga, 503 + Retry-After en vez de colas sin fin
+# 🏊 Si aun así el pool de la BD no da conexión a tiempo, también 503 (no 500)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+if settings.ADMISSION_CONTROL:
+    app.add_middleware(AdmissionMiddleware)
+
+# 🐢 Slow query log: el middleware deja la ruta en un ContextVar para los eventos del engine
+if settings.SLOW_QUERY_LOG:
+    from app.database.slow_queries import SlowQueryMiddleware
+    app.add_middleware(SlowQueryMiddleware)
+
+# 📈 Métricas: middleware que mide cada request + GET /metrics
+# 💡 Se añade DESPUÉS: queda por fuera y también cuenta los 503 del admission control
+# 💡 METRICS_ENABLED=false los quita por completo (cero coste por request)
+if settings.METRICS_ENABLED:
+    from app.metrics import MetricsMiddleware
+    from app.routes.metrics import router as metrics_router  # 📈 Métricas Prometheus
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
 
 @app.get("/")
 def read_root():
@@ -74,8 +183,11 @@ def read_root():
         "endpoints": {
             "heroes_orm": "/heroes",
             "heroes_sql": "/heroes_sql", 
+            "changes": "/heroes/changes",
+            "metrics": "/metrics",
             "documentation": "/docs",
             "alternative_docs": "/redoc"
         },
+        "db_backend": settings.DB_BACKEND,
         "learning": "Compare /heroes vs /heroes_sql to see ORM vs SQL differences!"
     }